@@ -3,8 +3,8 @@ import shutil
 import json
 import zipfile
 import pandas as pd
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Request, Query
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
 from sqlmodel import Session, select, func, or_
 from sqlalchemy.orm import selectinload 
 from typing import List, Optional, Dict, Any
@@ -19,6 +19,9 @@ from app.schemas.dataset_schema import (
 
 from app.deps import get_current_active_user, get_current_admin
 from app.models.user import User
+from app.services.catalog_stats import CatalogStatsService
+from app.utils.http_cache import etag_response
+from app.utils import fast_json
 
 router = APIRouter()
 
@@ -263,24 +266,22 @@ def download_dataset_file(
 
 @router.get("/stats")
 def get_dataset_stats(
+    request: Request,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    # 1. 分类统计
-    statement = select(DatasetMeta.category, func.count(DatasetMeta.id))\
-        .where(DatasetMeta.is_deleted == False)\
-        .group_by(DatasetMeta.category)
-    results = session.exec(statement).all()
-    categories = [{"category": row[0], "count": row[1]} for row in results]
-    
-    # 2. 总题量统计
-    total_stmt = select(func.sum(DatasetMeta.data_count)).where(DatasetMeta.is_deleted == False)
-    total_questions = session.exec(total_stmt).one() or 0
-    
-    return {
-        "categories": categories,
-        "total_questions": total_questions
-    }
+    # 直接读取物化计数器 (进程内快照 + ETag)，不再对 dataset_metas 做 GROUP BY / SUM
+    body, etag = CatalogStatsService(session).get_cached()
+    return etag_response(request, body, etag)
+
+@router.post("/stats/rebuild")
+def rebuild_dataset_stats(
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_admin) # <--- 🔒 仅管理员可执行全量修复
+):
+    counters = CatalogStatsService(session).rebuild()
+    session.commit()
+    return {"ok": True, "counters": len(counters)}
 
 @router.post("/", response_model=DatasetMetaRead)
 def create_dataset(
@@ -296,15 +297,17 @@ def create_dataset(
     # 引用内部 helper 函数
     from app.api.v1.datasets import _handle_zip_upload, _process_and_save_file, _extract_metric_name, _flatten_row
 
-    # 1. 检查或创建元数据
+    stats_service = CatalogStatsService(session)
+
+    # 1. 检查或创建元数据 (整个导入在一个事务内完成，统计计数器随最终 commit 一并生效)
     statement = select(DatasetMeta).where(DatasetMeta.name == name)
     meta = session.exec(statement).first()
+    stats_before = stats_service.contribution(meta)
     
     if not meta:
         meta = DatasetMeta(name=name, category=category, modality=modality, description=description)
         session.add(meta)
-        session.commit()
-        session.refresh(meta)
+        session.flush()
     else:
         if meta.is_deleted:
             meta.is_deleted = False
@@ -312,7 +315,7 @@ def create_dataset(
         meta.modality = modality
         if description: meta.description = description
         session.add(meta)
-        session.commit()
+        session.flush()
     
     # 2. 保存并处理文件
     file_ext = os.path.splitext(file.filename)[1].lower()
@@ -368,7 +371,7 @@ def create_dataset(
     if current_count > 0:
         meta.data_count = current_count
         session.add(meta)
-        session.commit()
+        session.flush()
 
     abs_path = os.path.abspath(final_file_path)
 
@@ -419,6 +422,11 @@ def create_dataset(
     if processed_count == 0 and errors:
         raise HTTPException(status_code=400, detail=f"导入失败: {errors[0]}")
 
+    # 5. 同步目录统计计数器 (与数据写入同一事务)
+    session.flush()
+    session.expire(meta, ["configs"])
+    stats_service.apply(stats_before, stats_service.contribution(meta))
+
     session.commit()
     session.refresh(meta)
     return meta
@@ -491,15 +499,92 @@ def delete_dataset(
         except Exception as e:
             print(f"[Warning] 删除文件失败 {file_path}: {e}")
             
+    stats_service = CatalogStatsService(session)
+    stats_before = stats_service.contribution(meta)
+
     meta.is_deleted = True
     session.add(meta)
+    stats_service.apply(stats_before, stats_service.contribution(meta))
     session.commit()
     return {"ok": True, "detail": "Dataset deleted"}
 
+# /configs 允许投影的字段 (DatasetConfig 的表字段)
+CONFIG_FIELDS = list(DatasetConfig.__table__.columns.keys())
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
 @router.get("/configs")
 def get_all_dataset_configs(
+    request: Request,
+    fields: Optional[str] = None,
+    meta_id: Optional[int] = None,
+    category: Optional[str] = None,
+    mode: Optional[str] = None,
+    task_type: Optional[str] = None,
+    cursor: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=5000),
+    format: Optional[str] = None,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    configs = session.exec(select(DatasetConfig)).all()
-    return configs
\ No newline at end of file
+    """
+    - fields: 逗号分隔的字段投影，如 fields=id,config_name,mode (id 始终返回)
+    - meta_id / category / mode / task_type: 过滤条件
+    - cursor + limit: 按 id 升序的游标分页，下一页游标通过 X-Next-Cursor 响应头返回
+    - format=ndjson 或 Accept: application/x-ndjson: 逐行流式输出
+    """
+    # 1. 字段投影 (不请求大字段时不会从库中读取 cfg 文本)
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in selected if f not in CONFIG_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"未知字段: {', '.join(unknown)}")
+        if "id" not in selected:
+            selected.insert(0, "id")
+    else:
+        selected = CONFIG_FIELDS
+    columns = [getattr(DatasetConfig, f) for f in selected]
+
+    # 2. 过滤条件
+    conditions = []
+    if meta_id is not None:
+        conditions.append(DatasetConfig.meta_id == meta_id)
+    if mode:
+        conditions.append(DatasetConfig.mode == mode)
+    if task_type:
+        conditions.append(DatasetConfig.task_type == task_type)
+    if cursor is not None:
+        conditions.append(DatasetConfig.id > cursor)
+
+    def _filtered(statement):
+        if category:
+            statement = statement.join(DatasetMeta, DatasetMeta.id == DatasetConfig.meta_id)\
+                .where(DatasetMeta.category == category)
+        return statement.where(*conditions).order_by(DatasetConfig.id)
+
+    statement = _filtered(select(*columns))
+
+    # 3. 游标分页：只用主键探测下一页是否存在
+    headers = {}
+    if limit:
+        boundary = session.exec(
+            _filtered(select(DatasetConfig.id)).offset(limit - 1).limit(2)
+        ).all()
+        if len(boundary) == 2:
+            headers["X-Next-Cursor"] = str(boundary[0])
+        statement = statement.limit(limit)
+
+    # 4. NDJSON 流式输出：逐行序列化，不构造完整列表
+    wants_ndjson = format == "ndjson" or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+    if wants_ndjson:
+        def ndjson_generator():
+            try:
+                result = session.execute(statement.execution_options(yield_per=500))
+                for row in result.mappings():
+                    yield fast_json.dumps(dict(row)) + b"\n"
+            finally:
+                session.close()
+
+        return StreamingResponse(ndjson_generator(), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+    rows = [dict(row) for row in session.execute(statement).mappings()]
+    return ORJSONResponse(content=rows, headers=headers)
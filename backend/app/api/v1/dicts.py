@@ -1,25 +1,31 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlmodel import Session, select
 from app.core.database import get_session
 from app.models.dict import DictItem
 from app.schemas.dict_schema import DictItemCreate, DictItemRead, DictItemUpdate
 from app.deps import get_current_active_user, get_current_admin
+from app.core.cache import resource_cache, cached_json_response
 
 router = APIRouter()
 
 # 获取字典列表（支持按分类筛选）
 @router.get("/", response_model=List[DictItemRead])
 def read_dicts(
+    request: Request,
     category: str = None,
     session: Session = Depends(get_session),
     current_user = Depends(get_current_active_user)
 ):
-    query = select(DictItem)
-    if category:
-        query = query.where(DictItem.category == category)
-    query = query.order_by(DictItem.category, DictItem.sort_order)
-    return session.exec(query).all()
+    def load():
+        query = select(DictItem)
+        if category:
+            query = query.where(DictItem.category == category)
+        query = query.order_by(DictItem.category, DictItem.sort_order)
+        return [DictItemRead.model_validate(item) for item in session.exec(query).all()]
+
+    # 按分类分别缓存
+    return cached_json_response(request, "dicts", category or "*", load)
 
 # 创建字典
 @router.post("/", response_model=DictItemRead)
@@ -39,6 +45,7 @@ def create_dict(
     session.add(db_item)
     session.commit()
     session.refresh(db_item)
+    resource_cache.bump("dicts")
     return db_item
 
 # 删除字典
@@ -53,4 +60,5 @@ def delete_dict(
         raise HTTPException(status_code=404, detail="字典项不存在")
     session.delete(item)
     session.commit()
+    resource_cache.bump("dicts")
     return {"ok": True}
\ No newline at end of file
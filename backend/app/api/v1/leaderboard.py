@@ -0,0 +1,144 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session, select, func
+
+from app.core.database import get_session
+from app.models.llm_model import LLMModel
+from app.models.leaderboard import LeaderboardEntry, LeaderboardCategoryScore
+from app.schemas.leaderboard_schema import LeaderboardModelPage, LeaderboardEntryPage
+from app.services.leaderboard_service import LeaderboardService, OVERALL_CATEGORY
+from app.deps import get_current_active_user, get_current_admin
+
+router = APIRouter()
+
+MODEL_SORT_FIELDS = {
+    "score": LeaderboardCategoryScore.score,
+    "entry_count": LeaderboardCategoryScore.entry_count,
+    "updated_at": LeaderboardCategoryScore.updated_at,
+}
+
+ENTRY_SORT_FIELDS = {
+    "latest_score": LeaderboardEntry.latest_score,
+    "best_score": LeaderboardEntry.best_score,
+    "normalized_score": LeaderboardEntry.normalized_score,
+    "latest_at": LeaderboardEntry.latest_at,
+}
+
+
+def _ordered(column, order: str, tie_breaker):
+    # 同分时按 id 排序，保证翻页结果稳定
+    if order == "asc":
+        return [column.asc(), tie_breaker.asc()]
+    return [column.desc(), tie_breaker.asc()]
+
+
+# ==========================================
+# 1. 能力维度榜单 (默认 Overall)
+# ==========================================
+@router.get("/", response_model=LeaderboardModelPage)
+def read_leaderboard(
+    category: str = OVERALL_CATEGORY,
+    sort: str = Query("score", pattern="^(score|entry_count|updated_at)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=200),
+    session: Session = Depends(get_session),
+    current_user = Depends(get_current_active_user)
+):
+    base = (
+        select(LeaderboardCategoryScore, LLMModel.name)
+        .join(LLMModel, LLMModel.id == LeaderboardCategoryScore.model_id)
+        .where(LeaderboardCategoryScore.category == category)
+    )
+    total = session.exec(
+        select(func.count(LeaderboardCategoryScore.id))
+        .join(LLMModel, LLMModel.id == LeaderboardCategoryScore.model_id)
+        .where(LeaderboardCategoryScore.category == category)
+    ).one()
+
+    offset = (page - 1) * page_size
+    rows = session.exec(
+        base.order_by(*_ordered(MODEL_SORT_FIELDS[sort], order, LeaderboardCategoryScore.id))
+        .offset(offset)
+        .limit(page_size)
+    ).all()
+
+    items = [
+        {
+            "rank": offset + i + 1,
+            "model_id": row.model_id,
+            "model_name": name,
+            "category": row.category,
+            "score": row.score,
+            "entry_count": row.entry_count,
+            "updated_at": row.updated_at,
+        }
+        for i, (row, name) in enumerate(rows)
+    ]
+    return {"total": total, "page": page, "page_size": page_size, "items": items}
+
+
+@router.get("/categories")
+def read_leaderboard_categories(
+    session: Session = Depends(get_session),
+    current_user = Depends(get_current_active_user)
+):
+    return LeaderboardService(session).categories()
+
+
+# ==========================================
+# 2. 数据集榜单 (最新 / 最佳成绩)
+# ==========================================
+@router.get("/entries", response_model=LeaderboardEntryPage)
+def read_leaderboard_entries(
+    config_id: Optional[int] = None,
+    metric: Optional[str] = None,
+    model_id: Optional[int] = None,
+    category: Optional[str] = None,
+    sort: str = Query("latest_score", pattern="^(latest_score|best_score|normalized_score|latest_at)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=200),
+    session: Session = Depends(get_session),
+    current_user = Depends(get_current_active_user)
+):
+    conditions = []
+    if config_id is not None:
+        conditions.append(LeaderboardEntry.dataset_config_id == config_id)
+    if metric:
+        conditions.append(LeaderboardEntry.metric_name == metric)
+    if model_id is not None:
+        conditions.append(LeaderboardEntry.model_id == model_id)
+    if category:
+        conditions.append(LeaderboardEntry.category == category)
+
+    total = session.exec(
+        select(func.count(LeaderboardEntry.id))
+        .join(LLMModel, LLMModel.id == LeaderboardEntry.model_id)
+        .where(*conditions)
+    ).one()
+
+    rows = session.exec(
+        select(LeaderboardEntry, LLMModel.name)
+        .join(LLMModel, LLMModel.id == LeaderboardEntry.model_id)
+        .where(*conditions)
+        .order_by(*_ordered(ENTRY_SORT_FIELDS[sort], order, LeaderboardEntry.id))
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+    ).all()
+
+    items = [{**entry.model_dump(), "model_name": name} for entry, name in rows]
+    return {"total": total, "page": page, "page_size": page_size, "items": items}
+
+
+@router.post("/rebuild")
+def rebuild_leaderboard(
+    session: Session = Depends(get_session),
+    current_user = Depends(get_current_admin)
+):
+    """
+    全量重算排行榜 (修复用)
+    """
+    count = LeaderboardService(session).rebuild()
+    session.commit()
+    return {"status": "success", "entries": count}
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends, Body
+from fastapi import APIRouter, HTTPException, Depends, Body, Request, Query
+from fastapi.responses import ORJSONResponse
 from sqlmodel import Session, select
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 
 from app.core.database import get_session
 from app.models.llm_model import LLMModel
-from app.schemas.model_schema import ModelCreate, ModelRead
+from app.schemas.model_schema import ModelCreate, ModelRead, ModelTrendResponse
+from app.services.trend_service import score_trend, DEFAULT_MAX_POINTS
+from app.core.cache import resource_cache, cached_json_response
 
 from app.deps import get_current_active_user, get_current_admin
 from app.models.user import User
@@ -39,6 +43,7 @@ def create_model(
     session.add(db_model)
     session.commit()      
     session.refresh(db_model) 
+    resource_cache.bump("models")
     
     return db_model
 
@@ -48,11 +53,15 @@ def create_model(
 # ==========================================
 @router.get("/", response_model=List[ModelRead])
 def read_models(
+    request: Request,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_active_user) # <--- 仅需登录
 ):
-    models = session.exec(select(LLMModel)).all()
-    return models
+    def load():
+        models = session.exec(select(LLMModel)).all()
+        return [ModelRead.model_validate(m) for m in models]
+
+    return cached_json_response(request, "models", "all", load)
 
 # ==========================================
 # 接口 3: 删除模型
@@ -74,9 +83,33 @@ def delete_model(
     # 3. 删除并提交
     session.delete(model)
     session.commit()
+    resource_cache.bump("models")
     
     return {"ok": True, "message": f"Model {model.name} deleted"}
 
+# ==========================================
+# 接口 4: 分数趋势 (GET /api/v1/models/{model_id}/trend)
+# 🔒 权限: 登录用户 (User/Admin)
+# ==========================================
+@router.get("/{model_id}/trend", response_model=ModelTrendResponse)
+def read_model_trend(
+    model_id: int,
+    config_id: int,
+    metric: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    max_points: int = Query(DEFAULT_MAX_POINTS, ge=3, le=5000),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user) # <--- 仅需登录
+):
+    """
+    模型在某个数据集配置 / 指标上跨任务的分数变化 (不要求同一评测方案)
+    历史较长时按 max_points 降采样，保留突变点
+    """
+    if not session.get(LLMModel, model_id):
+        raise HTTPException(status_code=404, detail="Model not found")
+    return ORJSONResponse(score_trend(session, model_id, config_id, metric, start, end, max_points))
+
 # 1. 校验名称唯一性
 # 🔒 权限: 仅管理员 (通常是创建时的辅助接口)
 @router.post("/validate/name")
@@ -1,12 +1,13 @@
 import json
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlmodel import Session, select
 from sqlalchemy.orm import selectinload 
 
 from app.core.database import get_session
 from app.models.dataset import DatasetConfig
-from app.models.scheme import EvaluationScheme
+from app.models.scheme import EvaluationScheme, SchemeDatasetLink
+from app.core.cache import resource_cache, cached_json_response
 from app.schemas.scheme_schema import EvaluationSchemeCreate, EvaluationSchemeRead
 
 # === 引入权限依赖 ===
@@ -47,6 +48,7 @@ def create_scheme(
         
     session.commit()
     session.refresh(db_scheme)
+    resource_cache.bump("schemes")
     
     return EvaluationSchemeRead(
         id=db_scheme.id,
@@ -59,23 +61,40 @@ def create_scheme(
 # 🔒 权限: 登录用户
 @router.get("/", response_model=List[EvaluationSchemeRead])
 def read_schemes(
+    request: Request,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_active_user) # <--- 仅需登录
 ):
-    # 🌟 修改点：只查询 is_active 为 True 的方案
-    statement = select(EvaluationScheme).where(EvaluationScheme.is_active == True).options(selectinload(EvaluationScheme.configs))
-    schemes = session.exec(statement).all()
-    
-    results = []
-    for s in schemes:
-        results.append(EvaluationSchemeRead(
-            id=s.id,
-            name=s.name,
-            description=s.description,
-            dataset_config_ids=[c.id for c in s.configs],
-            created_at=s.created_at
-        ))
-    return results
+    def load():
+        # 🌟 修改点：只查询 is_active 为 True 的方案
+        schemes = session.exec(
+            select(EvaluationScheme.id, EvaluationScheme.name, EvaluationScheme.description, EvaluationScheme.created_at)
+            .where(EvaluationScheme.is_active == True)
+        ).all()
+
+        # 只需要配置 ID：直接查中间表，不加载完整的 DatasetConfig
+        links = session.exec(
+            select(SchemeDatasetLink.scheme_id, SchemeDatasetLink.dataset_config_id)
+            .join(EvaluationScheme, EvaluationScheme.id == SchemeDatasetLink.scheme_id)
+            .where(EvaluationScheme.is_active == True)
+            .order_by(SchemeDatasetLink.scheme_id, SchemeDatasetLink.dataset_config_id)
+        ).all()
+        config_ids = {}
+        for scheme_id, config_id in links:
+            config_ids.setdefault(scheme_id, []).append(config_id)
+
+        return [
+            EvaluationSchemeRead(
+                id=s.id,
+                name=s.name,
+                description=s.description,
+                dataset_config_ids=config_ids.get(s.id, []),
+                created_at=s.created_at
+            )
+            for s in schemes
+        ]
+
+    return cached_json_response(request, "schemes", "active", load)
 
 # 🔒 权限: ⚠️ 仅管理员 (软删除)
 @router.delete("/{scheme_id}")
@@ -93,5 +112,6 @@ def delete_scheme(
     scheme.is_active = False
     session.add(scheme)
     session.commit()
+    resource_cache.bump("schemes")
     
     return {"ok": True}
\ No newline at end of file
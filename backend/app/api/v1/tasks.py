@@ -1,22 +1,34 @@
 import json
+import re
 import os
 import time
 import glob
-import asyncio
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from fastapi.responses import StreamingResponse, FileResponse  # 🌟 新增引入
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Response, Header
+from fastapi.responses import StreamingResponse, FileResponse, ORJSONResponse  # 🌟 新增引入
 from sqlmodel import Session, select, func
 from sqlalchemy.orm import selectinload
 
 from app.core.database import get_session
+from app.core.task_events import publish_task_event
 from app.models.task import EvaluationTask
 from app.models.links import TaskDatasetLink
 from app.models.scheme import EvaluationScheme 
 from app.models.dataset import DatasetConfig
-from app.schemas.task_schema import TaskCreate, TaskRead, TaskPagination, TaskCompareRequest, TaskCompareResponse
+from app.models.llm_model import LLMModel
+from app.models.result import EvaluationResult
+from app.schemas.task_schema import TaskCreate, TaskRead, TaskListPagination, TaskCompareRequest, TaskCompareResponse
 from app.worker.celery_app import run_evaluation_task
 from app.services.task_service import TaskService
+from app.services.sample_store import SampleStore, diff_samples
+from app.services.log_stream import tail_log_events, DEFAULT_TAIL_LINES
+from app.services.task_profile import load_profiles, TIMINGS, THROUGHPUT, RESOURCES
+from app.services.status_stream import task_status_events, MAX_STREAM_TASK_IDS
+from app.services.export_service import (
+    EXPORT_FORMATS, RESULT_EXPORT_SCHEMA, iter_result_batches, compare_matrix_batches, stream_export
+)
+from app.utils.scoring import normalized_score_sql
 
 from app.deps import get_current_active_user, get_current_admin
 from app.models.user import User
@@ -66,45 +78,236 @@ def create_task(
         session.add(link)
     
     session.commit()
+    # 广播新任务，其他页面/用户的任务列表据此刷新
+    publish_task_event(db_task.id, "pending", 0)
     
     run_evaluation_task.delay(db_task.id)
     
     return db_task
 
-@router.get("/", response_model=TaskPagination) 
+def _task_conditions(
+    status: Optional[str] = None,
+    model_id: Optional[int] = None,
+    scheme_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    task_ids: Optional[List[int]] = None,
+):
+    """
+    任务列表 / 导出共用的过滤条件
+    """
+    conditions = []
+    if status:
+        conditions.append(EvaluationTask.status.in_([s.strip() for s in status.split(",") if s.strip()]))
+    if model_id is not None:
+        conditions.append(EvaluationTask.model_id == model_id)
+    if scheme_id is not None:
+        conditions.append(EvaluationTask.scheme_id == scheme_id)
+    if created_from:
+        conditions.append(EvaluationTask.created_at >= created_from)
+    if created_to:
+        conditions.append(EvaluationTask.created_at <= created_to)
+    if task_ids:
+        conditions.append(EvaluationTask.id.in_(task_ids))
+    return conditions
+
+@router.get("/", response_model=TaskListPagination) 
 def read_tasks(
     page: int = 1,        
-    page_size: int = 10,  
+    page_size: int = Query(10, ge=1, le=1000),  
+    status: Optional[str] = None,       # 支持逗号分隔多个状态，如 running,pending
+    model_id: Optional[int] = None,
+    scheme_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[int] = None,       # keyset 分页：上一页返回的 next_cursor
+    with_total: bool = True,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_active_user) # <--- 仅需登录
 ):
-    offset = (page - 1) * page_size
-    count_statement = select(func.count()).select_from(EvaluationTask)
-    total = session.exec(count_statement).one()
+    # 1. 过滤条件 (均命中 evaluation_tasks 上的 (列, id) 复合索引)
+    conditions = _task_conditions(status, model_id, scheme_id, created_from, created_to)
 
+    total = None
+    if with_total:
+        count_statement = select(func.count(EvaluationTask.id)).where(*conditions)
+        total = session.exec(count_statement).one()
+
+    # 2. 精简投影：不读取 result_summary 等大字段
     statement = (
-        select(EvaluationTask, EvaluationScheme.name)
+        select(
+            EvaluationTask.id,
+            EvaluationTask.model_id,
+            EvaluationTask.scheme_id,
+            EvaluationTask.status,
+            EvaluationTask.progress,
+            EvaluationTask.datasets_list,
+            EvaluationTask.created_at,
+            EvaluationTask.finished_at,
+            LLMModel.name.label("model_name"),
+            EvaluationScheme.name.label("scheme_name"),
+        )
+        .outerjoin(LLMModel, EvaluationTask.model_id == LLMModel.id)
         .outerjoin(EvaluationScheme, EvaluationTask.scheme_id == EvaluationScheme.id)
-        .offset(offset)
-        .limit(page_size)
+        .where(*conditions)
         .order_by(EvaluationTask.id.desc())
+        .limit(page_size)
     )
-    
-    results = session.exec(statement).all()
-    
-    tasks_with_details = []
-    for task, s_name in results:
-        task_dict = task.dict()
-        task_dict["scheme_name"] = s_name 
-        tasks_with_details.append(task_dict)
-        
+    if cursor is not None:
+        statement = statement.where(EvaluationTask.id < cursor)
+    else:
+        statement = statement.offset((page - 1) * page_size)
+
+    rows = session.exec(statement).all()
+
+    # 3. 成绩概览：仅对当前页任务做一次分组聚合
+    task_ids = [row.id for row in rows]
+    headline = {}
+    if task_ids:
+        norm = normalized_score_sql(EvaluationResult.score, EvaluationResult.metric_name)
+        headline = dict(session.exec(
+            select(EvaluationResult.task_id, func.avg(norm))
+            .where(EvaluationResult.task_id.in_(task_ids))
+            .group_by(EvaluationResult.task_id)
+        ).all())
+
+    items = []
+    for row in rows:
+        item = dict(row._mapping)
+        if row.finished_at and row.created_at:
+            item["duration_seconds"] = round((row.finished_at - row.created_at).total_seconds(), 2)
+        score = headline.get(row.id)
+        item["score"] = round(min(score, 100.0), 1) if score is not None else None
+        items.append(item)
+
+    next_cursor = task_ids[-1] if len(task_ids) == page_size else None
+
     return {
         "total": total,
         "page": page,
         "page_size": page_size,
-        "items": tasks_with_details
+        "items": items,
+        "next_cursor": next_cursor
     }
 
+# ==========================================
+# 流式导出 (CSV / Parquet)
+# ==========================================
+@router.get("/export")
+def export_tasks(
+    kind: str = Query("results", pattern="^(results|compare)$"),
+    format: str = Query("csv", pattern="^(csv|parquet)$"),
+    task_ids: Optional[str] = None,     # 逗号分隔；kind=compare 时必填
+    status: Optional[str] = None,
+    model_id: Optional[int] = None,
+    scheme_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    - kind=results: 按任务过滤条件导出原始 EvaluationResult 行 (服务端游标分批读取)
+    - kind=compare: 导出多任务对比矩阵
+    """
+    try:
+        ids = [int(x) for x in task_ids.split(",") if x.strip()] if task_ids else []
+    except ValueError:
+        raise HTTPException(status_code=400, detail="task_ids 格式错误")
+
+    media_type, ext = EXPORT_FORMATS[format]
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    if kind == "compare":
+        compare = TaskService(session).compare_tasks(ids)
+        session.close()
+        schema, batches = compare_matrix_batches(compare, ids)
+        filename = f"compare_{'_'.join(map(str, ids))}_{stamp}.{ext}"
+        body = stream_export(format, schema, batches)
+    else:
+        conditions = _task_conditions(status, model_id, scheme_id, created_from, created_to, ids)
+        filename = f"results_{stamp}.{ext}"
+
+        def result_stream():
+            try:
+                yield from stream_export(format, RESULT_EXPORT_SCHEMA, iter_result_batches(session, conditions))
+            finally:
+                session.close()
+
+        body = result_stream()
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+# ==========================================
+# 逐样本结果 (Parquet 列式存储)
+# ==========================================
+@router.get("/samples/diff")
+def diff_task_samples(
+    base_task_id: int,
+    target_task_id: int,
+    config_id: int,
+    kind: str = Query("regressed", pattern="^(regressed|improved|changed)$"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=1000),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    样本级对比，例如 kind=regressed: base 任务答对而 target 任务答错的题目
+    """
+    for tid in (base_task_id, target_task_id):
+        if not session.get(EvaluationTask, tid):
+            raise HTTPException(status_code=404, detail=f"Task {tid} not found")
+        if not SampleStore(tid).exists():
+            raise HTTPException(status_code=404, detail=f"Task {tid} has no per-sample records")
+    return ORJSONResponse(diff_samples(base_task_id, target_task_id, config_id, kind, offset, limit))
+
+# ==========================================
+# 🌟 任务状态推送 (SSE，替代前端轮询)
+# ==========================================
+@router.get("/stream")
+def stream_task_status(
+    task_ids: Optional[str] = None,     # 逗号分隔；不传时推送所有任务的变化
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Server-Sent Events:
+    - snapshot: 连接时的当前状态 {"tasks": [...]} (未指定 task_ids 时为所有未结束的任务)
+    - status: 状态/进度变化 (TaskService 经 Redis 发布)，字段 task_id, status, progress, error_msg, ts
+    鉴权只在建立连接时查询一次，推送期间不查询数据库 (Redis 离线时退化为低频查库)
+    """
+    ids = None
+    if task_ids:
+        try:
+            ids = sorted({int(x) for x in task_ids.split(",") if x.strip()})
+        except ValueError:
+            raise HTTPException(status_code=400, detail="task_ids 格式错误，应为逗号分隔的整数")
+        if len(ids) > MAX_STREAM_TASK_IDS:
+            raise HTTPException(status_code=400, detail=f"单个连接最多订阅 {MAX_STREAM_TASK_IDS} 个任务")
+    bind = session.get_bind()
+    session.close()
+
+    def load_statuses(query_ids: Optional[List[int]]):
+        statement = select(EvaluationTask.id, EvaluationTask.status, EvaluationTask.progress, EvaluationTask.error_msg)
+        if query_ids is None:
+            statement = statement.where(EvaluationTask.status.in_(["pending", "running"]))
+        else:
+            statement = statement.where(EvaluationTask.id.in_(query_ids))
+        with Session(bind) as s:
+            rows = s.exec(statement.order_by(EvaluationTask.id)).all()
+        return [{"task_id": r.id, "status": r.status, "progress": r.progress, "error_msg": r.error_msg} for r in rows]
+
+    return StreamingResponse(
+        task_status_events(ids, load_statuses),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/{task_id}", response_model=TaskRead)
 def read_task(
     task_id: int, 
@@ -114,48 +317,101 @@ def read_task(
     task = session.get(EvaluationTask, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    return task
+    profiles = load_profiles(session, [task_id], [TIMINGS, THROUGHPUT, RESOURCES]).get(task_id, {})
+    resources = profiles.get(RESOURCES)
+    return TaskRead.model_validate(task, update={
+        "timings": profiles.get(TIMINGS),
+        "throughput": profiles.get(THROUGHPUT),
+        "resources": {"peaks": resources.get("peaks"), "alerts": resources.get("alerts")} if resources else None,
+    })
+
+@router.get("/{task_id}/resources")
+def read_task_resources(
+    task_id: int,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    子进程树资源采样：峰值、告警与按列存储的时间序列 (t, cpu, rss_mb, fds, threads, procs, sys_mem)
+    """
+    if not session.get(EvaluationTask, task_id):
+        raise HTTPException(status_code=404, detail="Task not found")
+    profile = load_profiles(session, [task_id], [RESOURCES]).get(task_id, {}).get(RESOURCES)
+    return ORJSONResponse(profile or {"peaks": {}, "alerts": [], "series": {}})
+
+@router.get("/{task_id}/samples")
+def read_task_samples(
+    task_id: int,
+    config_id: Optional[int] = None,
+    correct: Optional[bool] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=1000),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    分页读取单个配置的逐样本记录；不传 config_id 时返回包含样本的配置列表
+    """
+    if not session.get(EvaluationTask, task_id):
+        raise HTTPException(status_code=404, detail="Task not found")
+    store = SampleStore(task_id)
+    if not store.exists():
+        raise HTTPException(status_code=404, detail="No per-sample records for this task")
+    if config_id is None:
+        return {"config_ids": store.config_ids()}
+    return ORJSONResponse(store.page(config_id, correct, offset, limit))
 
 # ==========================================
-# 🌟 新增：实时日志流接口
+# 🌟 实时日志流接口 (SSE)
 # ==========================================
 @router.get("/{task_id}/log")
-async def get_task_log(
+def get_task_log(
     task_id: int, 
+    offset: Optional[int] = Query(None, ge=0),          # 从该字节位置续读 (上次收到的事件 id)
+    tail_lines: Optional[int] = Query(None, ge=0, le=100000),
+    tail_bytes: Optional[int] = Query(None, ge=0),
+    grep: Optional[str] = Query(None, max_length=200),  # 正则 (忽略大小写)，只推送匹配的行
+    last_event_id: Optional[str] = Header(None),        # EventSource 断线重连时自动携带
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    # 1. 确认任务存在
+    """
+    Server-Sent Events:
+    - status: 任务状态/进度 (Redis 订阅推送)
+    - window: 首次读取的起始 offset 与当时的文件大小
+    - log: 新增日志行，id 为下次续读的字节 offset
+    - end: 任务结束且日志已全部发送
+    未指定 offset / tail 参数时只发送末尾 DEFAULT_TAIL_LINES 行；文件增长由 inotify 唤醒，流式期间不查询数据库
+    """
+    if offset is None and last_event_id and last_event_id.isdigit():
+        offset = int(last_event_id)
+    if offset is None and tail_lines is None and tail_bytes is None:
+        tail_lines = DEFAULT_TAIL_LINES
+    try:
+        pattern = re.compile(grep, re.IGNORECASE) if grep else None
+    except re.error as e:
+        raise HTTPException(status_code=400, detail=f"grep 正则无效: {e}")
+
+    # 1. 确认任务存在 (同步接口在线程池中执行，不阻塞事件循环)
     task = session.get(EvaluationTask, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-        
-    workspace = os.path.join(os.getcwd(), "workspace", "tasks", f"task_{task_id}")
-    log_path = os.path.join(workspace, "output.log")
-    
-    async def log_generator():
-        retries = 0
-        while not os.path.exists(log_path):
-            if retries > 20: 
-                yield "Waiting for log file creation timeout...\n"
-                return
-            yield f"Waiting for logs... (task status: {task.status})\n"
-            await asyncio.sleep(0.5)
-            retries += 1
-            
-        with open(log_path, "r", encoding="utf-8", errors='replace') as f:
-            yield f.read()
-            while True:
-                line = f.readline()
-                if line:
-                    yield line
-                else:
-                    session.refresh(task)
-                    if task.status in ["success", "failed"]:
-                        break
-                    await asyncio.sleep(0.5)
-
-    return StreamingResponse(log_generator(), media_type="text/plain")
+    status = task.status
+    bind = session.get_bind()
+    session.close()
+
+    def load_status():
+        with Session(bind) as s:
+            row = s.exec(
+                select(EvaluationTask.status, EvaluationTask.progress).where(EvaluationTask.id == task_id)
+            ).first()
+        return {"status": row.status, "progress": row.progress} if row else None
+
+    return StreamingResponse(
+        tail_log_events(task_id, status, load_status, offset, tail_lines, tail_bytes, pattern),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # ... (delete_task 保持不变) ...
@@ -180,7 +436,8 @@ def compare_tasks_api(
     current_user: User = Depends(get_current_active_user)
 ):
     task_service = TaskService(session)
-    return task_service.compare_tasks(req.task_ids)
+    # 直接返回 orjson 序列化 (或缓存中) 的响应体，跳过 response_model 的逐字段校验与 jsonable_encoder
+    return Response(content=task_service.compare_tasks_json(req.task_ids), media_type="application/json")
 
 @router.get("/{task_id}/download")
 def download_task_report(
@@ -0,0 +1,288 @@
+import os
+import time
+import uuid
+import logging
+import hashlib
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+
+from app.utils.http_cache import build_etag, etag_response
+from app.utils import fast_json
+from app.core.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0"))
+INVALIDATION_CHANNEL = "llm_eval:cache:invalidate"
+
+# 兜底过期时间 (秒)：Redis 不可用时限制多 worker 之间的陈旧窗口
+CACHE_MAX_AGE = float(os.getenv("API_CACHE_MAX_AGE", "300"))
+
+# 任务对比结果缓存：进程内 LRU 条目数 / Redis 共享层的过期时间 (秒)
+COMPARE_CACHE_SIZE = int(os.getenv("COMPARE_CACHE_SIZE", "128"))
+COMPARE_CACHE_TTL = int(os.getenv("COMPARE_CACHE_TTL", "86400"))
+COMPARE_KEY_PREFIX = "llm_eval:compare"
+
+
+class ResourceCache:
+    """
+    按资源版本号管理的进程内响应缓存
+    - 写接口提交后调用 bump(resource)：本地版本号 +1，并通过 Redis 广播给其他 worker
+    - 读接口按 (resource, variant) 缓存序列化后的响应体与 ETag，版本号变化即失效
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = defaultdict(int)
+        # (resource, variant) -> (version, body, etag, stored_at)
+        self._entries: Dict[Tuple[str, str], Tuple[int, bytes, str, float]] = {}
+        self._origin = uuid.uuid4().hex
+        self._redis = None
+        self._listener: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ====================================================
+    # 版本号与缓存条目
+    # ====================================================
+    def version(self, resource: str) -> int:
+        with self._lock:
+            return self._versions[resource]
+
+    def get(self, resource: str, variant: str, version: int) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            entry = self._entries.get((resource, variant))
+        if entry is None:
+            record_cache(resource, False)
+            return None
+        entry_version, body, etag, stored_at = entry
+        if entry_version != version or time.monotonic() - stored_at > CACHE_MAX_AGE:
+            record_cache(resource, False)
+            return None
+        record_cache(resource, True)
+        return body, etag
+
+    def put(self, resource: str, variant: str, version: int, body: bytes) -> Tuple[bytes, str]:
+        etag = build_etag(body)
+        with self._lock:
+            # 计算期间版本已变化则不写入，避免把旧数据挂到新版本上
+            if self._versions[resource] == version:
+                self._entries[(resource, variant)] = (version, body, etag, time.monotonic())
+        return body, etag
+
+    def bump(self, resource: str, broadcast: bool = True):
+        with self._lock:
+            self._versions[resource] += 1
+            for key in [k for k in self._entries if k[0] == resource]:
+                del self._entries[key]
+        if broadcast:
+            self._publish(resource)
+
+    def clear(self):
+        with self._lock:
+            self._versions.clear()
+            self._entries.clear()
+
+    # ====================================================
+    # 跨 worker 失效广播 (Redis Pub/Sub)
+    # ====================================================
+    def _get_redis(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5)
+        return self._redis
+
+    def _publish(self, resource: str):
+        try:
+            self._get_redis().publish(INVALIDATION_CHANNEL, f"{self._origin}:{resource}")
+        except Exception as e:
+            logger.debug(f"Cache invalidation broadcast skipped ({resource}): {e}")
+
+    def start_listener(self):
+        if self._listener and self._listener.is_alive():
+            return
+        self._stop.clear()
+        self._listener = threading.Thread(target=self._listen_loop, name="cache-invalidation", daemon=True)
+        self._listener.start()
+
+    def stop_listener(self):
+        self._stop.set()
+
+    def _listen_loop(self):
+        import redis
+
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                client = redis.Redis.from_url(REDIS_URL, socket_connect_timeout=2)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                # 重新连上后无法得知断线期间漏掉的消息，整体失效一次
+                with self._lock:
+                    self._entries.clear()
+                backoff = 1.0
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if not message:
+                        continue
+                    data = message.get("data")
+                    if isinstance(data, bytes):
+                        data = data.decode("utf-8", errors="replace")
+                    origin, _, resource = str(data).partition(":")
+                    if resource and origin != self._origin:
+                        self.bump(resource, broadcast=False)
+                pubsub.close()
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener disconnected: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+
+resource_cache = ResourceCache()
+
+
+class CompareCache:
+    """
+    多任务对比结果缓存 (序列化后的响应体)
+    - 键：排序后的任务 id 集合 + 结果版本戳 (由调用方根据任务状态/结果行计算)，
+      任务重跑或删除后版本戳变化，旧条目不会再被命中
+    - 对比基准与雷达序列顺序取决于请求顺序，同一集合下按请求顺序分别保存响应体
+    - 两级：进程内有界 LRU + Redis 共享层 (多 worker 共用，带 TTL)；Redis 不可用时只用本地层
+    - invalidate_task(task_id)：主动清除包含该任务的本地条目与 Redis 条目
+    """
+
+    # Redis 出错后暂停访问的时间 (秒)，避免每次对比都等待连接超时
+    REDIS_RETRY_AFTER = 30.0
+
+    def __init__(self, maxsize: int = COMPARE_CACHE_SIZE, ttl: int = COMPARE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # 排序后的任务集合 -> (stamp, {请求顺序: body})
+        self._data: "OrderedDict[Tuple[int, ...], Tuple[str, Dict[str, bytes]]]" = OrderedDict()
+        self._redis = None
+        self._redis_down_until = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_stamp(parts: Iterable[Any]) -> str:
+        raw = "|".join(str(p) for p in parts)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _redis_key(ids: Tuple[int, ...], stamp: str) -> str:
+        return f"{COMPARE_KEY_PREFIX}:{'-'.join(map(str, ids))}:{stamp}"
+
+    @staticmethod
+    def _task_index_key(task_id: int) -> str:
+        return f"{COMPARE_KEY_PREFIX}:task:{task_id}"
+
+    # ====================================================
+    # 读写
+    # ====================================================
+    def get(self, task_ids: Sequence[int], stamp: str) -> Optional[bytes]:
+        ids, order = tuple(sorted(task_ids)), ",".join(map(str, task_ids))
+        with self._lock:
+            entry = self._data.get(ids)
+            if entry is not None and entry[0] == stamp and order in entry[1]:
+                self._data.move_to_end(ids)
+                self.hits += 1
+                record_cache("compare", True)
+                return entry[1][order]
+
+        body = self._redis_call(lambda r: r.hget(self._redis_key(ids, stamp), order))
+        with self._lock:
+            if body is None:
+                self.misses += 1
+                record_cache("compare", False)
+                return None
+            self.hits += 1
+            self._store(ids, stamp, order, body)
+        record_cache("compare", True)
+        return body
+
+    def put(self, task_ids: Sequence[int], stamp: str, body: bytes):
+        ids, order = tuple(sorted(task_ids)), ",".join(map(str, task_ids))
+        with self._lock:
+            self._store(ids, stamp, order, body)
+
+        def write(r):
+            key = self._redis_key(ids, stamp)
+            pipe = r.pipeline()
+            pipe.hset(key, order, body)
+            pipe.expire(key, self.ttl)
+            # 反向索引：任务 -> 包含它的对比键，用于主动失效
+            for tid in ids:
+                pipe.sadd(self._task_index_key(tid), key)
+                pipe.expire(self._task_index_key(tid), self.ttl)
+            pipe.execute()
+
+        self._redis_call(write)
+
+    def _store(self, ids: Tuple[int, ...], stamp: str, order: str, body: bytes):
+        entry = self._data.get(ids)
+        if entry is None or entry[0] != stamp:
+            entry = (stamp, {})
+            self._data[ids] = entry
+        entry[1][order] = body
+        self._data.move_to_end(ids)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate_task(self, task_id: int):
+        with self._lock:
+            for ids in [ids for ids in self._data if task_id in ids]:
+                del self._data[ids]
+
+        def drop(r):
+            index_key = self._task_index_key(task_id)
+            keys = r.smembers(index_key)
+            r.delete(index_key, *keys)
+
+        self._redis_call(drop)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    # ====================================================
+    # Redis 共享层 (尽力而为，失败时退化为仅本地缓存)
+    # ====================================================
+    def _redis_call(self, fn: Callable):
+        if time.monotonic() < self._redis_down_until:
+            return None
+        try:
+            if self._redis is None:
+                import redis
+                self._redis = redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5)
+            return fn(self._redis)
+        except Exception as e:
+            logger.debug(f"Compare cache Redis tier unavailable: {e}")
+            self._redis_down_until = time.monotonic() + self.REDIS_RETRY_AFTER
+            return None
+
+
+compare_cache = CompareCache()
+
+
+def cached_json_response(
+    request: Request,
+    resource: str,
+    variant: str,
+    loader: Callable[[], Any],
+) -> Response:
+    """
+    读接口的通用缓存入口：命中则直接返回缓存的响应体，并支持 If-None-Match -> 304
+    """
+    version = resource_cache.version(resource)
+    hit = resource_cache.get(resource, variant, version)
+    if hit is None:
+        body = fast_json.dumps(loader())
+        hit = resource_cache.put(resource, variant, version, body)
+    body, etag = hit
+    return etag_response(request, body, etag)
@@ -1,5 +1,8 @@
 import os
-from sqlmodel import Session, create_engine
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.core.metrics import instrument_engine
+from app.core.query_profiler import install_query_profiler
 
 # 优先从环境变量获取，否则使用默认的 SQLite
 # Docker 中我们将设置为: mysql+pymysql://user:password@db:3306/opencompass_db
@@ -9,8 +12,21 @@ connect_args = {}
 if "sqlite" in DATABASE_URL:
     connect_args = {"check_same_thread": False}
 
-engine = create_engine(DATABASE_URL, echo=True, connect_args=connect_args)
+# SQL 原文日志默认关闭 (生产环境日志量过大)；语句数/耗时/慢查询由 query_profiler 统计
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() in ("1", "true", "yes")
+
+engine = create_engine(DATABASE_URL, echo=SQL_ECHO, connect_args=connect_args)
+instrument_engine(engine)
+install_query_profiler(engine)
 
 def get_session():
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+def ensure_indexes():
+    """
+    create_all 只会为新表建索引；对已存在的表补建模型中新声明的索引
+    """
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
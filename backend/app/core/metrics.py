@@ -0,0 +1,243 @@
+import os
+import time
+import logging
+from typing import Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event, text
+
+logger = logging.getLogger(__name__)
+
+# 多进程部署 (多个 uvicorn worker / Celery prefork) 时设置该目录，各进程的指标写入共享文件后汇总
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Celery 队列名 (Redis broker 下每个队列是一个 list)
+CELERY_QUEUES = [q.strip() for q in os.getenv("CELERY_QUEUES", "celery").split(",") if q.strip()]
+
+# ====================================================
+# 1. 指标定义
+# ====================================================
+HTTP_REQUEST_DURATION = Histogram(
+    "llm_eval_http_request_duration_seconds",
+    "API 请求耗时 (到响应头发出为止，流式接口不计传输时间)",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+DB_QUERY_DURATION = Histogram(
+    "llm_eval_db_query_duration_seconds",
+    "数据库语句耗时 (_count 即语句数)",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+STAGE_DURATION = Histogram(
+    "llm_eval_task_stage_duration_seconds",
+    "评测任务各阶段耗时",
+    ["stage"],
+    buckets=(0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200, 14400),
+)
+
+MODEL_SAMPLES = Counter("llm_eval_model_samples", "模型已评测的样本数", ["model"])
+MODEL_TOKENS = Counter("llm_eval_model_tokens", "模型已生成/处理的 token 数", ["model"])
+MODEL_SAMPLES_PER_SECOND = Gauge(
+    "llm_eval_model_samples_per_second", "模型最近一次任务的推理吞吐 (样本/秒)", ["model"],
+    multiprocess_mode="mostrecent",
+)
+MODEL_TOKENS_PER_SECOND = Gauge(
+    "llm_eval_model_tokens_per_second", "模型最近一次任务的推理吞吐 (token/秒)", ["model"],
+    multiprocess_mode="mostrecent",
+)
+
+DB_REQUEST_QUERIES = Histogram(
+    "llm_eval_db_queries_per_request",
+    "单个 API 请求执行的数据库语句数",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144),
+)
+DB_REQUEST_QUERY_SECONDS = Histogram(
+    "llm_eval_db_request_query_seconds",
+    "单个 API 请求内数据库语句的累计耗时",
+    ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+CACHE_REQUESTS = Counter("llm_eval_cache_requests", "缓存查询次数 (按命中/未命中)", ["cache", "result"])
+
+INGEST_ROWS = Counter("llm_eval_ingest_rows", "结果入库行数", ["kind"])
+INGEST_DURATION = Histogram(
+    "llm_eval_ingest_duration_seconds", "结果解析/入库耗时", ["kind"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+
+# ====================================================
+# 2. 记录入口 (调用方无需关心 prometheus_client)
+# ====================================================
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_ingest(kind: str, rows: int, seconds: float):
+    INGEST_ROWS.labels(kind).inc(rows)
+    INGEST_DURATION.labels(kind).observe(seconds)
+
+
+def record_request_queries(route: str, count: int, seconds: float):
+    DB_REQUEST_QUERIES.labels(route).observe(count)
+    DB_REQUEST_QUERY_SECONDS.labels(route).observe(seconds)
+
+
+def record_stage(stage: str, seconds: float):
+    STAGE_DURATION.labels(stage).observe(seconds)
+
+
+def record_model_throughput(model: str, samples: int, seconds: float, tokens: Optional[int] = None):
+    if samples:
+        MODEL_SAMPLES.labels(model).inc(samples)
+        if seconds > 0:
+            MODEL_SAMPLES_PER_SECOND.labels(model).set(samples / seconds)
+    if tokens:
+        MODEL_TOKENS.labels(model).inc(tokens)
+        if seconds > 0:
+            MODEL_TOKENS_PER_SECOND.labels(model).set(tokens / seconds)
+
+
+# ====================================================
+# 3. 数据库语句计时 (SQLAlchemy 事件)
+# ====================================================
+_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+
+def _operation(statement: str) -> str:
+    head = statement.lstrip()[:6].upper()
+    return head if head in _OPERATIONS else "OTHER"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("_metrics_query_start")
+    if starts:
+        DB_QUERY_DURATION.labels(_operation(statement)).observe(time.perf_counter() - starts.pop())
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None:
+        starts = conn.info.get("_metrics_query_start")
+        if starts:
+            starts.pop()
+
+
+def instrument_engine(engine):
+    if getattr(engine, "_metrics_instrumented", False):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    engine._metrics_instrumented = True
+
+
+# ====================================================
+# 4. HTTP 请求计时 (纯 ASGI 中间件，开销只有一次计时与一次直方图写入)
+# ====================================================
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        recorded = False
+
+        def observe(status_code: int):
+            # 使用路由模板而不是实际路径，避免 /tasks/123 这类标签无限增长
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.labels(scope["method"], path, str(status_code)).observe(time.perf_counter() - start)
+
+        async def send_wrapper(message):
+            nonlocal recorded
+            if message["type"] == "http.response.start" and not recorded:
+                recorded = True
+                observe(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            if not recorded:
+                recorded = True
+                observe(500)
+            raise
+
+
+# ====================================================
+# 5. 抓取时计算的指标 (队列积压 / 任务状态分布)
+# ====================================================
+class QueueCollector:
+    """
+    每次抓取时读取 Celery 队列长度 (Redis LLEN) 与各状态任务数 (一次分组查询)
+    """
+
+    def __init__(self, engine=None):
+        self.engine = engine
+
+    def collect(self):
+        depth = GaugeMetricFamily("llm_eval_celery_queue_depth", "Celery 队列中等待执行的消息数", labels=["queue"])
+        up = GaugeMetricFamily("llm_eval_celery_broker_up", "抓取时 broker 是否可达")
+        try:
+            from app.core.cache import REDIS_URL
+            import redis
+
+            client = redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5)
+            pipe = client.pipeline()
+            for queue in CELERY_QUEUES:
+                pipe.llen(queue)
+            for queue, length in zip(CELERY_QUEUES, pipe.execute()):
+                depth.add_metric([queue], length)
+            up.add_metric([], 1)
+            client.close()
+        except Exception as e:
+            logger.debug(f"Celery queue depth unavailable: {e}")
+            up.add_metric([], 0)
+        yield depth
+        yield up
+
+        if self.engine is not None:
+            tasks = GaugeMetricFamily("llm_eval_tasks", "各状态的评测任务数", labels=["status"])
+            try:
+                with self.engine.connect() as conn:
+                    rows = conn.execute(text("SELECT status, COUNT(*) FROM evaluation_tasks GROUP BY status")).all()
+                for status, count in rows:
+                    tasks.add_metric([status or "unknown"], count)
+            except Exception as e:
+                logger.debug(f"Task status metrics unavailable: {e}")
+            yield tasks
+
+
+_live_registry = CollectorRegistry(auto_describe=False)
+_queue_collector = QueueCollector()
+_live_registry.register(_queue_collector)
+
+
+def render_metrics(engine=None) -> Tuple[bytes, str]:
+    """
+    生成 /metrics 响应体：进程内 (或多进程汇总) 指标 + 抓取时计算的指标
+    """
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    _queue_collector.engine = engine
+    return generate_latest(registry) + generate_latest(_live_registry), CONTENT_TYPE_LATEST
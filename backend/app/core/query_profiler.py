@@ -0,0 +1,190 @@
+import os
+import time
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+
+from app.core.metrics import record_request_queries
+
+logger = logging.getLogger(__name__)
+
+# 慢查询阈值 (毫秒)，超过即记录 WARNING
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# 同一请求内同一语句执行超过该次数视为疑似 N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+# 单个请求的语句数超过该值时记录 WARNING (0 为不检查)
+REQUEST_QUERY_WARN = int(os.getenv("REQUEST_QUERY_WARN", "50"))
+# 在 SQL 前加上 /* route=... */ 注释，便于在数据库侧 (慢日志 / processlist) 定位来源接口
+SQL_COMMENT_ROUTE = os.getenv("SQL_COMMENT_ROUTE", "false").lower() in ("1", "true", "yes")
+# 响应头中返回 X-DB-Queries / X-DB-Time-Ms (开发环境排查用)
+SQL_PROFILE_HEADERS = os.getenv("SQL_PROFILE_HEADERS", "false").lower() in ("1", "true", "yes")
+
+
+class RequestQueryStats:
+    """
+    单个请求内的数据库语句统计 (通过 contextvar 传递，同步接口在线程池中执行时同样可见)
+    """
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope or {}
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+
+    @property
+    def route(self) -> str:
+        # 路由匹配后 scope["route"] 才可用；使用路由模板，避免 /tasks/123 这类标签无限增长
+        route = self.scope.get("route")
+        return f"{self.scope.get('method', '-')} {getattr(route, 'path', None) or 'unmatched'}"
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD):
+        return [(stmt, n) for stmt, n in self.statements.most_common(3) if n > threshold]
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_stats() -> Optional[RequestQueryStats]:
+    return _current.get()
+
+
+def _short(statement: str, limit: int = 300) -> str:
+    text = " ".join(statement.split())
+    return text if len(text) <= limit else text[:limit] + " ..."
+
+
+# ====================================================
+# 1. SQLAlchemy 事件
+# ====================================================
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_profiler_query_start", []).append(time.perf_counter())
+    stats = _current.get()
+    if SQL_COMMENT_ROUTE and stats is not None:
+        return f"/* route={stats.route} */ {statement}", parameters
+    return statement, parameters
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("_profiler_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        route = stats.route if stats is not None else "background"
+        logger.warning(f"🐢 Slow query ({elapsed * 1000:.0f} ms, route={route}): {_short(statement)}")
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None:
+        starts = conn.info.get("_profiler_query_start")
+        if starts:
+            starts.pop()
+
+
+def install_query_profiler(engine):
+    if getattr(engine, "_query_profiler_installed", False):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute, retval=True)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    engine._query_profiler_installed = True
+
+
+# ====================================================
+# 2. 请求级统计 (纯 ASGI 中间件)
+# ====================================================
+class QueryProfilerMiddleware:
+    """
+    为每个请求建立语句统计：按路由模板打标签，记录语句数/耗时直方图，
+    语句过多或疑似 N+1 时记录 WARNING
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope)
+        token = _current.set(stats)
+        finished = False
+
+        def finish():
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            record_request_queries(stats.route, stats.count, stats.seconds)
+            if REQUEST_QUERY_WARN and stats.count > REQUEST_QUERY_WARN:
+                logger.warning(f"⚠️ {stats.route} executed {stats.count} queries ({stats.seconds * 1000:.0f} ms)")
+            for statement, n in stats.repeated():
+                logger.warning(f"⚠️ Possible N+1 in {stats.route}: {n}x {_short(statement, 200)}")
+
+        async def send_wrapper(message):
+            # 在响应头发出时汇总 (流式接口只统计到首包为止)
+            if message["type"] == "http.response.start":
+                if SQL_PROFILE_HEADERS:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-db-queries", str(stats.count).encode()),
+                        (b"x-db-time-ms", f"{stats.seconds * 1000:.1f}".encode()),
+                    ]
+                finish()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finish()
+            _current.reset(token)
+
+
+# ====================================================
+# 3. 测试用：语句数预算
+# ====================================================
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@contextmanager
+def assert_max_queries(engine, limit: int, label: str = ""):
+    """
+    统计 with 块内在 engine 上执行的语句数，超过 limit 时抛出 QueryBudgetExceeded (列出全部语句)
+    用法: with assert_max_queries(engine, 3): client.get("/api/v1/tasks/1")
+    """
+    counter = QueryCounter()
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    event.listen(engine, "after_cursor_execute", _count)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "after_cursor_execute", _count)
+    if counter.count > limit:
+        detail = "\n".join(f"  {i + 1}. {_short(s, 200)}" for i, s in enumerate(counter.statements))
+        raise QueryBudgetExceeded(f"{label or 'block'} executed {counter.count} queries (budget {limit}):\n{detail}")
@@ -0,0 +1,160 @@
+import time
+import asyncio
+import logging
+import threading
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Optional, Set
+
+from app.core.cache import REDIS_URL
+from app.utils import fast_json
+
+logger = logging.getLogger(__name__)
+
+TASK_EVENTS_CHANNEL = "llm_eval:task_events"
+FINISHED_STATUSES = ("success", "failed")
+
+
+# ====================================================
+# 发布端 (TaskService / Celery worker，同步调用)
+# ====================================================
+class _Publisher:
+    """
+    任务状态变化广播，尽力而为：Redis 不可用时静默跳过，订阅端会退化为低频查库
+    """
+
+    # Redis 出错后暂停发布的时间 (秒)，避免每次状态更新都等待连接超时
+    RETRY_AFTER = 30.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._client = None
+        self._down_until = 0.0
+
+    def publish(self, payload: Dict[str, Any]):
+        if time.monotonic() < self._down_until:
+            return
+        try:
+            with self._lock:
+                if self._client is None:
+                    import redis
+                    self._client = redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5)
+            self._client.publish(TASK_EVENTS_CHANNEL, fast_json.dumps(payload))
+        except Exception as e:
+            logger.debug(f"Task event publish skipped ({payload.get('task_id')}): {e}")
+            self._down_until = time.monotonic() + self.RETRY_AFTER
+
+
+_publisher = _Publisher()
+
+
+def publish_task_event(task_id: int, status: str, progress: Optional[int] = None, **extra):
+    payload = {"task_id": task_id, "status": status, "progress": progress, "ts": time.time(), **extra}
+    _publisher.publish(payload)
+    return payload
+
+
+# ====================================================
+# 订阅端 (API 进程内，每个进程只有一个 Redis 订阅，按任务分发给各连接)
+# ====================================================
+class TaskSubscription:
+    """
+    单个连接的订阅：收到事件时写入队列并唤醒 wake (wake 也可由其他事件源共用，如日志文件变化)
+    """
+
+    def __init__(self, task_id: Optional[int], wake: Optional[asyncio.Event] = None, maxlen: int = 256):
+        self.task_id = task_id
+        self.wake = wake or asyncio.Event()
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=maxlen)
+        self.last: Optional[Dict[str, Any]] = None
+
+    def push(self, payload: Dict[str, Any]):
+        self.events.append(payload)
+        self.last = payload
+        self.wake.set()
+
+    def drain(self):
+        while self.events:
+            yield self.events.popleft()
+
+
+class TaskEventHub:
+    """
+    task_id -> 订阅集合；task_id 为 None 的订阅接收所有任务的事件
+    Redis 订阅在首个连接到来时于当前事件循环中启动，断线后指数退避重连
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[Optional[int], Set[TaskSubscription]] = defaultdict(set)
+        self._runner: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Redis 订阅是否在线；离线时订阅方需自行低频查库兜底
+        self.available = False
+
+    def subscribe(self, task_id: Optional[int], wake: Optional[asyncio.Event] = None) -> TaskSubscription:
+        sub = TaskSubscription(task_id, wake)
+        self._subscribers[task_id].add(sub)
+        self._ensure_running()
+        return sub
+
+    def unsubscribe(self, sub: TaskSubscription):
+        subs = self._subscribers.get(sub.task_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subscribers[sub.task_id]
+
+    def dispatch(self, payload: Dict[str, Any]):
+        task_id = payload.get("task_id")
+        for key in (task_id, None):
+            for sub in list(self._subscribers.get(key, ())):
+                sub.push(payload)
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(s) for s in self._subscribers.values())
+
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        if self._runner is not None and not self._runner.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._runner = loop.create_task(self._listen())
+
+    async def stop(self):
+        if self._runner is not None and not self._runner.done():
+            self._runner.cancel()
+        self.available = False
+
+    async def _listen(self):
+        import redis.asyncio as aioredis
+
+        backoff = 1.0
+        while True:
+            client = None
+            try:
+                client = aioredis.Redis.from_url(REDIS_URL, socket_connect_timeout=2)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(TASK_EVENTS_CHANNEL)
+                self.available = True
+                backoff = 1.0
+                async for message in pubsub.listen():
+                    try:
+                        self.dispatch(fast_json.loads(message["data"]))
+                    except Exception as e:
+                        logger.debug(f"Bad task event skipped: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Task event listener disconnected: {e}")
+            finally:
+                self.available = False
+                if client is not None:
+                    try:
+                        await client.aclose()
+                    except Exception:
+                        pass
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+
+task_event_hub = TaskEventHub()
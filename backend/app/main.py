@@ -3,9 +3,14 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlmodel import SQLModel, Session, select  # <--- [修改] 引入 Session 和 select
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse, Response
 import os
 
-from app.core.database import engine
+from app.core.database import engine, ensure_indexes
+from app.core.cache import resource_cache
+from app.core.task_events import task_event_hub
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.query_profiler import QueryProfilerMiddleware
 
 # === 模型导入 Start ===
 from app.models.llm_model import LLMModel
@@ -13,19 +18,25 @@ from app.models.dataset import DatasetMeta, DatasetConfig, EvaluationMetric
 from app.models.task import EvaluationTask
 from app.models.user import User 
 from app.models.dict import DictItem
+from app.models.stats import CatalogCounter
+from app.models.leaderboard import LeaderboardEntry, LeaderboardCategoryScore
+from app.models.task_profile import TaskProfile
 # === 模型导入 End ===
 
 # [新增] 引入哈希工具
 from app.utils.security_lite import hash_password 
+from app.services.catalog_stats import CatalogStatsService
+from app.services.leaderboard_service import LeaderboardService
 
 # [修改] 引入 auth 模块
-from app.api.v1 import models, datasets, tasks, schemes, auth, dicts
+from app.api.v1 import models, datasets, tasks, schemes, auth, dicts, leaderboard
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("🚀 [Startup] 正在初始化数据库...")
     # 1. 创建表结构
     SQLModel.metadata.create_all(engine)
+    ensure_indexes()
     
     # 2. [新增] 预注册管理员账号
     try:
@@ -51,15 +62,36 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"❌ [Startup] 初始化管理员失败: {e}")
 
+    # 3. 初始化数据集统计计数器 (老库首次升级时全量重算一次)
+    try:
+        with Session(engine) as session:
+            CatalogStatsService(session).ensure_initialized()
+    except Exception as e:
+        print(f"❌ [Startup] 初始化数据集统计失败: {e}")
+
+    # 4. 初始化排行榜 (已有成功任务但排行榜为空时全量重算一次)
+    try:
+        with Session(engine) as session:
+            LeaderboardService(session).ensure_initialized()
+    except Exception as e:
+        print(f"❌ [Startup] 初始化排行榜失败: {e}")
+
+    # 5. 订阅跨 worker 的缓存失效广播
+    resource_cache.start_listener()
+
     print("✅ [Startup] 系统启动准备就绪！")
     yield
+    resource_cache.stop_listener()
+    await task_event_hub.stop()
     print("👋 [Shutdown] 应用服务已关闭")
 
 app = FastAPI(
     title="LLM Eval Platform",
     description="基于 OpenCompass 的模型评测平台",
     version="0.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # 全局默认使用 orjson 序列化响应
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -68,7 +100,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
+# 统计每个请求执行的 SQL 语句数与耗时
+app.add_middleware(QueryProfilerMiddleware)
+# 最外层 (最后添加)：记录每个路由的请求耗时，包含语句统计本身的开销
+app.add_middleware(MetricsMiddleware)
 
 @app.get("/")
 def read_root():
@@ -78,6 +115,12 @@ def read_root():
 def health_check():
     return {"status": "ok", "database": "connected"}
 
+# Prometheus 抓取入口 (请求耗时、SQL、队列积压、任务阶段耗时、吞吐、缓存命中率、入库吞吐)
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_metrics(engine)
+    return Response(content=body, media_type=content_type)
+
 os.makedirs("data/datasets", exist_ok=True)
 app.mount("/static", StaticFiles(directory="data/datasets"), name="static")
 
@@ -87,4 +130,5 @@ app.include_router(datasets.router, prefix="/api/v1/datasets", tags=["Datasets"]
 app.include_router(tasks.router, prefix="/api/v1/tasks", tags=["Tasks"])
 app.include_router(schemes.router, prefix="/api/v1/schemes", tags=["Schemes"])
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Auth"])
-app.include_router(dicts.router, prefix="/api/v1/dicts", tags=["Dicts"])
\ No newline at end of file
+app.include_router(dicts.router, prefix="/api/v1/dicts", tags=["Dicts"])
+app.include_router(leaderboard.router, prefix="/api/v1/leaderboard", tags=["Leaderboard"])
\ No newline at end of file
@@ -0,0 +1,64 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field
+from sqlalchemy import UniqueConstraint, Index
+from datetime import datetime
+
+# ==========================================
+# 排行榜 (物化表，任务成功/删除时增量维护)
+# ==========================================
+class LeaderboardEntry(SQLModel, table=True):
+    """
+    模型 × 数据集配置 × 指标 的最新成绩与最佳成绩
+    """
+    __tablename__ = "leaderboard_entries"
+    __table_args__ = (
+        UniqueConstraint("model_id", "dataset_config_id", "metric_name", name="uq_leaderboard_entry_key"),
+        # 单个数据集榜单按分数排序
+        Index("ix_leaderboard_entries_cfg_metric_latest", "dataset_config_id", "metric_name", "latest_score"),
+        Index("ix_leaderboard_entries_cfg_metric_best", "dataset_config_id", "metric_name", "best_score"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    model_id: int = Field(index=True)
+    dataset_config_id: int
+    metric_name: str
+
+    # 冗余展示字段，避免列表查询再关联数据集表
+    dataset_name: str
+    category: str = Field(default="Unknown")
+
+    # 最近一次成功任务的成绩
+    latest_score: float
+    latest_task_id: int
+    latest_at: datetime
+
+    # 历史最佳成绩 (负向指标如 ppl 取最小值)
+    best_score: float
+    best_task_id: int
+
+    # 最新成绩按任务摘要口径归一化后的百分制分数，负向指标为空
+    normalized_score: Optional[float] = Field(default=None)
+
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class LeaderboardCategoryScore(SQLModel, table=True):
+    """
+    模型在各能力维度上的汇总分 (与任务雷达图口径一致)，category = "Overall" 为各维度均值
+    """
+    __tablename__ = "leaderboard_category_scores"
+    __table_args__ = (
+        UniqueConstraint("model_id", "category", name="uq_leaderboard_category_model"),
+        Index("ix_leaderboard_category_scores_category_score", "category", "score"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    model_id: int = Field(index=True)
+    category: str
+    score: float
+    # 参与汇总的 (配置, 指标) 条目数
+    entry_count: int = Field(default=0)
+
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,5 +1,6 @@
 from typing import Optional, Dict
 from sqlmodel import SQLModel, Field, Column, JSON, Relationship
+from sqlalchemy import Index
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -8,6 +9,10 @@ if TYPE_CHECKING:
 
 class EvaluationResult(SQLModel, table=True):
     __tablename__ = "evaluation_results"
+    # 分数趋势查询：按 (配置, 指标) 定位后顺序取出各任务的结果
+    __table_args__ = (
+        Index("ix_evaluation_results_config_metric_task", "dataset_config_id", "metric_name", "task_id"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     
@@ -0,0 +1,21 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field
+from sqlalchemy import UniqueConstraint
+from datetime import datetime
+
+# ==========================================
+# 数据集目录统计计数器 (物化统计)
+# ==========================================
+class CatalogCounter(SQLModel, table=True):
+    __tablename__ = "catalog_counters"
+    __table_args__ = (UniqueConstraint("scope", "key", name="uq_catalog_counter_scope_key"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    # 统计维度: total / category / modality / source
+    scope: str = Field(index=True)
+    # 维度取值: 如 category 下的 "Knowledge"，source 下的 "private" / "official"
+    key: str
+    value: int = Field(default=0)
+
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,7 +1,7 @@
 from typing import List, Optional, TYPE_CHECKING # 引入 TYPE_CHECKING 避免运行时循环导入
 from sqlmodel import SQLModel, Field, Relationship
 from datetime import datetime
-from sqlalchemy import Column, Text
+from sqlalchemy import Column, Text, Index
 from app.models.links import TaskDatasetLink
 from app.models.result import EvaluationResult
 if TYPE_CHECKING:
@@ -10,6 +10,13 @@ if TYPE_CHECKING:
 
 class EvaluationTask(SQLModel, table=True):
     __tablename__ = "evaluation_tasks"
+    # 列表页按 id 倒序做 keyset 分页，过滤列与 id 组成复合索引
+    __table_args__ = (
+        Index("ix_evaluation_tasks_status_id", "status", "id"),
+        Index("ix_evaluation_tasks_model_id_id", "model_id", "id"),
+        Index("ix_evaluation_tasks_scheme_id_id", "scheme_id", "id"),
+        Index("ix_evaluation_tasks_created_at", "created_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     model_id: int = Field(index=True) 
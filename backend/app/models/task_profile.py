@@ -0,0 +1,24 @@
+from typing import Optional, Dict
+from datetime import datetime
+from sqlmodel import SQLModel, Field, Column, JSON
+from sqlalchemy import UniqueConstraint
+
+# ==========================================
+# 任务运行画像 (阶段耗时 / 吞吐 / 资源占用 等)
+# ==========================================
+class TaskProfile(SQLModel, table=True):
+    """
+    每个任务每类画像一行，data 为紧凑的 JSON
+    kind: timings (阶段与逐数据集耗时) / throughput (逐数据集吞吐与请求延迟) / resources (子进程资源采样) ...
+    按 kind 分行存储，新增画像类型无需改表结构
+    """
+    __tablename__ = "task_profiles"
+    __table_args__ = (
+        UniqueConstraint("task_id", "kind", name="uq_task_profile_kind"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    task_id: int = Field(foreign_key="evaluation_tasks.id", index=True)
+    kind: str
+    data: Dict = Field(default={}, sa_column=Column(JSON))
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,40 @@
+from sqlmodel import SQLModel
+from typing import List, Optional
+from datetime import datetime
+
+# 1. 能力维度榜单 (模型汇总分)
+class LeaderboardModelItem(SQLModel):
+    rank: int
+    model_id: int
+    model_name: str
+    category: str
+    score: float
+    entry_count: int
+    updated_at: datetime
+
+class LeaderboardModelPage(SQLModel):
+    total: int
+    page: int
+    page_size: int
+    items: List[LeaderboardModelItem]
+
+# 2. 数据集榜单 (模型 × 配置 × 指标)
+class LeaderboardEntryItem(SQLModel):
+    model_id: int
+    model_name: str
+    dataset_config_id: int
+    dataset_name: str
+    category: str
+    metric_name: str
+    latest_score: float
+    latest_task_id: int
+    latest_at: datetime
+    best_score: float
+    best_task_id: int
+    normalized_score: Optional[float] = None
+
+class LeaderboardEntryPage(SQLModel):
+    total: int
+    page: int
+    page_size: int
+    items: List[LeaderboardEntryItem]
@@ -1,5 +1,5 @@
 from sqlmodel import SQLModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 # 基础模型，包含共有字段
@@ -22,4 +22,29 @@ class ModelCreate(ModelBase):
 # 返回时，我们把数据库生成的 id 和 created_at 带上
 class ModelRead(ModelBase):
     id: int
-    created_at: datetime
\ No newline at end of file
+    created_at: datetime
+
+# 3. 分数趋势 (GET /models/{id}/trend)
+class TrendPoint(SQLModel):
+    task_id: int
+    finished_at: datetime
+    score: float
+
+class TrendStats(SQLModel):
+    latest: float
+    latest_task_id: int
+    best: float
+    best_task_id: int
+    min: float
+    mean: float
+    first_at: datetime
+    last_at: datetime
+
+class ModelTrendResponse(SQLModel):
+    model_id: int
+    dataset_config_id: int
+    metric: str
+    total_points: int       # 降采样前的点数
+    downsampled: bool
+    points: List[TrendPoint]
+    stats: Optional[TrendStats] = None
@@ -29,6 +29,12 @@ class TaskRead(SQLModel):
     error_msg: Optional[str] = None
     scheme_name: Optional[str] = None
     scheme_id: Optional[int] = None 
+    # 阶段耗时：{"stages": {阶段: 秒}, "datasets": [逐数据集推理/评估耗时]}，仅详情接口返回
+    timings: Optional[Dict[str, Any]] = None
+    # 吞吐画像：逐数据集样本/秒、token/秒，API 模型另有请求延迟 p50/p95/p99 (毫秒)
+    throughput: Optional[Dict[str, Any]] = None
+    # 子进程资源峰值与告警 {"peaks": {...}, "alerts": [...]}；完整时间序列见 /tasks/{id}/resources
+    resources: Optional[Dict[str, Any]] = None
 
 # 3. 分页响应包装类
 class TaskPagination(SQLModel):
@@ -37,6 +43,28 @@ class TaskPagination(SQLModel):
     page_size: int      # 每页大小
     items: List[TaskRead] # 具体的任务列表
 
+# 4. 列表页精简投影 (不含 result_summary，完整摘要仅在详情接口返回)
+class TaskListItem(SQLModel):
+    id: int
+    model_id: int
+    model_name: Optional[str] = None
+    scheme_id: Optional[int] = None
+    scheme_name: Optional[str] = None
+    status: str
+    progress: int
+    datasets_list: str
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+    score: Optional[float] = None  # 成绩概览: 各数据集归一化得分的均值
+
+class TaskListPagination(SQLModel):
+    total: Optional[int] = None  # with_total=false 时不统计
+    page: int
+    page_size: int
+    items: List[TaskListItem]
+    next_cursor: Optional[int] = None  # keyset 分页游标 (下一页传 cursor=next_cursor)
+
 class TaskCompareRequest(SQLModel):
     task_ids: List[int]
 
@@ -45,4 +73,5 @@ class TaskCompareResponse(SQLModel):
     models: List[Dict[str, Any]]  # 包含 id, name, creation_time 等
     radar_data: List[Dict[str, Any]] # 雷达图数据 series
     radar_indicators: List[Dict[str, Any]] # 雷达图维度 indicators
-    table_data: List[Dict[str, Any]] # 详细对比表
\ No newline at end of file
+    table_data: List[Dict[str, Any]] # 详细对比表
+    significance: List[Dict[str, Any]] = [] # 各任务相对基准任务的置信区间与显著性 (需逐样本记录)
\ No newline at end of file
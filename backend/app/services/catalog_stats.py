@@ -0,0 +1,195 @@
+from datetime import datetime
+from typing import Dict, Tuple, Optional, Any
+from sqlmodel import Session, select, func, delete
+from sqlalchemy import exists, event, case
+from sqlalchemy.dialects import mysql, sqlite, postgresql
+
+from app.models.dataset import DatasetMeta, DatasetConfig
+from app.models.stats import CatalogCounter
+from app.core.cache import resource_cache
+from app.utils import fast_json
+
+# 计数器键: (scope, key)
+CounterKey = Tuple[str, str]
+
+OFFICIAL_PREFIX = "official://"
+
+STATS_RESOURCE = "dataset_stats"
+
+
+def invalidate_stats_cache():
+    # 本地失效并通过 Redis 通知其他 worker (种子脚本等独立进程同样生效)
+    resource_cache.bump(STATS_RESOURCE)
+
+
+class CatalogStatsService:
+    """
+    数据集目录统计 (物化计数器)
+    - 写路径: create/delete 时在同一事务内按增量更新 catalog_counters
+    - 读路径: 从内存快照返回，附带 ETag
+    - 修复: rebuild() 全量重算
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    # ====================================================
+    # 增量维护
+    # ====================================================
+    def contribution(self, meta: Optional[DatasetMeta]) -> Dict[CounterKey, int]:
+        """
+        计算单个数据集对各计数器的贡献值 (已软删除的数据集贡献为空)
+        """
+        if meta is None or meta.is_deleted:
+            return {}
+
+        # 与列表接口 private_only 的口径一致：存在任一非 official:// 配置即视为私有
+        is_private = any(
+            c.file_path and not c.file_path.startswith(OFFICIAL_PREFIX)
+            for c in meta.configs
+        )
+        return {
+            ("total", "datasets"): 1,
+            ("total", "questions"): meta.data_count or 0,
+            ("category", meta.category or "Unknown"): 1,
+            ("modality", meta.modality or "Text"): 1,
+            ("source", "private" if is_private else "official"): 1,
+        }
+
+    def apply(self, before: Dict[CounterKey, int], after: Dict[CounterKey, int]):
+        """
+        将 before -> after 的差值写入计数器 (不提交，由调用方统一 commit)
+        """
+        deltas = {}
+        for key in set(before) | set(after):
+            delta = after.get(key, 0) - before.get(key, 0)
+            if delta:
+                deltas[key] = delta
+        if not deltas:
+            return
+
+        now = datetime.utcnow()
+        # 按键排序依次更新：各进程加锁顺序一致，避免 MySQL 上互相等待形成死锁
+        for (scope, key), delta in sorted(deltas.items()):
+            self.session.execute(self._upsert(scope, key, delta, now))
+
+        self._invalidate_on_commit()
+
+    def _upsert(self, scope: str, key: str, delta: int, now: datetime):
+        """
+        原子地累加计数器：新键直接插入，已存在则在原值上加 delta (不低于 0)
+        先查后插在并发创建同一新分类时会撞唯一约束，因此交给数据库的 upsert 处理
+        """
+        table = CatalogCounter.__table__
+        current = table.c.value + delta
+        values = {"scope": scope, "key": key, "value": max(delta, 0), "updated_at": now}
+        updates = {"value": case((current < 0, 0), else_=current), "updated_at": now}
+
+        dialect = self.session.get_bind().dialect.name
+        if dialect == "mysql":
+            return mysql.insert(table).values(**values).on_duplicate_key_update(**updates)
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        return insert(table).values(**values).on_conflict_do_update(index_elements=["scope", "key"], set_=updates)
+
+    def _invalidate_on_commit(self):
+        # 提交后再失效快照，避免并发读在提交前回填旧值
+        event.listen(self.session, "after_commit", lambda _s: invalidate_stats_cache(), once=True)
+
+    # ====================================================
+    # 全量重算 (管理员修复 / 种子脚本)
+    # ====================================================
+    def rebuild(self) -> Dict[CounterKey, int]:
+        """
+        基于 dataset_metas 全量重算计数器 (不提交，由调用方统一 commit)
+        """
+        alive = DatasetMeta.is_deleted == False
+        counters: Dict[CounterKey, int] = {}
+
+        total, questions = self.session.exec(
+            select(func.count(DatasetMeta.id), func.sum(DatasetMeta.data_count)).where(alive)
+        ).one()
+        counters[("total", "datasets")] = total or 0
+        counters[("total", "questions")] = questions or 0
+
+        for category, cnt in self.session.exec(
+            select(DatasetMeta.category, func.count(DatasetMeta.id)).where(alive).group_by(DatasetMeta.category)
+        ).all():
+            counters[("category", category or "Unknown")] = cnt
+
+        for modality, cnt in self.session.exec(
+            select(DatasetMeta.modality, func.count(DatasetMeta.id)).where(alive).group_by(DatasetMeta.modality)
+        ).all():
+            counters[("modality", modality or "Text")] = cnt
+
+        has_private_config = exists().where(
+            DatasetConfig.meta_id == DatasetMeta.id,
+            DatasetConfig.file_path.not_like(f"{OFFICIAL_PREFIX}%"),
+        )
+        private = self.session.exec(
+            select(func.count(DatasetMeta.id)).where(alive, has_private_config)
+        ).one()
+        counters[("source", "private")] = private or 0
+        counters[("source", "official")] = (total or 0) - (private or 0)
+
+        self.session.exec(delete(CatalogCounter))
+        now = datetime.utcnow()
+        for (scope, key), value in counters.items():
+            self.session.add(CatalogCounter(scope=scope, key=key, value=value, updated_at=now))
+
+        self.session.flush()
+        self._invalidate_on_commit()
+        return counters
+
+    def ensure_initialized(self):
+        """
+        首次上线时计数器表为空，但库中已有数据集：自动执行一次全量重算
+        """
+        has_counters = self.session.exec(select(CatalogCounter.id).limit(1)).first()
+        if has_counters is not None:
+            return
+        has_metas = self.session.exec(select(DatasetMeta.id).limit(1)).first()
+        if has_metas is not None:
+            self.rebuild()
+            self.session.commit()
+
+    # ====================================================
+    # 读路径
+    # ====================================================
+    def build_payload(self) -> Dict[str, Any]:
+        rows = self.session.exec(select(CatalogCounter)).all()
+
+        totals = {}
+        categories = []
+        modalities = []
+        sources = {"private": 0, "official": 0}
+        for row in rows:
+            if row.scope == "total":
+                totals[row.key] = row.value
+            elif row.scope == "category" and row.value > 0:
+                categories.append({"category": row.key, "count": row.value})
+            elif row.scope == "modality" and row.value > 0:
+                modalities.append({"modality": row.key, "count": row.value})
+            elif row.scope == "source":
+                sources[row.key] = row.value
+
+        categories.sort(key=lambda x: x["category"])
+        modalities.sort(key=lambda x: x["modality"])
+
+        return {
+            "categories": categories,
+            "total_questions": totals.get("questions", 0),
+            "total_datasets": totals.get("datasets", 0),
+            "modalities": modalities,
+            "sources": sources,
+        }
+
+    def get_cached(self) -> Tuple[bytes, str]:
+        """
+        返回 (序列化后的响应体, ETag)，优先使用进程内快照
+        """
+        version = resource_cache.version(STATS_RESOURCE)
+        hit = resource_cache.get(STATS_RESOURCE, "", version)
+        if hit is not None:
+            return hit
+        body = fast_json.dumps(self.build_payload())
+        return resource_cache.put(STATS_RESOURCE, "", version, body)
@@ -0,0 +1,169 @@
+import io
+import csv
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlmodel import Session, select
+
+from app.models.task import EvaluationTask
+from app.models.result import EvaluationResult
+from app.models.llm_model import LLMModel
+from app.models.dataset import DatasetMeta, DatasetConfig
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# 服务端游标每批取回的行数 (同时也是 CSV 分块 / Parquet row group 的大小)
+EXPORT_BATCH_SIZE = 2000
+
+# 原始结果导出的列与类型
+RESULT_EXPORT_SCHEMA = pa.schema([
+    ("result_id", pa.int64()),
+    ("task_id", pa.int64()),
+    ("task_status", pa.string()),
+    ("task_finished_at", pa.timestamp("us")),
+    ("model_id", pa.int64()),
+    ("model_name", pa.string()),
+    ("scheme_id", pa.int64()),
+    ("dataset_config_id", pa.int64()),
+    ("config_name", pa.string()),
+    ("dataset_name", pa.string()),
+    ("category", pa.string()),
+    ("metric_name", pa.string()),
+    ("score", pa.float64()),
+])
+
+
+def results_statement(conditions: Sequence):
+    """
+    原始结果导出查询：结果 + 任务 + 模型 + 配置分类，按结果 id 顺序输出
+    """
+    return (
+        select(
+            EvaluationResult.id.label("result_id"),
+            EvaluationResult.task_id,
+            EvaluationTask.status.label("task_status"),
+            EvaluationTask.finished_at.label("task_finished_at"),
+            EvaluationTask.model_id,
+            LLMModel.name.label("model_name"),
+            EvaluationTask.scheme_id,
+            EvaluationResult.dataset_config_id,
+            DatasetConfig.config_name,
+            EvaluationResult.dataset_name,
+            DatasetMeta.category,
+            EvaluationResult.metric_name,
+            EvaluationResult.score,
+        )
+        .join(EvaluationTask, EvaluationTask.id == EvaluationResult.task_id)
+        .outerjoin(LLMModel, LLMModel.id == EvaluationTask.model_id)
+        .outerjoin(DatasetConfig, DatasetConfig.id == EvaluationResult.dataset_config_id)
+        .outerjoin(DatasetMeta, DatasetMeta.id == DatasetConfig.meta_id)
+        .where(*conditions)
+        .order_by(EvaluationResult.id)
+    )
+
+
+def iter_result_batches(session: Session, conditions: Sequence, batch_size: Optional[int] = None) -> Iterator[List[Dict]]:
+    """
+    服务端游标 (yield_per) 分批读取，进程内同时只保留一批数据
+    """
+    batch_size = batch_size or EXPORT_BATCH_SIZE
+    result = session.execute(results_statement(conditions).execution_options(yield_per=batch_size))
+    for partition in result.mappings().partitions():
+        yield [dict(row) for row in partition]
+
+
+def compare_matrix_batches(compare: Dict[str, Any], task_ids: Optional[List[int]] = None, batch_size: Optional[int] = None):
+    """
+    将 compare_tasks 的对比矩阵转换为导出列：dataset, metric, 各任务得分, 各任务相对基准的差值
+    task_ids 为请求顺序 (第一个为基准，与 table_data 中的 task_* / diff_* 键一致)；
+    compare["models"] 按任务 id 排序，不能用来决定列顺序
+    """
+    batch_size = batch_size or EXPORT_BATCH_SIZE
+    task_ids = list(task_ids) if task_ids else [m["task_id"] for m in compare["models"]]
+    columns = ["dataset", "metric"] + [f"task_{tid}" for tid in task_ids] + [f"diff_{tid}" for tid in task_ids[1:]]
+    schema = pa.schema(
+        [("dataset", pa.string()), ("metric", pa.string())]
+        + [(c, pa.float64()) for c in columns[2:]]
+    )
+
+    def batches():
+        table = compare["table_data"]
+        for start in range(0, len(table), batch_size):
+            yield [{c: row.get(c) for c in columns} for row in table[start:start + batch_size]]
+
+    return schema, batches()
+
+
+# ====================================================
+# 分块编码
+# ====================================================
+def stream_csv(schema: pa.Schema, batches: Iterable[List[Dict]]) -> Iterator[bytes]:
+    columns = schema.names
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # 带 BOM，Excel 直接打开中文不乱码
+    buffer.write("\ufeff")
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows([row.get(c) for c in columns] for row in batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    tail = buffer.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+
+class _ChunkSink:
+    """
+    供 ParquetWriter 写入的文件对象：写入的字节暂存在内存中，每写完一个 row group 取走一次
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks = []
+        return out
+
+
+def stream_parquet(schema: pa.Schema, batches: Iterable[List[Dict]]) -> Iterator[bytes]:
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in batches:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def stream_export(fmt: str, schema: pa.Schema, batches: Iterable[List[Dict]]) -> Iterator[bytes]:
+    if fmt == "parquet":
+        return stream_parquet(schema, batches)
+    return stream_csv(schema, batches)
@@ -0,0 +1,268 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Iterable, Any
+from sqlmodel import Session, select, func, delete
+
+from app.models.llm_model import LLMModel
+from app.models.task import EvaluationTask
+from app.models.result import EvaluationResult
+from app.models.dataset import DatasetMeta, DatasetConfig
+from app.models.leaderboard import LeaderboardEntry, LeaderboardCategoryScore
+from app.utils.scoring import normalize_score, is_negative_metric
+
+OVERALL_CATEGORY = "Overall"
+
+# 排行榜条目键: (model_id, dataset_config_id, metric_name)
+EntryKey = Tuple[int, int, str]
+
+
+def _is_better(score: float, best: float, metric: str) -> bool:
+    return score < best if is_negative_metric(metric) else score > best
+
+
+class LeaderboardService:
+    """
+    排行榜物化表维护
+    - 任务成功: 只合并该任务的结果 (O(任务结果数))
+    - 任务删除: 只重算该任务曾作为最新/最佳来源的条目
+    - 能力维度汇总: 只重算受影响模型
+    - 修复: rebuild() 全量重算
+    所有方法均不提交，由调用方统一 commit
+    同一模型的维护按模型串行：先锁模型行，再以加锁读取 (读到最新提交) 其条目
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    # ====================================================
+    # 结果读取
+    # ====================================================
+    def _result_rows(self, *conditions):
+        """
+        成功任务的结果 (附带模型、完成时间、能力分类)，按时间先后排序
+        同一任务内按结果 id 排序，后写入的覆盖先写入的
+        """
+        finished_at = func.coalesce(EvaluationTask.finished_at, EvaluationTask.created_at)
+        stmt = (
+            select(
+                EvaluationTask.model_id,
+                EvaluationResult.task_id,
+                finished_at.label("finished_at"),
+                EvaluationResult.dataset_config_id,
+                EvaluationResult.metric_name,
+                EvaluationResult.dataset_name,
+                EvaluationResult.score,
+                DatasetMeta.category,
+            )
+            .join(EvaluationTask, EvaluationTask.id == EvaluationResult.task_id)
+            .outerjoin(DatasetConfig, DatasetConfig.id == EvaluationResult.dataset_config_id)
+            .outerjoin(DatasetMeta, DatasetMeta.id == DatasetConfig.meta_id)
+            .where(EvaluationTask.status == "success", *conditions)
+            .order_by(finished_at, EvaluationResult.task_id, EvaluationResult.id)
+        )
+        return self.session.exec(stmt).all()
+
+    @staticmethod
+    def _merge(entry: Optional[LeaderboardEntry], row, now: datetime) -> LeaderboardEntry:
+        """
+        将一条结果合并进条目：时间不早于当前最新成绩则替换最新，优于最佳则替换最佳
+        """
+        score = float(row.score)
+        if entry is None:
+            return LeaderboardEntry(
+                model_id=row.model_id,
+                dataset_config_id=row.dataset_config_id,
+                metric_name=row.metric_name,
+                dataset_name=row.dataset_name,
+                category=row.category or "Unknown",
+                latest_score=score,
+                latest_task_id=row.task_id,
+                latest_at=row.finished_at,
+                best_score=score,
+                best_task_id=row.task_id,
+                normalized_score=normalize_score(score, row.metric_name),
+                updated_at=now,
+            )
+
+        if (row.finished_at, row.task_id) >= (entry.latest_at, entry.latest_task_id):
+            entry.latest_score = score
+            entry.latest_task_id = row.task_id
+            entry.latest_at = row.finished_at
+            entry.dataset_name = row.dataset_name
+            entry.category = row.category or "Unknown"
+            entry.normalized_score = normalize_score(score, row.metric_name)
+        if _is_better(score, entry.best_score, row.metric_name):
+            entry.best_score = score
+            entry.best_task_id = row.task_id
+        entry.updated_at = now
+        return entry
+
+    def _lock_models(self, model_ids: Iterable[int]):
+        """
+        锁定模型行 (按 id 顺序，避免死锁)：同一模型的多个任务同时完成时，
+        后到者等待前者提交后再合并，不会基于旧值覆盖或重复插入条目 (SQLite 无行锁，整库写锁已串行)
+        """
+        ids = sorted(set(model_ids))
+        if ids:
+            self.session.exec(
+                select(LLMModel.id).where(LLMModel.id.in_(ids)).order_by(LLMModel.id).with_for_update()
+            ).all()
+
+    def _load_entries(self, model_id: int, config_ids: Iterable[int]) -> Dict[EntryKey, LeaderboardEntry]:
+        entries = self.session.exec(
+            select(LeaderboardEntry)
+            .where(
+                LeaderboardEntry.model_id == model_id,
+                LeaderboardEntry.dataset_config_id.in_(set(config_ids)),
+            )
+            .with_for_update()
+            # 会话中已加载过的条目也以数据库中的最新值为准
+            .execution_options(populate_existing=True)
+        ).all()
+        return {(e.model_id, e.dataset_config_id, e.metric_name): e for e in entries}
+
+    # ====================================================
+    # 增量维护
+    # ====================================================
+    def apply_task(self, task: EvaluationTask):
+        """
+        任务成功后合并其结果 (调用前结果需已 flush)
+        """
+        rows = self._result_rows(EvaluationResult.task_id == task.id)
+        if not rows:
+            return
+
+        now = datetime.utcnow()
+        self._lock_models([task.model_id])
+        entries = self._load_entries(task.model_id, {r.dataset_config_id for r in rows})
+        for row in rows:
+            key = (row.model_id, row.dataset_config_id, row.metric_name)
+            entries[key] = self._merge(entries.get(key), row, now)
+            self.session.add(entries[key])
+
+        self.session.flush()
+        self.refresh_rollups([task.model_id])
+
+    def remove_task(self, task_id: int):
+        """
+        任务删除后重算受影响的条目 (调用前该任务的结果需已删除并 flush)
+        """
+        sourced = (LeaderboardEntry.latest_task_id == task_id) | (LeaderboardEntry.best_task_id == task_id)
+        model_ids = self.session.exec(select(LeaderboardEntry.model_id).where(sourced).distinct()).all()
+        if not model_ids:
+            return
+        self._lock_models(model_ids)
+        affected = self.session.exec(
+            select(LeaderboardEntry).where(sourced)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        ).all()
+
+        now = datetime.utcnow()
+        by_model: Dict[int, List[LeaderboardEntry]] = {}
+        for e in affected:
+            by_model.setdefault(e.model_id, []).append(e)
+
+        for model_id, stale in by_model.items():
+            keys = {(e.model_id, e.dataset_config_id, e.metric_name) for e in stale}
+            rows = self._result_rows(
+                EvaluationTask.model_id == model_id,
+                EvaluationResult.dataset_config_id.in_({k[1] for k in keys}),
+            )
+            rebuilt: Dict[EntryKey, LeaderboardEntry] = {}
+            for row in rows:
+                key = (row.model_id, row.dataset_config_id, row.metric_name)
+                if key in keys:
+                    rebuilt[key] = self._merge(rebuilt.get(key), row, now)
+
+            for e in stale:
+                fresh = rebuilt.get((e.model_id, e.dataset_config_id, e.metric_name))
+                if fresh is None:
+                    self.session.delete(e)
+                    continue
+                for field in ("dataset_name", "category", "latest_score", "latest_task_id", "latest_at",
+                              "best_score", "best_task_id", "normalized_score", "updated_at"):
+                    setattr(e, field, getattr(fresh, field))
+                self.session.add(e)
+
+        self.session.flush()
+        self.refresh_rollups(model_ids)
+
+    def refresh_rollups(self, model_ids: Iterable[int]):
+        """
+        重算指定模型的能力维度汇总：各维度取归一化分数均值 (上限 100，保留 1 位小数)，
+        Overall 为各维度分数的均值
+        """
+        model_ids = list(set(model_ids))
+        if not model_ids:
+            return
+
+        rows = self.session.exec(
+            select(
+                LeaderboardEntry.model_id,
+                LeaderboardEntry.category,
+                func.avg(LeaderboardEntry.normalized_score),
+                func.count(LeaderboardEntry.id),
+            )
+            .where(LeaderboardEntry.model_id.in_(model_ids), LeaderboardEntry.normalized_score.is_not(None))
+            .group_by(LeaderboardEntry.model_id, LeaderboardEntry.category)
+            # 加锁读取：可重复读隔离下普通查询读的是事务快照，会漏掉其他任务刚提交的条目
+            .with_for_update()
+        ).all()
+
+        self.session.exec(delete(LeaderboardCategoryScore).where(LeaderboardCategoryScore.model_id.in_(model_ids)))
+
+        now = datetime.utcnow()
+        overall: Dict[int, List[Tuple[float, int]]] = {}
+        for model_id, category, avg_score, count in rows:
+            score = round(min(avg_score, 100.0), 1)
+            overall.setdefault(model_id, []).append((score, count))
+            self.session.add(LeaderboardCategoryScore(
+                model_id=model_id, category=category, score=score, entry_count=count, updated_at=now
+            ))
+        for model_id, scores in overall.items():
+            self.session.add(LeaderboardCategoryScore(
+                model_id=model_id,
+                category=OVERALL_CATEGORY,
+                score=round(sum(s for s, _ in scores) / len(scores), 1),
+                entry_count=sum(c for _, c in scores),
+                updated_at=now,
+            ))
+        self.session.flush()
+
+    # ====================================================
+    # 全量重算 (管理员修复 / 首次上线)
+    # ====================================================
+    def rebuild(self) -> int:
+        now = datetime.utcnow()
+        entries: Dict[EntryKey, LeaderboardEntry] = {}
+        for row in self._result_rows():
+            key = (row.model_id, row.dataset_config_id, row.metric_name)
+            entries[key] = self._merge(entries.get(key), row, now)
+
+        self.session.exec(delete(LeaderboardCategoryScore))
+        self.session.exec(delete(LeaderboardEntry))
+        self.session.add_all(entries.values())
+        self.session.flush()
+        self.refresh_rollups({k[0] for k in entries})
+        return len(entries)
+
+    def ensure_initialized(self):
+        """
+        排行榜表为空但已有成功任务时，自动执行一次全量重算
+        """
+        if self.session.exec(select(LeaderboardEntry.id).limit(1)).first() is not None:
+            return
+        has_success = self.session.exec(
+            select(EvaluationTask.id).where(EvaluationTask.status == "success").limit(1)
+        ).first()
+        if has_success is not None:
+            self.rebuild()
+            self.session.commit()
+
+    def categories(self) -> List[Dict[str, Any]]:
+        rows = self.session.exec(
+            select(LeaderboardCategoryScore.category, func.count(LeaderboardCategoryScore.id))
+            .group_by(LeaderboardCategoryScore.category)
+            .order_by(LeaderboardCategoryScore.category)
+        ).all()
+        return [{"category": c, "models": n} for c, n in rows]
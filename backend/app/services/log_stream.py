@@ -0,0 +1,289 @@
+import os
+import re
+import asyncio
+import logging
+from typing import AsyncIterator, Callable, Dict, Optional, Set
+
+from watchfiles import awatch
+
+from app.core.task_events import task_event_hub, FINISHED_STATUSES
+from app.services.sample_store import task_workspace
+from app.utils import fast_json
+
+logger = logging.getLogger(__name__)
+
+LOG_FILE = "output.log"
+
+# 单次读取的最大字节数 (大文件分块发送，不一次性读入内存)
+LOG_CHUNK_BYTES = 256 * 1024
+# 反向查找末尾 N 行时每次读取的块大小
+TAIL_BLOCK_BYTES = 64 * 1024
+# 未指定 offset / tail 参数时，首屏只发送最后这么多行
+DEFAULT_TAIL_LINES = 2000
+# 无数据时的 SSE 心跳间隔 (秒)，防止代理断开空闲连接
+KEEPALIVE_SECONDS = 15.0
+# Redis 订阅离线时查询任务状态的间隔 (秒)
+STATUS_POLL_FALLBACK = 5.0
+# 等待日志文件创建时检查文件是否存在的间隔 (秒，只是一次 stat)
+FILE_WAIT_INTERVAL = 0.5
+
+
+def task_log_path(task_id: int) -> str:
+    return os.path.join(task_workspace(task_id), LOG_FILE)
+
+
+def sse_event(event: str, data: str, event_id: Optional[str] = None) -> str:
+    """
+    按 SSE 格式编码一条事件 (多行数据逐行加 data: 前缀)
+    """
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    body = "".join(f"data: {line}\n" for line in data.split("\n"))
+    return f"{head}event: {event}\n{body}\n"
+
+
+# ====================================================
+# 1. 文件变化监听 (同一文件的所有查看者共用一个 inotify 监听)
+# ====================================================
+class _LogWatchers:
+    def __init__(self):
+        self._waiters: Dict[str, Set[asyncio.Event]] = {}
+        self._watchers: Dict[str, asyncio.Task] = {}
+        # 监听失败 (如 inotify 数量上限) 的文件，查看者退化为定时检查
+        self.broken: Set[str] = set()
+
+    def add(self, path: str, wake: asyncio.Event):
+        self._waiters.setdefault(path, set()).add(wake)
+        watcher = self._watchers.get(path)
+        if watcher is None or watcher.done():
+            self.broken.discard(path)
+            self._watchers[path] = asyncio.get_running_loop().create_task(self._watch(path))
+
+    def remove(self, path: str, wake: asyncio.Event):
+        waiters = self._waiters.get(path)
+        if waiters is None:
+            return
+        waiters.discard(wake)
+        if not waiters:
+            del self._waiters[path]
+            watcher = self._watchers.pop(path, None)
+            if watcher is not None:
+                watcher.cancel()
+
+    async def _watch(self, path: str):
+        try:
+            async for _ in awatch(path, debounce=100, step=50):
+                for wake in list(self._waiters.get(path, ())):
+                    wake.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Log watcher for {path} stopped: {e}")
+            self.broken.add(path)
+            for wake in list(self._waiters.get(path, ())):
+                wake.set()
+
+
+log_watchers = _LogWatchers()
+
+
+# ====================================================
+# 2. 日志读取
+# ====================================================
+def _decode_lines(data: bytes) -> str:
+    # 进度条用 \r 原地刷新，只保留每行最后一次刷新的内容
+    text = data.decode("utf-8", errors="replace")
+    return "\n".join(line.rsplit("\r", 1)[-1] if "\r" in line else line for line in text.split("\n"))
+
+
+def read_complete_lines(f, offset: int, final: bool = False, limit: int = LOG_CHUNK_BYTES):
+    """
+    从 offset 起读取至多 limit 字节，只返回完整的行 (末尾半行留待下次读取)
+    final=True 时 (任务已结束) 连同末尾半行一起返回
+    返回 (文本, 新的 offset)；没有完整的行时文本为 None
+    """
+    f.seek(offset)
+    data = f.read(limit)
+    if not data:
+        return None, offset
+    # 读满 limit 时末尾可能截断在行中间 (甚至多字节字符中间)，同样按最后一个换行切分
+    if not final or len(data) == limit:
+        cut = data.rfind(b"\n")
+        if cut < 0:
+            if len(data) < limit:
+                return None, offset
+            # 超长的单行 (已达 limit 仍无换行) 直接发送，避免卡住
+            cut = len(data) - 1
+        data = data[:cut + 1]
+    text = _decode_lines(data[:-1] if data.endswith(b"\n") else data)
+    return text, offset + len(data)
+
+
+def _tail_lines_start(f, size: int, lines: int) -> int:
+    """
+    从文件末尾按块反向读取，定位最后 lines 行的起始字节 (末尾的换行不计为一行)
+    只读取末尾这几行所在的块，与文件总大小无关
+    """
+    if lines <= 0:
+        return size
+    end = size
+    if size > 0:
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            end = size - 1
+
+    found = 0
+    pos = end
+    while pos > 0:
+        start = max(0, pos - TAIL_BLOCK_BYTES)
+        f.seek(start)
+        block = f.read(pos - start)
+        idx = len(block)
+        while True:
+            idx = block.rfind(b"\n", 0, idx)
+            if idx < 0:
+                break
+            found += 1
+            if found == lines:
+                return start + idx + 1
+        pos = start
+    return 0
+
+
+def _next_line_start(f, pos: int, size: int) -> int:
+    """
+    将任意字节位置对齐到下一行行首 (只向后查找一个块，超长行则从原位置开始)
+    """
+    if pos <= 0:
+        return 0
+    f.seek(pos - 1)
+    block = f.read(TAIL_BLOCK_BYTES)
+    idx = block.find(b"\n")
+    return min(pos + idx, size) if idx >= 0 else pos
+
+
+def find_tail_offset(f, size: int, tail_lines: Optional[int] = None, tail_bytes: Optional[int] = None) -> int:
+    """
+    初始窗口的起始 offset：末尾 tail_bytes 字节 (对齐到行首) 与末尾 tail_lines 行中较小的窗口
+    """
+    start = 0
+    if tail_bytes is not None and size > tail_bytes:
+        start = _next_line_start(f, size - tail_bytes, size)
+    if tail_lines is not None:
+        start = max(start, _tail_lines_start(f, size, tail_lines))
+    return start
+
+
+# ====================================================
+# 3. SSE 事件流
+# ====================================================
+async def tail_log_events(
+    task_id: int,
+    status: str,
+    load_status: Callable[[], Optional[Dict]],
+    offset: Optional[int] = None,
+    tail_lines: Optional[int] = None,
+    tail_bytes: Optional[int] = None,
+    grep: Optional[re.Pattern] = None,
+    log_path: Optional[str] = None,
+) -> AsyncIterator[str]:
+    """
+    日志实时推送：
+    - 文件增长由 inotify (watchfiles) 唤醒，任务状态变化由 Redis 订阅唤醒，期间不查询数据库
+    - 事件：status (状态/进度)、window (首次读取的起始 offset 与文件大小)、
+      log (id 为下次续读的字节 offset)、end (任务结束且日志已读完)
+    - offset 为空时按 tail_lines / tail_bytes 从末尾反向定位初始窗口；grep 只发送匹配的行
+    - load_status 为同步的状态查询函数，只在连接建立时与 Redis 订阅离线时 (低频) 调用
+    """
+    log_path = log_path or task_log_path(task_id)
+    wake = asyncio.Event()
+    sub = task_event_hub.subscribe(task_id, wake)
+    watching = False
+    loop = asyncio.get_running_loop()
+    last_status_check = last_sent = loop.time()
+
+    try:
+        # 订阅之后再确认一次状态，避免错过订阅前刚发生的结束事件
+        # 查不到任务说明连接建立前已被删除
+        current = await asyncio.to_thread(load_status) or {"status": "deleted"}
+        status = current.get("status", status)
+        yield sse_event("status", fast_json.dumps_str({"task_id": task_id, **current}))
+
+        f = None
+        try:
+            while True:
+                # 先清除唤醒标记：读取期间发生的变化会触发下一轮，不会丢失
+                wake.clear()
+
+                # 1. 吸收状态事件
+                for event in sub.drain():
+                    last_sent = loop.time()
+                    yield sse_event("status", fast_json.dumps_str(event))
+                    status = event.get("status", status)
+
+                # 任务被删除后不会再有新日志，同样结束推送
+                finished = status in FINISHED_STATUSES or status == "deleted"
+
+                # 2. 读取新增内容 (文件出现后才开始监听)
+                if f is None and os.path.exists(log_path):
+                    f = open(log_path, "rb")
+                    log_watchers.add(log_path, wake)
+                    watching = True
+                    size = os.fstat(f.fileno()).st_size
+                    if offset is None:
+                        offset = find_tail_offset(f, size, tail_lines, tail_bytes)
+                    elif offset > size:
+                        # 文件被截断或重建 (任务重跑)，从头读取
+                        offset = 0
+                    yield sse_event("window", fast_json.dumps_str({"start": offset, "size": size}))
+                if f is not None:
+                    while True:
+                        text, offset = read_complete_lines(f, offset, final=finished)
+                        if text is None:
+                            break
+                        if grep is not None:
+                            matched = [line for line in text.split("\n") if grep.search(line)]
+                            if not matched:
+                                # 大段不匹配时让出事件循环
+                                await asyncio.sleep(0)
+                                continue
+                            text = "\n".join(matched)
+                        last_sent = loop.time()
+                        yield sse_event("log", text, event_id=str(offset))
+
+                if finished:
+                    yield sse_event("end", fast_json.dumps_str({"task_id": task_id, "status": status, "offset": offset or 0}))
+                    return
+
+                # 3. 等待下一次唤醒
+                if f is None:
+                    timeout = FILE_WAIT_INTERVAL
+                elif log_path in log_watchers.broken:
+                    timeout = 1.0
+                else:
+                    timeout = KEEPALIVE_SECONDS
+                if not task_event_hub.available:
+                    timeout = min(timeout, STATUS_POLL_FALLBACK)
+
+                try:
+                    await asyncio.wait_for(wake.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    if loop.time() - last_sent >= KEEPALIVE_SECONDS:
+                        last_sent = loop.time()
+                        yield ": ping\n\n"
+
+                # Redis 订阅离线：低频查库兜底
+                if not task_event_hub.available and loop.time() - last_status_check >= STATUS_POLL_FALLBACK:
+                    last_status_check = loop.time()
+                    current = await asyncio.to_thread(load_status)
+                    if current is None:
+                        # 查不到任务：期间已被删除
+                        sub.push({"task_id": task_id, "status": "deleted"})
+                    elif current.get("status") != status:
+                        sub.push({"task_id": task_id, **current})
+        finally:
+            if f is not None:
+                f.close()
+    finally:
+        task_event_hub.unsubscribe(sub)
+        if watching:
+            log_watchers.remove(log_path, wake)
@@ -86,7 +86,7 @@ class MultimodalRunner:
             log_f.write("Inference finished.\n")
 
         # 3. 生成结果 CSV
-        # 格式必须与 OpenCompassRunner.parse_results 兼容
+        # 格式必须与 result_ingest 的 summary CSV 解析兼容
         # 必需列: dataset, version, metric, mode, {model_name}
         
         csv_filename = f"summary_{self.timestamp}.csv"
@@ -1,13 +1,14 @@
 import os
 import subprocess
-import glob
 import logging
 import torch
 import json
-import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from app.models.llm_model import LLMModel
 from app.models.dataset import DatasetConfig
+from app.services.result_ingest import load_results, ResultRecord
+from app.services.throughput import REQUEST_LOG
+from app.services.resource_sampler import ResourceSampler
 
 # 设置日志
 logger = logging.getLogger(__name__)
@@ -19,6 +20,10 @@ class OpenCompassRunner:
         :param workspace: 任务的独立工作目录，用于存放 config.py, 日志和输出结果
         """
         self.workspace = workspace
+        # 本次实际使用的运行参数 (随吞吐画像保存)
+        self.run_cfg: Dict[str, Any] = {}
+        # 子进程树的资源采样结果 (run 结束后可用，失败时同样保留)
+        self.resource_profile: Optional[Dict[str, Any]] = None
         # 确保工作目录存在
         os.makedirs(self.workspace, exist_ok=True)
         
@@ -100,6 +105,7 @@ class OpenCompassRunner:
         # 第二部分：准备配置变量
         # =========================================================
         run_cfg = self._detect_device_config()
+        self.run_cfg = {k: run_cfg[k] for k in ("num_gpus", "max_out_len", "batch_size")}
         
         # --- 2.1 构建数据集列表 (混合模式) ---
         private_ds_lines = []
@@ -218,7 +224,10 @@ class OpenCompassRunner:
         
         # 准备 Import 语句
         if model.type in ["api", "local_api"]:
-            model_import_stmt = "from opencompass.models import OpenAI"
+            # API 模型使用带请求计时的子类 (逐请求延迟与 usage 写入 profile/requests.jsonl)
+            self._write_request_profiler()
+            model_import_stmt = "from request_profiler import ProfiledOpenAI as OpenAI"
+            self.run_cfg = {"query_per_second": 1, "max_out_len": 2048, "batch_size": 1}
             models_block = f"""
 models = [
     dict(
@@ -358,6 +367,74 @@ models = [
         logger.info(f"✅ Generated config file: {config_path}")
         return config_path
 
+    def _write_request_profiler(self):
+        """
+        生成 request_profiler.py：包装 OpenAI 模型的单次请求，记录耗时、状态码与响应中的 usage
+        (同 dataset_loader.py 一样放在 workspace 下，由配置文件导入)
+        """
+        log_path = os.path.join(self.workspace, REQUEST_LOG)
+        # 重跑时清空上一轮的请求记录
+        if os.path.exists(log_path):
+            os.remove(log_path)
+
+        profiler_code = [
+            "import os",
+            "import json",
+            "import time",
+            "import threading",
+            "import requests",
+            "from opencompass.models import OpenAI",
+            "",
+            f"LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), {REQUEST_LOG!r})",
+            "_local = threading.local()",
+            "_lock = threading.Lock()",
+            "",
+            "# 所有 HTTP 请求都经过 Session.request；只在 _generate 调用期间记录状态码与 usage",
+            "if not getattr(requests.Session.request, '_profiled', False):",
+            "    _orig_request = requests.Session.request",
+            "",
+            "    def _request(self, method, url, *args, **kwargs):",
+            "        resp = _orig_request(self, method, url, *args, **kwargs)",
+            "        if getattr(_local, 'active', False):",
+            "            _local.status = resp.status_code",
+            "            try:",
+            "                _local.usage = resp.json().get('usage') or _local.usage",
+            "            except Exception:",
+            "                pass",
+            "        return resp",
+            "",
+            "    _request._profiled = True",
+            "    requests.Session.request = _request",
+            "",
+            "",
+            "class ProfiledOpenAI(OpenAI):",
+            "    def _generate(self, *args, **kwargs):",
+            "        _local.active, _local.status, _local.usage = True, None, None",
+            "        start = time.time()",
+            "        try:",
+            "            return super()._generate(*args, **kwargs)",
+            "        finally:",
+            "            _local.active = False",
+            "            end = time.time()",
+            "            usage = _local.usage if isinstance(_local.usage, dict) else {}",
+            "            record = {",
+            "                'ts': round(end, 3),",
+            "                'latency_ms': round((end - start) * 1000, 2),",
+            "                'status': _local.status,",
+            "                'prompt_tokens': usage.get('prompt_tokens'),",
+            "                'completion_tokens': usage.get('completion_tokens'),",
+            "            }",
+            "            try:",
+            "                with _lock:",
+            "                    os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)",
+            "                    with open(LOG_PATH, 'a', encoding='utf-8') as f:",
+            "                        f.write(json.dumps(record) + '\\n')",
+            "            except Exception:",
+            "                pass",
+        ]
+        with open(os.path.join(self.workspace, "request_profiler.py"), "w", encoding="utf-8") as f:
+            f.write("\n".join(profiler_code))
+
     def run(self, config_path: str, log_file_name: str = "output.log"):
         """
         【进程执行】
@@ -375,31 +452,37 @@ models = [
                 stderr=subprocess.STDOUT,
                 text=True
             )
-            return_code = process.wait()
+            # 后台采样整个进程树的 CPU / 内存 / 文件句柄
+            sampler = ResourceSampler(process.pid).start()
+            try:
+                return_code = process.wait()
+            finally:
+                self.resource_profile = sampler.stop()
             
             if return_code != 0:
                 logger.error(f"❌ OpenCompass execution failed. Log: {log_path}")
+                peak_rss = self.resource_profile["peaks"].get("rss_mb")
+                # 被 SIGKILL 结束通常是 OOM，附上内存峰值便于排查
+                if return_code == -9 and peak_rss is not None:
+                    raise RuntimeError(
+                        f"OpenCompass was killed (SIGKILL, possibly out of memory); "
+                        f"peak RSS {peak_rss:.0f} MB, peak system memory {self.resource_profile['peaks'].get('sys_mem')}%"
+                    )
                 raise RuntimeError(f"OpenCompass exited with code {return_code}")
             
             logger.info("✅ OpenCompass execution finished successfully.")
 
-    def parse_results(self) -> List[Dict[str, Any]]:
+    def parse_results(self, task_id: int, configs: List[DatasetConfig], model_abbr: str = None) -> List[ResultRecord]:
         """
         【结果解析】
-        直接在 Task 工作目录下寻找 OpenCompass 生成的 CSV 结果
-        路径模式：{workspace}/{timestamp}/summary/summary_{timestamp}.csv
+        委托给 result_ingest：优先读取 {workspace}/{timestamp}/results/ 下的 JSON，
+        兜底读取 summary CSV，并按 config_name 精确映射到数据集配置
         """
-        # 1. 精准匹配模式
-        # self.workspace 已经是 task_{id} 的独立目录了
-        # 我们只需要跨过中间那层动态生成的时间戳目录 ("*") 即可
-        pattern = os.path.join(self.workspace, "*", "summary", "summary_*.csv")
-        
-        # 使用 glob 快速查找
-        csv_files = glob.glob(pattern)
-        
-        # 2. 如果没找到，说明运行可能失败了
-        if not csv_files:
-            error_msg = f"❌ Analysis Failed: No summary CSV found in {self.workspace}. Please check the running logs."
+        records = load_results(self.workspace, task_id, configs, model_abbr=model_abbr)
+
+        # 没有结果，说明运行可能失败了
+        if not records:
+            error_msg = f"❌ Analysis Failed: No results found in {self.workspace}. Please check the running logs."
             logger.error(error_msg)
             
             # 尝试读取日志末尾，辅助排查
@@ -413,43 +496,5 @@ models = [
                     pass
             
             raise FileNotFoundError(error_msg)
-        
-        # 3. 找到最新生成的一个文件 (以防同一个目录下有多次运行残留)
-        latest_csv = max(csv_files, key=os.path.getmtime)
-        logger.info(f"📊 Parsing results from: {latest_csv}")
-        
-        try:
-            # 4. 解析 CSV
-            df = pd.read_csv(latest_csv)
-            results = []
-            
-            for _, row in df.iterrows():
-                row_dict = row.to_dict()
-                
-                # 获取数据集简称和指标
-                dataset_abbr = row_dict.get("dataset", "Unknown")
-                metric = row_dict.get("metric", "score")
-                
-                # 智能提取分数：取最后一列数值列作为分数
-                # OpenCompass 的 CSV 最后一列通常就是最终得分
-                score = 0.0
-                for col in reversed(df.columns):
-                    val = row_dict[col]
-                    if isinstance(val, (int, float)) and col not in ['version', 'metric', 'mode']:
-                        score = float(val)
-                        break
-                
-                results.append({
-                    "dataset": dataset_abbr,
-                    "metric": metric,
-                    "score": score,
-                    "raw_data": row_dict
-                })
-            
-            if not results:
-                 raise ValueError("summary CSV was found but contained no valid data rows.")
-                 
-            return results
-        except Exception as e:
-            logger.error(f"❌ Failed to parse CSV: {e}")
-            raise e
\ No newline at end of file
+
+        return records
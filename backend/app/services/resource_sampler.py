@@ -0,0 +1,186 @@
+import os
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# 采样间隔 (秒)
+RESOURCE_SAMPLE_INTERVAL = float(os.getenv("RESOURCE_SAMPLE_INTERVAL", "2.0"))
+# 时间序列最多保留的点数，超出后两两合并 (取较大值，保留峰值)
+RESOURCE_MAX_POINTS = int(os.getenv("RESOURCE_MAX_POINTS", "600"))
+
+
+def _env_threshold(name: str, default: Optional[float] = None) -> Optional[float]:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return float(value) if value.lower() not in ("0", "off", "none") else None
+
+
+# 告警阈值 (留空/off 表示不告警)；系统内存占用默认 90% 告警，提前发现 OOM 风险
+DEFAULT_THRESHOLDS = {
+    "rss_mb": _env_threshold("RESOURCE_ALERT_RSS_MB"),
+    "cpu": _env_threshold("RESOURCE_ALERT_CPU_PERCENT"),
+    "fds": _env_threshold("RESOURCE_ALERT_OPEN_FILES"),
+    "sys_mem": _env_threshold("RESOURCE_ALERT_SYSTEM_MEMORY_PERCENT", 90.0),
+}
+
+# 时间序列的列 (t 为相对启动时刻的秒数)
+SERIES_COLUMNS = ("t", "cpu", "rss_mb", "fds", "threads", "procs", "sys_mem")
+
+
+class ResourceSampler:
+    """
+    子进程树资源采样 (后台线程)：
+    - 每个采样点汇总根进程及其所有子孙进程的 CPU%、RSS、打开文件数、线程数、进程数，以及系统内存占用
+    - 时间序列按列存储 (紧凑 JSON)，点数超过上限时两两合并
+    - 指标越过阈值时记录一次告警 (回落后可再次触发)，并调用 on_alert
+    """
+
+    def __init__(
+        self,
+        pid: int,
+        interval: Optional[float] = None,
+        thresholds: Optional[Dict[str, Optional[float]]] = None,
+        max_points: Optional[int] = None,
+        on_alert: Optional[Callable[[Dict], None]] = None,
+    ):
+        self.pid = pid
+        self.interval = interval or RESOURCE_SAMPLE_INTERVAL
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+        self.max_points = max_points or RESOURCE_MAX_POINTS
+        self.on_alert = on_alert
+        self.series: Dict[str, List[float]] = {c: [] for c in SERIES_COLUMNS}
+        self.peaks: Dict[str, float] = {}
+        self.alerts: List[Dict] = []
+        self._armed = {k: True for k in self.thresholds}
+        # 复用 Process 对象：cpu_percent 依赖上一次调用的计数
+        self._procs: Dict[int, psutil.Process] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = time.monotonic()
+        self.samples = 0
+
+    # ====================================================
+    # 采样
+    # ====================================================
+    def _tree(self) -> List[psutil.Process]:
+        try:
+            root = self._procs.get(self.pid) or psutil.Process(self.pid)
+            members = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return []
+        alive = {}
+        for proc in members:
+            # 沿用已有对象 (pid 复用时以创建时间区分)；枚举后已退出的子进程直接跳过
+            try:
+                created = proc.create_time()
+                known = self._procs.get(proc.pid)
+                alive[proc.pid] = known if known is not None and known.create_time() == created else proc
+            except psutil.Error:
+                continue
+        self._procs = alive
+        return list(alive.values())
+
+    def sample(self) -> Optional[Dict[str, float]]:
+        procs = self._tree()
+        if not procs:
+            return None
+        cpu = rss = fds = threads = 0.0
+        counted = 0
+        for proc in procs:
+            try:
+                with proc.oneshot():
+                    cpu += proc.cpu_percent(None)
+                    rss += proc.memory_info().rss
+                    threads += proc.num_threads()
+                    fds += proc.num_fds() if hasattr(proc, "num_fds") else proc.num_handles()
+                counted += 1
+            except psutil.Error:
+                continue
+        point = {
+            "t": round(time.monotonic() - self._started_at, 1),
+            "cpu": round(cpu, 1),
+            "rss_mb": round(rss / 1024 / 1024, 1),
+            "fds": int(fds),
+            "threads": int(threads),
+            "procs": counted,
+            "sys_mem": psutil.virtual_memory().percent,
+        }
+        self._record(point)
+        return point
+
+    def _record(self, point: Dict[str, float]):
+        self.samples += 1
+        for col in SERIES_COLUMNS:
+            self.series[col].append(point[col])
+            if col != "t" and point[col] > self.peaks.get(col, float("-inf")):
+                self.peaks[col] = point[col]
+                self.peaks[f"{col}_at"] = point["t"]
+        if len(self.series["t"]) > self.max_points:
+            self._downsample()
+        self._check_thresholds(point)
+
+    def _downsample(self):
+        # 两两合并：时间取前一个点，数值取较大值，峰值不会丢失
+        for col, values in self.series.items():
+            pairs = [values[i:i + 2] for i in range(0, len(values), 2)]
+            self.series[col] = [p[0] if col == "t" else max(p) for p in pairs]
+
+    def _check_thresholds(self, point: Dict[str, float]):
+        for metric, limit in self.thresholds.items():
+            if limit is None or metric not in point:
+                continue
+            if point[metric] >= limit:
+                if self._armed.get(metric, True):
+                    self._armed[metric] = False
+                    alert = {"metric": metric, "value": point[metric], "threshold": limit, "t": point["t"]}
+                    self.alerts.append(alert)
+                    logger.warning(f"⚠️ [ResourceSampler] pid {self.pid}: {metric}={point[metric]} >= {limit}")
+                    if self.on_alert is not None:
+                        try:
+                            self.on_alert(alert)
+                        except Exception as e:
+                            logger.debug(f"Resource alert callback failed: {e}")
+            else:
+                self._armed[metric] = True
+
+    # ====================================================
+    # 生命周期
+    # ====================================================
+    def _safe_sample(self):
+        try:
+            self.sample()
+        except Exception as e:
+            logger.debug(f"Resource sample failed: {e}")
+
+    def _loop(self):
+        # 先采一次作为 cpu_percent 的基准点 (失败同样不能结束采样线程)
+        self._safe_sample()
+        while not self._stop.wait(self.interval):
+            self._safe_sample()
+
+    def start(self) -> "ResourceSampler":
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._loop, name=f"resource-sampler-{self.pid}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Dict:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+        return self.as_dict()
+
+    def as_dict(self) -> Dict:
+        return {
+            "interval": self.interval,
+            "samples": self.samples,
+            "peaks": dict(self.peaks),
+            "alerts": list(self.alerts),
+            "series": {col: list(values) for col, values in self.series.items()},
+        }
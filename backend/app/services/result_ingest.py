@@ -0,0 +1,153 @@
+import os
+import glob
+import json
+import logging
+from typing import List, Dict, Any, Optional, TypedDict
+
+import pandas as pd
+
+from app.models.dataset import DatasetConfig
+
+logger = logging.getLogger(__name__)
+
+# summary CSV 中的非分数列
+SUMMARY_KEY_COLUMNS = ["dataset", "version", "metric", "mode"]
+
+
+class ResultRecord(TypedDict):
+    """
+    一条指标结果，字段与 evaluation_results 表一致，可直接用于 insert().values([...])
+    """
+    task_id: int
+    dataset_config_id: int
+    dataset_name: str
+    metric_name: str
+    score: float
+    details: Dict[str, Any]
+
+
+def _run_dirs(workspace: str) -> List[str]:
+    """
+    workspace 下每次运行的时间戳目录 (OpenCompass 与多模态运行器各自一个)，按修改时间升序
+    """
+    dirs = [d for d in glob.glob(os.path.join(workspace, "*")) if os.path.isdir(d)]
+    dirs = [d for d in dirs if os.path.isdir(os.path.join(d, "results")) or os.path.isdir(os.path.join(d, "summary"))]
+    return sorted(dirs, key=os.path.getmtime)
+
+
+# ====================================================
+# 1. results/{model}/{abbr}.json (结构化输出，优先)
+# ====================================================
+def _read_results_json(run_dir: str, abbr_index: Dict[str, DatasetConfig], model_abbr: Optional[str]) -> List[Dict]:
+    model_dirs = [d for d in glob.glob(os.path.join(run_dir, "results", "*")) if os.path.isdir(d)]
+    if model_abbr and any(os.path.basename(d) == model_abbr for d in model_dirs):
+        model_dirs = [os.path.join(run_dir, "results", model_abbr)]
+
+    rows = []
+    for model_dir in model_dirs:
+        for abbr, cfg in abbr_index.items():
+            path = os.path.join(model_dir, f"{abbr}.json")
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to read {path}: {e}")
+                continue
+            if not isinstance(data, dict):
+                continue
+
+            # 逐样本 details 由 SampleStore 单独存储，这里只保留汇总指标
+            metrics = {
+                k: v for k, v in data.items()
+                if isinstance(v, (int, float)) and not isinstance(v, bool)
+            }
+            for metric, score in metrics.items():
+                rows.append({
+                    "abbr": abbr,
+                    "metric": metric,
+                    "score": float(score),
+                    "details": {"dataset": abbr, "model": os.path.basename(model_dir), "source": "results", **metrics},
+                })
+    return rows
+
+
+# ====================================================
+# 2. summary/summary_*.csv (兜底，多模态运行器只输出 CSV)
+# ====================================================
+def _pick_score_column(columns: List[str], model_abbr: Optional[str]) -> Optional[str]:
+    model_columns = [c for c in columns if c not in SUMMARY_KEY_COLUMNS]
+    if not model_columns:
+        return None
+    if model_abbr in model_columns:
+        return model_abbr
+    if len(model_columns) > 1:
+        logger.warning(f"⚠️ Summary has multiple model columns {model_columns}, none named {model_abbr!r}; using the last one")
+    return model_columns[-1]
+
+
+def _read_summary_csv(run_dir: str, abbr_index: Dict[str, DatasetConfig], model_abbr: Optional[str]) -> List[Dict]:
+    csv_files = glob.glob(os.path.join(run_dir, "summary", "summary_*.csv"))
+    if not csv_files:
+        return []
+    latest_csv = max(csv_files, key=os.path.getmtime)
+
+    df = pd.read_csv(latest_csv, dtype=str, keep_default_na=False)
+    if "dataset" not in df.columns:
+        logger.warning(f"⚠️ {latest_csv} has no 'dataset' column, skipped")
+        return []
+    score_col = _pick_score_column(list(df.columns), model_abbr)
+    if score_col is None:
+        return []
+
+    # 整列向量化转换：未评测的 "-" 等非数值变为 NaN 后过滤
+    scores = pd.to_numeric(df[score_col], errors="coerce")
+    if "metric" not in df.columns:
+        df["metric"] = "score"
+    keep = scores.notna() & df["dataset"].isin(abbr_index.keys())
+    skipped = df.loc[scores.notna() & ~keep, "dataset"].unique().tolist()
+    if skipped:
+        logger.warning(f"⚠️ Summary rows without a matching dataset config: {skipped}")
+
+    df = df[keep]
+    details = df.replace({"": None}).to_dict(orient="records")
+    return [
+        {"abbr": abbr, "metric": metric, "score": float(score), "details": detail}
+        for abbr, metric, score, detail in zip(df["dataset"], df["metric"], scores[keep], details)
+    ]
+
+
+# ====================================================
+# 3. 统一入口
+# ====================================================
+def load_results(
+    workspace: str,
+    task_id: int,
+    configs: List[DatasetConfig],
+    model_abbr: Optional[str] = None,
+) -> List[ResultRecord]:
+    """
+    读取任务 workspace 下所有运行目录的结果，按 config_name 精确映射到 DatasetConfig
+    - 每个运行目录优先读 results/ JSON，没有时读 summary CSV
+    - 同一 (配置, 指标) 出现多次时以最近一次运行为准
+    """
+    abbr_index = {cfg.config_name: cfg for cfg in configs}
+    merged: Dict[tuple, ResultRecord] = {}
+
+    for run_dir in _run_dirs(workspace):
+        rows = _read_results_json(run_dir, abbr_index, model_abbr)
+        if not rows:
+            rows = _read_summary_csv(run_dir, abbr_index, model_abbr)
+        for row in rows:
+            cfg = abbr_index[row["abbr"]]
+            merged[(cfg.id, row["metric"])] = ResultRecord(
+                task_id=task_id,
+                dataset_config_id=cfg.id,
+                dataset_name=cfg.meta.name if cfg.meta else row["abbr"],
+                metric_name=row["metric"],
+                score=row["score"],
+                details=row["details"],
+            )
+
+    return list(merged.values())
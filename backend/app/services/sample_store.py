@@ -0,0 +1,284 @@
+import os
+import re
+import glob
+import json
+import logging
+from typing import List, Dict, Any, Optional, Iterable, Callable
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from app.models.dataset import DatasetConfig
+
+logger = logging.getLogger(__name__)
+
+SAMPLES_FILE = "samples.parquet"
+
+# 列式存储 Schema：按 dataset_config_id 排序写入，每个配置独占一个 row group，
+# 读取单个配置时借助 row group 统计信息跳过其余数据
+SAMPLE_SCHEMA = pa.schema([
+    ("dataset_config_id", pa.int32()),
+    ("sample_id", pa.int32()),
+    ("prediction", pa.string()),
+    ("reference", pa.string()),
+    ("correct", pa.bool_()),
+    ("latency_ms", pa.float32()),
+])
+
+SAMPLE_COLUMNS = [f.name for f in SAMPLE_SCHEMA]
+
+# 对比类型: base 任务 -> target 任务的正误变化
+DIFF_KINDS = {
+    "regressed": (True, False),   # base 答对，target 答错
+    "improved": (False, True),    # base 答错，target 答对
+}
+
+
+def task_workspace(task_id: int) -> str:
+    return os.path.join(os.getcwd(), "workspace", "tasks", f"task_{task_id}")
+
+
+def samples_path(task_id: int) -> str:
+    return os.path.join(task_workspace(task_id), SAMPLES_FILE)
+
+
+def output_files(directory: str, abbr: str) -> List[str]:
+    """
+    某个配置在 OpenCompass 输出目录 (可含通配符，如 predictions/*) 下的文件：
+    {abbr}.json 或分片 {abbr}_0.json, {abbr}_1.json ... (按分片序号排序)
+    分片后缀必须是纯数字，mmlu_2shot.json、ceval_0shot_gen.json 这类其他配置的文件不会被当作分片
+    """
+    pattern = re.compile(rf"{re.escape(abbr)}(?:_(\d+))?\.json")
+    found = []
+    for path in glob.glob(os.path.join(directory, f"{glob.escape(abbr)}*.json")):
+        m = pattern.fullmatch(os.path.basename(path))
+        if m:
+            found.append((-1 if m.group(1) is None else int(m.group(1)), path))
+    return [path for _, path in sorted(found)]
+
+
+def _to_text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _load_json(path: str) -> Any:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"⚠️ Skip unreadable sample file {path}: {e}")
+        return None
+
+
+def _iter_indexed(data: Any) -> Iterable:
+    """
+    OpenCompass 的逐样本输出有两种形态：{"0": {...}, "1": {...}} 或 [{...}, ...]
+    统一产出 (样本序号, 记录)
+    """
+    if isinstance(data, dict):
+        for key, item in data.items():
+            try:
+                yield int(key), item
+            except (TypeError, ValueError):
+                continue
+    elif isinstance(data, list):
+        yield from enumerate(data)
+
+
+class SampleStore:
+    """
+    逐样本结果存储 (每个任务一个 Parquet 文件)
+    - 写: 任务完成后从 OpenCompass 的 predictions/ 与 results/ 中抽取逐样本记录
+    - 读: 按配置下推过滤，只读取需要的列与 row group，不把整个文件载入 Python 对象
+    """
+
+    def __init__(self, task_id: int):
+        self.task_id = task_id
+        self.workspace = task_workspace(task_id)
+        self.path = samples_path(task_id)
+
+    # ====================================================
+    # 写入 (评测结束后的抽取步骤)
+    # ====================================================
+    def _latest_run_dir(self) -> Optional[str]:
+        runs = [d for d in glob.glob(os.path.join(self.workspace, "*", "predictions")) if os.path.isdir(d)]
+        if not runs:
+            return None
+        return os.path.dirname(max(runs, key=os.path.getmtime))
+
+    def _read_predictions(self, run_dir: str, abbr: str) -> Dict[int, Dict]:
+        # 预测可能按分片输出: {abbr}.json 或 {abbr}_0.json, {abbr}_1.json ...
+        # 分片内的序号是全局序号，直接合并即可
+        merged: Dict[int, Dict] = {}
+        for path in output_files(os.path.join(run_dir, "predictions", "*"), abbr):
+            for idx, item in _iter_indexed(_load_json(path)):
+                if isinstance(item, dict):
+                    merged[idx] = item
+        return merged
+
+    def _read_correctness(self, run_dir: str, abbr: str) -> Dict[int, Dict]:
+        # 评测器返回 details 时 (如 AccEvaluator)，results/{model}/{abbr}.json 中带有逐样本正误
+        details: Dict[int, Dict] = {}
+        for path in glob.glob(os.path.join(run_dir, "results", "*", f"{abbr}.json")):
+            data = _load_json(path)
+            if not isinstance(data, dict):
+                continue
+            for idx, item in _iter_indexed(data.get("details")):
+                if isinstance(item, dict):
+                    details[idx] = item
+        return details
+
+    def ingest(self, configs: List[DatasetConfig], observer: Optional[Callable[[DatasetConfig, Dict[int, Dict]], None]] = None) -> int:
+        """
+        抽取逐样本记录并写入 samples.parquet，返回写入的样本数 (无逐样本输出时返回 0 且不生成文件)
+        observer: 每个配置读出预测后回调一次 (如吞吐统计)，避免重复读取预测文件
+        """
+        run_dir = self._latest_run_dir()
+        if run_dir is None:
+            return 0
+
+        tables = []
+        for cfg in sorted(configs, key=lambda c: c.id):
+            predictions = self._read_predictions(run_dir, cfg.config_name)
+            if not predictions:
+                continue
+            if observer is not None:
+                observer(cfg, predictions)
+            details = self._read_correctness(run_dir, cfg.config_name)
+
+            ids = sorted(predictions)
+            columns = {name: [] for name in SAMPLE_COLUMNS}
+            for idx in ids:
+                pred = predictions[idx]
+                detail = details.get(idx, {})
+                correct = detail.get("correct", detail.get("is_correct"))
+                if isinstance(correct, list):
+                    # 多次采样时视为全部正确才算答对
+                    correct = all(correct) if correct else None
+                latency = pred.get("latency_ms", pred.get("latency"))
+
+                columns["dataset_config_id"].append(cfg.id)
+                columns["sample_id"].append(idx)
+                columns["prediction"].append(_to_text(pred.get("prediction", detail.get("pred"))))
+                columns["reference"].append(_to_text(pred.get("gold", detail.get("answer", detail.get("answers")))))
+                columns["correct"].append(bool(correct) if correct is not None else None)
+                columns["latency_ms"].append(float(latency) if isinstance(latency, (int, float)) else None)
+            tables.append(pa.table(columns, schema=SAMPLE_SCHEMA))
+
+        if not tables:
+            return 0
+
+        tmp_path = self.path + ".tmp"
+        with pq.ParquetWriter(tmp_path, SAMPLE_SCHEMA, compression="zstd") as writer:
+            for table in tables:
+                writer.write_table(table, row_group_size=max(table.num_rows, 1))
+        os.replace(tmp_path, self.path)
+
+        total = sum(t.num_rows for t in tables)
+        logger.info(f"✅ [SampleStore] Task {self.task_id}: {total} samples written to {self.path}")
+        return total
+
+    # ====================================================
+    # 读取
+    # ====================================================
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def read(self, config_id: int, columns: Optional[List[str]] = None) -> pa.Table:
+        """
+        读取单个配置的样本 (谓词下推到 row group，仅解码所需列)
+        """
+        if not self.exists():
+            return SAMPLE_SCHEMA.empty_table().select(columns or SAMPLE_COLUMNS)
+        return pq.read_table(
+            self.path,
+            columns=columns,
+            filters=[("dataset_config_id", "=", config_id)],
+        )
+
+    def read_all(self, columns: Optional[List[str]] = None) -> pa.Table:
+        """
+        读取全部配置的样本 (仅解码所需列)
+        """
+        if not self.exists():
+            return SAMPLE_SCHEMA.empty_table().select(columns or SAMPLE_COLUMNS)
+        return pq.read_table(self.path, columns=columns)
+
+    def config_ids(self) -> List[int]:
+        """
+        文件中包含的配置 ID (只读 row group 统计信息)
+        """
+        if not self.exists():
+            return []
+        meta = pq.ParquetFile(self.path).metadata
+        col = SAMPLE_COLUMNS.index("dataset_config_id")
+        ids = set()
+        for i in range(meta.num_row_groups):
+            stats = meta.row_group(i).column(col).statistics
+            if stats is not None and stats.has_min_max:
+                ids.update(range(stats.min, stats.max + 1))
+        return sorted(ids)
+
+    def page(
+        self,
+        config_id: int,
+        correct: Optional[bool] = None,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        table = self.read(config_id, columns=SAMPLE_COLUMNS[1:])
+        if correct is not None:
+            table = table.filter(pc.equal(table["correct"], correct))
+        return {
+            "total": table.num_rows,
+            "items": table.slice(offset, limit).to_pylist(),
+        }
+
+
+def diff_samples(
+    base_task_id: int,
+    target_task_id: int,
+    config_id: int,
+    kind: str = "regressed",
+    offset: int = 0,
+    limit: int = 50,
+) -> Dict[str, Any]:
+    """
+    样本级对比：在 Arrow 中按 sample_id 关联两个任务的同一配置，筛选正误发生变化的题目
+    - regressed: base 答对、target 答错
+    - improved: base 答错、target 答对
+    - changed: 预测内容不同
+    只有最终分页的结果会转换为 Python 对象
+    """
+    cols = ["sample_id", "prediction", "reference", "correct"]
+    base = SampleStore(base_task_id).read(config_id, columns=cols)
+    target = SampleStore(target_task_id).read(config_id, columns=["sample_id", "prediction", "correct"])
+
+    base = base.rename_columns(["sample_id", "base_prediction", "reference", "base_correct"])
+    target = target.rename_columns(["sample_id", "target_prediction", "target_correct"])
+    joined = base.join(target, keys="sample_id", join_type="inner")
+
+    if kind in DIFF_KINDS:
+        base_ok, target_ok = DIFF_KINDS[kind]
+        mask = pc.and_(
+            pc.equal(joined["base_correct"], base_ok),
+            pc.equal(joined["target_correct"], target_ok),
+        )
+    else:
+        mask = pc.not_equal(joined["base_prediction"], joined["target_prediction"])
+    matched = joined.filter(mask).sort_by("sample_id")
+
+    return {
+        "base_task_id": base_task_id,
+        "target_task_id": target_task_id,
+        "config_id": config_id,
+        "kind": kind,
+        "compared": joined.num_rows,
+        "total": matched.num_rows,
+        "items": matched.slice(offset, limit).to_pylist(),
+    }
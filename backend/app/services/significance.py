@@ -0,0 +1,270 @@
+import os
+import zlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.compute as pc
+from scipy import fft as sfft
+from scipy.stats import binom, chi2
+
+from app.services.sample_store import SampleStore
+from app.core.metrics import record_cache
+
+# 重采样次数与显著性水平
+N_RESAMPLES = int(os.getenv("COMPARE_BOOTSTRAP_RESAMPLES", "10000"))
+ALPHA = 0.05
+
+# McNemar: 不一致样本数不超过该值时用精确二项检验，否则用带连续性校正的卡方近似
+MCNEMAR_EXACT_MAX = 50
+
+PAIR_CACHE_SIZE = 256
+
+_COLUMNS = ["dataset_config_id", "sample_id", "correct"]
+
+
+# ====================================================
+# 1. 配对计数 (Arrow 关联，仅输出按配置聚合后的计数)
+# ====================================================
+def paired_counts(base_task_id: int, target_task_id: int) -> pd.DataFrame:
+    """
+    按 (dataset_config_id, sample_id) 关联两个任务的逐样本正误，返回每个配置的:
+    n, base_correct, target_correct, n10 (base 对 target 错), n01 (base 错 target 对)
+    """
+    base = SampleStore(base_task_id).read_all(_COLUMNS)
+    target = SampleStore(target_task_id).read_all(_COLUMNS)
+    joined = base.join(
+        target.rename_columns(["dataset_config_id", "sample_id", "target_correct"]),
+        keys=["dataset_config_id", "sample_id"],
+        join_type="inner",
+    )
+    joined = joined.filter(pc.and_(pc.is_valid(joined["correct"]), pc.is_valid(joined["target_correct"])))
+
+    cfg = joined["dataset_config_id"].to_numpy()
+    a = joined["correct"].to_numpy(zero_copy_only=False).astype(np.int64)
+    b = joined["target_correct"].to_numpy(zero_copy_only=False).astype(np.int64)
+
+    config_ids, codes = np.unique(cfg, return_inverse=True)
+    size = len(config_ids)
+    return pd.DataFrame({
+        "dataset_config_id": config_ids.astype(int),
+        "n": np.bincount(codes, minlength=size),
+        "base_correct": np.bincount(codes, weights=a, minlength=size).astype(np.int64),
+        "target_correct": np.bincount(codes, weights=b, minlength=size).astype(np.int64),
+        "n10": np.bincount(codes, weights=a * (1 - b), minlength=size).astype(np.int64),
+        "n01": np.bincount(codes, weights=(1 - a) * b, minlength=size).astype(np.int64),
+    })
+
+
+# ====================================================
+# 2. 向量化统计 (所有配置一次性计算)
+# ====================================================
+def _resample_histogram(pmf: np.ndarray, rng: np.random.Generator, resamples: int) -> np.ndarray:
+    """
+    R 次 bootstrap 重采样的统计量只取有限个离散值 (答对数 / 差值)，
+    在其精确的单次重采样分布上抽取 R 次等价于对每个数据集做 Multinomial(R, pmf)，
+    返回各取值被抽中的次数 (D, L)，耗时与 R 和样本数无关
+    """
+    pmf = np.clip(pmf, 0.0, None)
+    pmf /= pmf.sum(axis=1, keepdims=True)
+    return rng.multinomial(resamples, pmf)
+
+
+def _histogram_quantiles(counts: np.ndarray, quantiles) -> np.ndarray:
+    """
+    按直方图计算分位数所在的取值下标，返回 (len(quantiles), D)
+    """
+    cum = np.cumsum(counts, axis=1)
+    total = cum[:, -1:]
+    return np.stack([np.argmax(cum >= q * total, axis=1) for q in quantiles])
+
+
+def _size_buckets(n: np.ndarray) -> List[np.ndarray]:
+    """
+    按样本数的 2 的幂次分桶 (返回各桶的行下标)：桶内 max(n) < 2·min(n)，
+    分布矩阵的宽度按桶内最大样本数分配，总开销与 Σn 成正比，而不是 数据集数 × 最大样本数
+    """
+    classes = np.ceil(np.log2(np.maximum(n, 1))).astype(np.int64)
+    return [np.flatnonzero(classes == c) for c in np.unique(classes)]
+
+
+def bootstrap_accuracy_ci(n: np.ndarray, k: np.ndarray, rng: np.random.Generator, resamples: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    单任务准确率的 bootstrap 置信区间 (百分制)
+    对 0/1 样本有放回重采样 n 次，答对数服从 Binomial(n, k/n)
+    """
+    low, high = np.empty(len(n)), np.empty(len(n))
+    for idx in _size_buckets(n):
+        low[idx], high[idx] = _accuracy_ci_block(n[idx], k[idx], rng, resamples)
+    return low, high
+
+
+def _accuracy_ci_block(n: np.ndarray, k: np.ndarray, rng: np.random.Generator, resamples: int) -> Tuple[np.ndarray, np.ndarray]:
+    support = np.arange(n.max() + 1)
+    pmf = binom.pmf(support[None, :], n[:, None], (k / n)[:, None])
+    counts = _resample_histogram(pmf, rng, resamples)
+    low, high = _histogram_quantiles(counts, [ALPHA / 2, 1 - ALPHA / 2])
+    return low / n * 100.0, high / n * 100.0
+
+
+def paired_bootstrap(n: np.ndarray, n10: np.ndarray, n01: np.ndarray, rng: np.random.Generator, resamples: int):
+    """
+    配对 bootstrap：每个样本的差值 (target - base) 只有 -1/0/+1 三种取值，
+    重采样 n 次后的差值之和的分布为单样本分布的 n 次卷积，用 FFT 对所有数据集一次算出。
+    返回差值 (百分点) 的置信区间与双侧 p 值
+    """
+    low, high, p_value = np.empty(len(n)), np.empty(len(n)), np.empty(len(n))
+    for idx in _size_buckets(n):
+        low[idx], high[idx], p_value[idx] = _paired_bootstrap_block(n[idx], n10[idx], n01[idx], rng, resamples)
+    return low, high, p_value
+
+
+def _paired_bootstrap_block(n: np.ndarray, n10: np.ndarray, n01: np.ndarray, rng: np.random.Generator, resamples: int):
+    n_max = int(n.max())
+    width = 2 * n_max + 1  # 取值范围 [-n_max, n_max]
+    size = sfft.next_fast_len(width, real=True)  # 长度不小于 width，循环卷积不会混叠
+    step = np.zeros((len(n), size))
+    step[:, 0] = 1.0 - (n10 + n01) / n
+    step[:, 1] = n01 / n
+    step[:, -1] = n10 / n
+
+    # 频域 n 次幂按极坐标计算 (比复数整数幂快一个数量级)
+    spectrum = sfft.rfft(step, axis=1)
+    powered = np.abs(spectrum) ** n[:, None] * np.exp(1j * np.angle(spectrum) * n[:, None])
+    pmf = sfft.irfft(powered, n=size, axis=1)
+    pmf = np.roll(pmf, n_max, axis=1)[:, :width]
+
+    counts = _resample_histogram(pmf, rng, resamples)
+    support = np.arange(-n_max, n_max + 1)
+    low, high = support[_histogram_quantiles(counts, [ALPHA / 2, 1 - ALPHA / 2])] / n * 100.0
+
+    le_zero = counts[:, support <= 0].sum(axis=1) / resamples
+    ge_zero = counts[:, support >= 0].sum(axis=1) / resamples
+    p_value = np.minimum(1.0, 2.0 * np.minimum(le_zero, ge_zero))
+    # 两个任务完全一致时不存在差异
+    p_value = np.where(n10 + n01 == 0, 1.0, p_value)
+    return low, high, p_value
+
+
+def mcnemar_p(n10: np.ndarray, n01: np.ndarray) -> np.ndarray:
+    """
+    McNemar 检验 (双侧)：不一致样本少时用精确二项检验，多时用卡方近似
+    """
+    discordant = n10 + n01
+    exact = np.minimum(1.0, 2.0 * binom.cdf(np.minimum(n10, n01), discordant, 0.5))
+    stat = np.divide((np.abs(n10 - n01) - 1.0) ** 2, discordant, out=np.zeros(len(discordant)), where=discordant > 0)
+    approx = chi2.sf(stat, df=1)
+    p = np.where(discordant <= MCNEMAR_EXACT_MAX, exact, approx)
+    return np.where(discordant == 0, 1.0, p)
+
+
+def paired_significance(counts: pd.DataFrame, resamples: int = N_RESAMPLES, seed: int = 0) -> pd.DataFrame:
+    counts = counts[counts["n"] > 0]
+    if counts.empty:
+        return pd.DataFrame(columns=[
+            "dataset_config_id", "n", "base_accuracy", "base_ci_low", "base_ci_high", "accuracy",
+            "ci_low", "ci_high", "diff", "diff_ci_low", "diff_ci_high", "n10", "n01",
+            "p_bootstrap", "p_mcnemar", "significant",
+        ])
+    n = counts["n"].to_numpy(dtype=np.int64)
+    k_base = counts["base_correct"].to_numpy(dtype=np.int64)
+    k_target = counts["target_correct"].to_numpy(dtype=np.int64)
+    n10 = counts["n10"].to_numpy(dtype=np.int64)
+    n01 = counts["n01"].to_numpy(dtype=np.int64)
+
+    rng = np.random.default_rng(seed)
+    base_low, base_high = bootstrap_accuracy_ci(n, k_base, rng, resamples)
+    target_low, target_high = bootstrap_accuracy_ci(n, k_target, rng, resamples)
+    diff_low, diff_high, p_boot = paired_bootstrap(n, n10, n01, rng, resamples)
+    p_mcnemar = mcnemar_p(n10, n01)
+
+    return pd.DataFrame({
+        "dataset_config_id": counts["dataset_config_id"].to_numpy(),
+        "n": n,
+        "base_accuracy": k_base / n * 100.0,
+        "base_ci_low": base_low,
+        "base_ci_high": base_high,
+        "accuracy": k_target / n * 100.0,
+        "ci_low": target_low,
+        "ci_high": target_high,
+        "diff": (k_target - k_base) / n * 100.0,
+        "diff_ci_low": diff_low,
+        "diff_ci_high": diff_high,
+        "n10": n10,
+        "n01": n01,
+        "p_bootstrap": p_boot,
+        "p_mcnemar": p_mcnemar,
+        "significant": p_mcnemar < ALPHA,
+    })
+
+
+# ====================================================
+# 3. 任务对缓存
+# ====================================================
+class _PairCache:
+    """
+    (base, target) -> 统计结果 的有界 LRU；键中带上样本文件的修改时间，任务重跑后自然失效
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[tuple, List[Dict]]" = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+pair_cache = _PairCache(PAIR_CACHE_SIZE)
+
+
+def _stamp(task_id: int) -> Optional[float]:
+    store = SampleStore(task_id)
+    return os.path.getmtime(store.path) if store.exists() else None
+
+
+def compare_pair(base_task_id: int, target_task_id: int, resamples: int = N_RESAMPLES) -> List[Dict]:
+    """
+    两个任务逐配置的置信区间与显著性 (任一任务没有逐样本记录时返回空列表)
+    """
+    base_stamp, target_stamp = _stamp(base_task_id), _stamp(target_task_id)
+    if base_stamp is None or target_stamp is None:
+        return []
+
+    key = (base_task_id, target_task_id, base_stamp, target_stamp, resamples)
+    cached = pair_cache.get(key)
+    record_cache("significance", cached is not None)
+    if cached is not None:
+        return cached
+
+    # 固定种子，同一任务对重复计算结果一致
+    seed = zlib.crc32(f"{base_task_id}:{target_task_id}".encode())
+    stats = paired_significance(paired_counts(base_task_id, target_task_id), resamples, seed)
+
+    int_cols = ["dataset_config_id", "n", "n10", "n01"]
+    float_cols = [c for c in stats.columns if c not in int_cols and c != "significant"]
+    stats[float_cols] = stats[float_cols].round(4)
+    records = stats.to_dict(orient="records")
+    for r in records:
+        for c in int_cols:
+            r[c] = int(r[c])
+        r["significant"] = bool(r["significant"])
+    pair_cache.put(key, records)
+    return records
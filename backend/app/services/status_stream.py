@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from app.core.task_events import task_event_hub, FINISHED_STATUSES
+from app.services.log_stream import sse_event, KEEPALIVE_SECONDS, STATUS_POLL_FALLBACK
+from app.utils import fast_json
+
+logger = logging.getLogger(__name__)
+
+# 单个连接最多订阅的任务数 (更多任务请不带 task_ids 订阅全部)
+MAX_STREAM_TASK_IDS = 500
+
+
+async def task_status_events(
+    task_ids: Optional[List[int]],
+    load_statuses: Callable[[Optional[List[int]]], List[Dict]],
+) -> AsyncIterator[str]:
+    """
+    任务状态推送 (多任务)：
+    - snapshot: 连接建立时的当前状态 (指定 task_ids 时为这些任务，否则为所有未结束的任务)
+    - status: 状态/进度变化 (Redis 订阅推送，与 TaskService 发布的载荷一致)
+    - load_statuses(ids) 为同步查询函数，ids 为 None 时返回未结束的任务；
+      只在连接建立时与 Redis 订阅离线时 (低频) 调用
+    """
+    wake = asyncio.Event()
+    subs = [task_event_hub.subscribe(tid, wake) for tid in (task_ids or [None])]
+    loop = asyncio.get_running_loop()
+    last_sent = last_poll = loop.time()
+    # task_id -> (status, progress)，用于离线兜底时只推送变化
+    known: Dict[int, Tuple] = {}
+
+    def poll() -> List[Dict]:
+        if task_ids:
+            return load_statuses(task_ids)
+        rows = load_statuses(None)
+        # 之前未结束、现在不在未结束列表中的任务，单独查一次最终状态
+        active = {row["task_id"] for row in rows}
+        missing = [tid for tid, (status, _) in known.items() if status not in FINISHED_STATUSES and tid not in active]
+        return rows + (load_statuses(missing) if missing else [])
+
+    try:
+        # 订阅之后再取快照，避免错过两者之间的变化
+        snapshot = await asyncio.to_thread(poll)
+        for row in snapshot:
+            known[row["task_id"]] = (row["status"], row["progress"])
+        yield sse_event("snapshot", fast_json.dumps_str({"tasks": snapshot}))
+
+        while True:
+            wake.clear()
+            for sub in subs:
+                for event in sub.drain():
+                    known[event["task_id"]] = (event.get("status"), event.get("progress"))
+                    last_sent = loop.time()
+                    yield sse_event("status", fast_json.dumps_str(event))
+
+            timeout = KEEPALIVE_SECONDS if task_event_hub.available else min(KEEPALIVE_SECONDS, STATUS_POLL_FALLBACK)
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                if loop.time() - last_sent >= KEEPALIVE_SECONDS:
+                    last_sent = loop.time()
+                    yield ": ping\n\n"
+
+            # Redis 订阅离线：低频查库，只推送有变化的任务
+            if not task_event_hub.available and loop.time() - last_poll >= STATUS_POLL_FALLBACK:
+                last_poll = loop.time()
+                for row in await asyncio.to_thread(poll):
+                    state = (row["status"], row["progress"])
+                    if known.get(row["task_id"]) != state:
+                        known[row["task_id"]] = state
+                        last_sent = loop.time()
+                        yield sse_event("status", fast_json.dumps_str(row))
+    finally:
+        for sub in subs:
+            task_event_hub.unsubscribe(sub)
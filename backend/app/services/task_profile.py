@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlmodel import Session, select, delete
+
+from app.models.task_profile import TaskProfile
+
+TIMINGS = "timings"
+THROUGHPUT = "throughput"
+RESOURCES = "resources"
+
+
+def save_profile(session: Session, task_id: int, kind: str, data: Dict[str, Any]):
+    """
+    写入/覆盖任务的一类画像 (不提交，由调用方所在事务统一提交)
+    """
+    row = session.exec(
+        select(TaskProfile).where(TaskProfile.task_id == task_id, TaskProfile.kind == kind)
+    ).first()
+    if row is None:
+        row = TaskProfile(task_id=task_id, kind=kind)
+    row.data = data
+    row.updated_at = datetime.utcnow()
+    session.add(row)
+
+
+def load_profiles(session: Session, task_ids: List[int], kinds: Optional[List[str]] = None) -> Dict[int, Dict[str, Any]]:
+    """
+    批量读取：{task_id: {kind: data}}
+    """
+    if not task_ids:
+        return {}
+    statement = select(TaskProfile.task_id, TaskProfile.kind, TaskProfile.data).where(TaskProfile.task_id.in_(task_ids))
+    if kinds:
+        statement = statement.where(TaskProfile.kind.in_(kinds))
+    profiles: Dict[int, Dict[str, Any]] = {}
+    for task_id, kind, data in session.exec(statement).all():
+        profiles.setdefault(task_id, {})[kind] = data
+    return profiles
+
+
+def delete_profiles(session: Session, task_id: int):
+    session.exec(delete(TaskProfile).where(TaskProfile.task_id == task_id))
@@ -2,24 +2,38 @@ import json
 import os
 import shutil
 import time
-import glob
 import requests
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from fastapi import HTTPException
-from sqlmodel import Session, select
+from sqlmodel import Session, select, delete
+from sqlalchemy import insert, func
+from sqlalchemy.orm import selectinload
 from typing import List, Optional, Dict, Any
 
 from app.models.task import EvaluationTask
 from app.models.llm_model import LLMModel
-from app.models.dataset import DatasetConfig
+from app.models.dataset import DatasetMeta, DatasetConfig
 from app.models.links import TaskDatasetLink
 from app.models.result import EvaluationResult
 from app.models.scheme import EvaluationScheme
 from app.schemas.task_schema import TaskCreate
+from app.utils.scoring import normalize_score
+from app.utils import fast_json
+from app.core.cache import compare_cache
+from app.core.task_events import publish_task_event
+from app.core.metrics import record_ingest, record_model_throughput
 # 引入 Runners
 from app.services.opencompass_runner import OpenCompassRunner
 from app.services.multimodal_runner import MultimodalRunner
+from app.services.sample_store import SampleStore, samples_path
+from app.services.leaderboard_service import LeaderboardService
+from app.services.significance import compare_pair
+from app.services.result_ingest import load_results, ResultRecord
+from app.services.task_timing import StageTimer, opencompass_timings
+from app.services.task_profile import save_profile, load_profiles, delete_profiles, TIMINGS, THROUGHPUT, RESOURCES
+from app.services.throughput import ThroughputProfiler
 
 class TaskService:
     def __init__(self, session: Session):
@@ -136,20 +150,31 @@ class TaskService:
             self.session.add(link)
         
         self.session.commit()
+        self._publish_status(db_task)
         return db_task
 
     def delete_task(self, task_id: int) -> bool:
         task = self.get_task(task_id)
         if not task:
             return False
-        results = self.session.exec(select(EvaluationResult).where(EvaluationResult.task_id == task_id)).all()
-        for r in results:
-            self.session.delete(r)
-        links = self.session.exec(select(TaskDatasetLink).where(TaskDatasetLink.task_id == task_id)).all()
-        for l in links:
-            self.session.delete(l)  
-        self.session.delete(task)
+        # 集合式删除，避免逐行加载与删除
+        self.session.exec(delete(EvaluationResult).where(EvaluationResult.task_id == task_id))
+        self.session.exec(delete(TaskDatasetLink).where(TaskDatasetLink.task_id == task_id))
+        delete_profiles(self.session, task_id)
+        self.session.exec(delete(EvaluationTask).where(EvaluationTask.id == task_id))
+        self.session.expunge(task)
+        # 排行榜中以该任务为最新/最佳来源的条目需重算
+        LeaderboardService(self.session).remove_task(task_id)
         self.session.commit()
+        compare_cache.invalidate_task(task_id)
+        # 逐样本文件随任务删除，避免自增 id 复用后读到旧任务的样本
+        try:
+            os.remove(samples_path(task_id))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"⚠️ Warning: Failed to remove samples of task {task_id}: {e}")
+        publish_task_event(task_id, "deleted")
         return True
 
     def get_task(self, task_id: int) -> Optional[EvaluationTask]:
@@ -176,6 +201,13 @@ class TaskService:
         task.error_msg = None
         self.session.add(task)
         self.session.commit()
+        # 重跑：旧结果即将被替换，清除包含该任务的对比缓存
+        compare_cache.invalidate_task(task_id)
+        self._publish_status(task)
+
+        # 阶段耗时 (成功或失败都随任务保存)
+        timer = StageTimer()
+        text_runner = None
 
         try:
             # 2. 准备数据对象
@@ -186,7 +218,8 @@ class TaskService:
             if model.type == "api":
                 try:
                     # 获取修正后的 URL
-                    valid_url = self._check_and_fix_api_url(model)
+                    with timer.stage("api_precheck"):
+                        valid_url = self._check_and_fix_api_url(model)
                     # ⚠️ 关键：在内存中更新 model 对象的 base_url
                     # 这样传给 OpenCompassRunner 的就是正确的 URL 了
                     # (注：这里没有调用 session.commit()，所以不会修改数据库中的原配置，只对本次运行生效。
@@ -203,7 +236,9 @@ class TaskService:
                 pass
             
             configs = self.session.exec(
-                select(DatasetConfig).where(DatasetConfig.id.in_(config_ids))
+                select(DatasetConfig)
+                .options(selectinload(DatasetConfig.meta))
+                .where(DatasetConfig.id.in_(config_ids))
             ).all()
 
             if not configs:
@@ -222,10 +257,13 @@ class TaskService:
                     multimodal_configs.append(cfg)
 
             # 初始化 Workspace
-            task_workspace = os.path.join(os.getcwd(), "workspace", "tasks", f"task_{task_id}")
-            os.makedirs(task_workspace, exist_ok=True)
+            with timer.stage("workspace_setup"):
+                task_workspace = os.path.join(os.getcwd(), "workspace", "tasks", f"task_{task_id}")
+                os.makedirs(task_workspace, exist_ok=True)
             
             start_time = time.time()
+            text_run_seconds = 0.0
+            run_start = None
             
             # ========================================
             # 4. 执行文本评测 (OpenCompass)
@@ -236,10 +274,18 @@ class TaskService:
                 task.progress = 10
                 self.session.add(task)
                 self.session.commit()
+                self._publish_status(task)
                 
                 text_runner = OpenCompassRunner(workspace=task_workspace)
-                config_path = text_runner.generate_config(task_id, model, text_configs)
-                text_runner.run(config_path)
+                with timer.stage("config_generation"):
+                    config_path = text_runner.generate_config(task_id, model, text_configs)
+                # OpenCompass 子进程 (启动 + 推理 + 评估)，细分耗时从其输出中推算 (失败时同样记录)
+                run_start = time.time()
+                try:
+                    text_runner.run(config_path)
+                finally:
+                    text_run_seconds = time.time() - run_start
+                    self._record_opencompass_timings(timer, task_workspace, text_configs, model.name, run_start, text_run_seconds)
 
             # ========================================
             # 5. 执行多模态评测 (MultimodalRunner)
@@ -250,9 +296,11 @@ class TaskService:
                 task.progress = 50
                 self.session.add(task)
                 self.session.commit()
+                self._publish_status(task)
                 
                 mm_runner = MultimodalRunner(workspace=task_workspace)
-                mm_runner.run(task_id, model, multimodal_configs)
+                with timer.stage("multimodal"):
+                    mm_runner.run(task_id, model, multimodal_configs)
             
             end_time = time.time()
             total_duration = end_time - start_time
@@ -261,121 +309,176 @@ class TaskService:
             task.progress = 90
             self.session.add(task)
             self.session.commit()
+            self._publish_status(task)
 
             # ========================================
             # 6. 统一解析结果 (Merge Results)
             # ========================================
             print(f"📊 [Task {task_id}] Parsing all results...")
             
-            # 扫描 workspace 下所有的 summary csv
-            # OpenCompass 和 MultimodalRunner 都会输出到 workspace/*/summary/summary_*.csv
-            csv_pattern = os.path.join(task_workspace, "*", "summary", "summary_*.csv")
-            csv_files = glob.glob(csv_pattern)
-            
-            if not csv_files:
-                raise ValueError("No result CSVs found in workspace.")
-            
-            raw_results = []
-            
-            for csv_f in csv_files:
-                print(f"   - Reading result: {csv_f}")
-                try:
-                    df = pd.read_csv(csv_f)
-                    for _, row in df.iterrows():
-                        row_dict = row.to_dict()
-                        
-                        dataset_abbr = row_dict.get("dataset", "Unknown")
-                        metric = row_dict.get("metric", "score")
-                        
-                        # 智能提取分数
-                        score = 0.0
-                        for col in reversed(df.columns):
-                            val = row_dict[col]
-                            if isinstance(val, (int, float)) and col not in ['version', 'metric', 'mode']:
-                                score = float(val)
-                                break
-                        
-                        raw_results.append({
-                            "dataset": dataset_abbr,
-                            "metric": metric,
-                            "score": score,
-                            "raw_data": row_dict
-                        })
-                except Exception as parse_err:
-                    print(f"⚠️ Warning: Failed to parse {csv_f}: {parse_err}")
-
-            if not raw_results:
-                raise ValueError("Parsed CSVs but found no valid data rows.")
-
-            # 7. 入库与统计
-            table_data = [] 
-            
-            for res in raw_results:
-                # 寻找对应的 config 对象 (通过 dataset abbr 模糊匹配)
-                matched_config = None
-                dataset_abbr = res['dataset']
-                
-                # 优先完全匹配
-                for cfg in configs:
-                    if cfg.config_name == dataset_abbr:
-                        matched_config = cfg
-                        break
-                
-                # 其次模糊匹配
-                if not matched_config:
-                    for cfg in configs:
-                        if cfg.meta.name in dataset_abbr or dataset_abbr in cfg.meta.name:
-                            matched_config = cfg
-                            break
-                
-                target_config_id = matched_config.id if matched_config else configs[0].id
-                dataset_name_display = matched_config.meta.name if matched_config else dataset_abbr
-                dataset_category = matched_config.meta.category if matched_config else "Unknown"
-                
-                # 写入数据库
-                db_result = EvaluationResult(
-                    task_id=task_id,
-                    dataset_config_id=target_config_id,
-                    dataset_name=dataset_name_display,
-                    metric_name=res['metric'],
-                    score=res['score'],
-                    details=res['raw_data']
+            # OpenCompass 与 MultimodalRunner 的输出都在 workspace/{timestamp}/ 下，
+            # 优先读 results/ JSON，兜底读 summary CSV，按 config_name 精确映射
+            parse_start = time.perf_counter()
+            with timer.stage("parsing"):
+                records = load_results(task_workspace, task_id, configs, model_abbr=model.name)
+            record_ingest("results", len(records), time.perf_counter() - parse_start)
+            if not records:
+                raise ValueError("No evaluation results found in workspace.")
+
+            # 7. 统计数据
+            config_by_id = {cfg.id: cfg for cfg in configs}
+            table_data = [
+                {
+                    "dataset": r["dataset_name"],
+                    "capability": config_by_id[r["dataset_config_id"]].meta.category,
+                    "metric": r["metric_name"],
+                    "score": r["score"]
+                }
+                for r in records
+            ]
+
+            # 8. 抽取逐样本记录，顺带统计吞吐 (失败不影响任务结果)
+            profiles = {}
+            profiler = None
+            if text_configs:
+                profiler = ThroughputProfiler(
+                    task_workspace, text_configs, model.name, run_start,
+                    tokenizer_path=None if model.type in ["api", "local_api"] else model.path,
                 )
-                self.session.add(db_result)
-                
-                table_data.append({
-                    "dataset": dataset_name_display,
-                    "capability": dataset_category,
-                    "metric": res['metric'],
-                    "score": res['score']
-                })
-
-            # 8. 生成最终摘要
+            try:
+                ingest_start = time.perf_counter()
+                with timer.stage("sample_ingest"):
+                    sample_count = SampleStore(task_id).ingest(text_configs, observer=profiler.observe if profiler else None)
+                record_ingest("samples", sample_count, time.perf_counter() - ingest_start)
+                if sample_count:
+                    print(f"🧾 [Task {task_id}] Stored {sample_count} per-sample records.")
+            except Exception as sample_err:
+                print(f"⚠️ Warning: Failed to store per-sample records: {sample_err}")
+            if text_runner is not None and text_runner.resource_profile:
+                profiles[RESOURCES] = text_runner.resource_profile
+            if profiler is not None:
+                try:
+                    throughput = profiler.build(timer.datasets, run_cfg=text_runner.run_cfg, total_seconds=text_run_seconds)
+                    total = throughput["total"]
+                    record_model_throughput(
+                        model.name, total["samples"], total["seconds"] or text_run_seconds,
+                        tokens=total["completion_tokens"] if throughput["token_source"] else None,
+                    )
+                    profiles[THROUGHPUT] = throughput
+                except Exception as profile_err:
+                    print(f"⚠️ Warning: Failed to build throughput profile: {profile_err}")
+
+            # 9. 生成最终摘要
             final_summary = self._generate_summary(table_data)
             final_summary["time_stats"] = {
                 "total_duration": round(total_duration, 2),
                 "avg_per_dataset": round(total_duration / len(configs), 2) if configs else 0
             }
-            
-            task.result_summary = json.dumps(final_summary)
-            task.status = "success"
-            task.progress = 100
-            task.finished_at = datetime.now()
+
+            # 10. 单个短事务内落库
+            self._finalize_success(task, records, final_summary, timer, profiles)
             
             print(f"✅ [Task {task_id}] Finished successfully.")
 
         except Exception as e:
             import traceback
             traceback.print_exc()
+            # 丢弃未提交的半成品 (如批量写入中途失败)，只记录失败状态
+            self.session.rollback()
             task.status = "failed"
             task.error_msg = str(e)
+            # 失败时同样保存已完成阶段的耗时，便于定位卡在哪一步
+            try:
+                save_profile(self.session, task_id, TIMINGS, timer.as_dict())
+                # 资源采样对排查失败 (如 OOM) 最有用
+                if text_runner is not None and text_runner.resource_profile:
+                    save_profile(self.session, task_id, RESOURCES, text_runner.resource_profile)
+            except Exception as profile_err:
+                print(f"⚠️ Warning: Failed to save task timings: {profile_err}")
             print(f"❌ [Task {task_id}] Failed: {e}")
         
         finally:
             self.session.add(task)
             self.session.commit()
+            compare_cache.invalidate_task(task_id)
+            self._publish_status(task)
             return f"Task {task_id} processed"
 
+    def _publish_status(self, task: EvaluationTask):
+        """
+        提交后广播任务状态 (日志流 / 任务状态推送据此更新，不再轮询数据库)
+        """
+        publish_task_event(task.id, task.status, task.progress, error_msg=task.error_msg)
+
+    def _record_opencompass_timings(self, timer: StageTimer, workspace: str, configs: List[DatasetConfig],
+                                    model_abbr: str, started_at: float, total_seconds: float):
+        """
+        从 OpenCompass 输出推算子进程启动、推理、评估耗时 (推算失败不影响任务)
+        - stages 中各阶段互不重叠：启动 + 推理 + 评估 + 其余 (汇总、退出等) = 子进程总耗时，
+          推算不出细分时整体记为 opencompass
+        - 推理/评估按任务合计各记一次，逐数据集耗时只保存在 datasets 中
+        """
+        try:
+            oc = opencompass_timings(workspace, configs, model_abbr, started_at, started_at + total_seconds)
+        except Exception as timing_err:
+            print(f"⚠️ Warning: Failed to read OpenCompass timings: {timing_err}")
+            oc = None
+        if not oc:
+            timer.add("opencompass", total_seconds)
+            return
+
+        totals = {"inference": 0.0, "evaluation": 0.0}
+        for cfg in configs:
+            spans = oc["datasets"].get(cfg.config_name)
+            if not spans:
+                continue
+            timer.datasets.append({
+                "dataset_config_id": cfg.id,
+                "config_name": cfg.config_name,
+                "dataset": cfg.meta.name if cfg.meta else cfg.config_name,
+                **spans,
+            })
+            for phase in totals:
+                totals[phase] += spans.get(phase) or 0.0
+
+        timer.add("subprocess_startup", oc["subprocess_startup"])
+        for phase, seconds in totals.items():
+            timer.add(phase, seconds)
+        timer.add("opencompass_other", max(0.0, total_seconds - oc["subprocess_startup"] - sum(totals.values())))
+
+    def _finalize_success(self, task: EvaluationTask, records: List[ResultRecord], summary: Dict,
+                          timer: Optional[StageTimer] = None, profiles: Optional[Dict[str, Dict]] = None):
+        """
+        任务收尾：批量写入结果、更新任务状态、增量更新排行榜，在一个短事务中提交
+        (所有文件解析与统计都在此之前完成，事务内只有写库操作)
+        """
+        persist_start = time.perf_counter()
+        if records:
+            self.session.execute(insert(EvaluationResult), records)
+
+        task.result_summary = fast_json.dumps_str(summary)
+        task.status = "success"
+        task.progress = 100
+        task.finished_at = datetime.now()
+        self.session.add(task)
+        self.session.flush()
+
+        # 排行榜失败只回滚排行榜部分，可通过 rebuild 修复
+        try:
+            with self.session.begin_nested():
+                LeaderboardService(self.session).apply_task(task)
+        except Exception as lb_err:
+            print(f"⚠️ Warning: Failed to update leaderboard: {lb_err}")
+
+        # 阶段耗时与任务状态同一事务提交 (persistence 不含最后的 commit 本身)
+        if timer is not None:
+            timer.add("persistence", time.perf_counter() - persist_start)
+            save_profile(self.session, task.id, TIMINGS, timer.as_dict())
+        for kind, data in (profiles or {}).items():
+            save_profile(self.session, task.id, kind, data)
+
+        self.session.commit()
+
     def _generate_summary(self, table_data: List[Dict]) -> Dict:
         """
         根据结果生成雷达图和表格数据
@@ -387,22 +490,10 @@ class TaskService:
         
         for item in table_data:
             cat = item['capability']
-            try:
-                raw_score = float(item['score'])
-            except (ValueError, TypeError):
-                raw_score = 0.0
-                
-            metric = str(item['metric']).lower()
-            norm_score = raw_score
-            
             # 过滤负向指标，转换0-1分数
-            is_negative_metric = any(x in metric for x in ['ppl', 'bpb', 'loss'])
-            
-            if is_negative_metric:
-                continue 
-            else:
-                if 0.0 <= raw_score <= 1.0:
-                    norm_score = raw_score * 100.0
+            norm_score = normalize_score(item['score'], item['metric'])
+            if norm_score is None:
+                continue
             
             if cat not in capability_stats:
                 capability_stats[cat] = []
@@ -430,123 +521,229 @@ class TaskService:
     def compare_tasks(self, task_ids: List[int]) -> Dict[str, Any]:
         """
         对比多个任务的结果 (必须基于同一 Scheme)
+        数据通过少量 JOIN 查询一次取出，矩阵与能力均分由 pandas 透视计算；
+        结果按 (任务集合, 结果版本戳) 缓存，重复打开同一对比直接返回
         """
+        data, body = self._compare_cached(task_ids)
+        return data if data is not None else fast_json.loads(body)
+
+    def compare_tasks_json(self, task_ids: List[int]) -> bytes:
+        """
+        同 compare_tasks，直接返回序列化后的响应体 (命中缓存时无需反序列化再序列化)
+        """
+        return self._compare_cached(task_ids)[1]
+
+    def _compare_cached(self, task_ids: List[int]):
+        tasks = self._load_compare_tasks(task_ids)
+
+        # 版本戳：任务状态、创建/完成时间、结果行数与最大结果 id，任务重跑/结果变化后随之改变
+        # (带上创建时间，库重建后复用的自增 id 不会命中 Redis 中的旧条目)
+        stamp = compare_cache.make_stamp(
+            (t.id, t.status, t.created_at, t.finished_at, t.result_count, t.last_result_id) for t in tasks
+        )
+        body = compare_cache.get(task_ids, stamp)
+        if body is not None:
+            return None, body
+
+        data = self._compute_compare(tasks, task_ids)
+        body = fast_json.dumps(data)
+        compare_cache.put(task_ids, stamp, body)
+        return data, body
+
+    def _load_compare_tasks(self, task_ids: List[int]):
         if len(task_ids) < 2:
             raise HTTPException(status_code=400, detail="至少选择两个任务进行对比")
-            
+
+        # 1. 任务 + 模型名 + 结果行统计 (一次 JOIN，同时作为缓存版本戳)
+        result_stats = (
+            select(
+                EvaluationResult.task_id,
+                func.count(EvaluationResult.id).label("result_count"),
+                func.max(EvaluationResult.id).label("last_result_id"),
+            )
+            .where(EvaluationResult.task_id.in_(task_ids))
+            .group_by(EvaluationResult.task_id)
+            .subquery()
+        )
         tasks = self.session.exec(
-            select(EvaluationTask).where(EvaluationTask.id.in_(task_ids))
+            select(
+                EvaluationTask.id,
+                EvaluationTask.scheme_id,
+                EvaluationTask.model_id,
+                EvaluationTask.status,
+                EvaluationTask.created_at,
+                EvaluationTask.finished_at,
+                LLMModel.name,
+                result_stats.c.result_count,
+                result_stats.c.last_result_id,
+            )
+            .outerjoin(LLMModel, LLMModel.id == EvaluationTask.model_id)
+            .outerjoin(result_stats, result_stats.c.task_id == EvaluationTask.id)
+            .where(EvaluationTask.id.in_(task_ids))
+            .order_by(EvaluationTask.id)
         ).all()
-        
+
         if len(tasks) != len(task_ids):
              raise HTTPException(status_code=404, detail="部分任务未找到")
 
         base_scheme_id = tasks[0].scheme_id
         if not base_scheme_id:
              raise HTTPException(status_code=400, detail="无法对比未绑定方案的任务")
-             
+
         for t in tasks:
             if t.scheme_id != base_scheme_id:
                 raise HTTPException(status_code=400, detail="所有任务必须属于同一个评测方案")
-        
+        return tasks
+
+    def _compute_compare(self, tasks, task_ids: List[int]) -> Dict[str, Any]:
+        base_scheme_id = tasks[0].scheme_id
         scheme = self.session.get(EvaluationScheme, base_scheme_id)
         scheme_name = scheme.name if scheme else "Unknown Scheme"
 
         models_meta = []
         task_id_to_model_name = {}
-        
+        # 阶段耗时画像 (一次查询)；与任务收尾同一事务写入，缓存 stamp 同样覆盖
+        timings = load_profiles(self.session, task_ids, [TIMINGS])
+
         for t in tasks:
-            model = self.session.get(LLMModel, t.model_id)
-            model_name = model.name if model else f"Unknown-{t.model_id}"
+            model_name = t.name if t.name else f"Unknown-{t.model_id}"
             display_name = f"{model_name} (#{t.id})"
             
             models_meta.append({
                 "task_id": t.id,
                 "model_name": model_name,
                 "display_name": display_name,
-                "finished_at": t.finished_at
+                "finished_at": t.finished_at,
+                "timings": timings.get(t.id, {}).get(TIMINGS),
             })
             task_id_to_model_name[t.id] = display_name
 
-        table_map = {}
-        capability_map = {t.id: {} for t in tasks}
-
-        all_results = self.session.exec(
-            select(EvaluationResult).where(EvaluationResult.task_id.in_(task_ids))
+        # 2. 结果 + 能力分类 (一次 JOIN，配置不存在时 category 为空)
+        #    按 (task_id, id) 排序：表格行按首次出现的顺序排列
+        rows = self.session.exec(
+            select(
+                EvaluationResult.task_id,
+                EvaluationResult.dataset_config_id,
+                EvaluationResult.dataset_name,
+                EvaluationResult.metric_name,
+                EvaluationResult.score,
+                DatasetMeta.category,
+            )
+            .outerjoin(DatasetConfig, DatasetConfig.id == EvaluationResult.dataset_config_id)
+            .outerjoin(DatasetMeta, DatasetMeta.id == DatasetConfig.meta_id)
+            .where(EvaluationResult.task_id.in_(task_ids))
+            .order_by(EvaluationResult.task_id, EvaluationResult.id)
         ).all()
-        
-        for res in all_results:
-            row_key = f"{res.dataset_name} ({res.metric_name})"
-            if row_key not in table_map:
-                table_map[row_key] = {
-                    "dataset": res.dataset_name,
-                    "metric": res.metric_name,
-                    "scores": {} 
-                }
-            table_map[row_key]["scores"][res.task_id] = res.score
-            
-            config = self.session.get(DatasetConfig, res.dataset_config_id)
-            if config:
-                cat = config.meta.category
-                if cat not in capability_map[res.task_id]:
-                    capability_map[res.task_id][cat] = []
-                
-                score_val = res.score
-                if 0 <= score_val <= 1.0: score_val *= 100
-                capability_map[res.task_id][cat].append(score_val)
+        df = pd.DataFrame(rows, columns=["task_id", "config_id", "dataset", "metric", "score", "category"])
+
+        final_table = self._build_compare_table(df, task_ids)
+        radar_indicators, radar_series = self._build_compare_radar(df, task_ids, task_id_to_model_name)
+        significance = self._build_compare_significance(df, task_ids, final_table)
+
+        return {
+            "scheme_name": scheme_name,
+            "models": models_meta,
+            "radar_indicators": radar_indicators,
+            "radar_data": radar_series,
+            "table_data": final_table,
+            "significance": significance
+        }
+
+    @staticmethod
+    def _build_compare_table(df: pd.DataFrame, task_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        数据集 × 任务 得分矩阵 (同一行同一任务多条结果时取最后一条)，diff 以第一个任务为基准
+        """
+        if df.empty:
+            return []
+
+        df = df.assign(row_key=df["dataset"] + " (" + df["metric"] + ")")
+        first_seen = df.drop_duplicates("row_key", keep="first").set_index("row_key")
+        latest = df.drop_duplicates(["row_key", "task_id"], keep="last")
+
+        matrix = (
+            latest.pivot(index="row_key", columns="task_id", values="score")
+            .reindex(index=first_seen.index, columns=task_ids)
+            .to_numpy(dtype=float)
+        )
+        diffs = matrix[:, 1:] - matrix[:, :1]
+
+        # NaN -> None，仅在组装输出时回到 Python 对象
+        scores = np.where(np.isnan(matrix), None, matrix).tolist()
+        diffs = np.where(np.isnan(diffs), None, diffs).tolist()
+        score_keys = [f"task_{tid}" for tid in task_ids]
+        diff_keys = [f"diff_{tid}" for tid in task_ids[1:]]
 
         final_table = []
-        for key, info in table_map.items():
+        for row_key, dataset, metric, row_scores, row_diffs in zip(
+            first_seen.index, first_seen["dataset"], first_seen["metric"], scores, diffs
+        ):
             row = {
-                "dataset_metric": key,
-                "dataset": info['dataset'],
-                "metric": info['metric']
+                "dataset_metric": row_key,
+                "dataset": dataset,
+                "metric": metric
             }
-            base_score = None
-            
-            for i, task_id in enumerate(task_ids):
-                score = info["scores"].get(task_id, None)
-                row[f"task_{task_id}"] = score
-                
-                if i == 0:
-                    base_score = score
-                else:
-                    if base_score is not None and score is not None:
-                        row[f"diff_{task_id}"] = round(score - base_score, 2)
-                    else:
-                        row[f"diff_{task_id}"] = None
-            
+            row[score_keys[0]] = row_scores[0]
+            for key, score, diff_key, diff in zip(score_keys[1:], row_scores[1:], diff_keys, row_diffs):
+                row[key] = score
+                row[diff_key] = round(diff, 2) if diff is not None else None
             final_table.append(row)
+        return final_table
 
-        radar_indicators = [] 
-        radar_series = []     
-        
-        all_categories = set()
-        for t_map in capability_map.values():
-            all_categories.update(t_map.keys())
-        
-        sorted_cats = sorted(list(all_categories))
+    @staticmethod
+    def _build_compare_radar(df: pd.DataFrame, task_ids: List[int], task_names: Dict[int, str]):
+        """
+        各任务按能力分类求均分 (0~1 分数换算为百分制，上限 100，无数据记 0)
+        """
+        cat_df = df[df["category"].notna()]
+        sorted_cats = sorted(cat_df["category"].unique().tolist())
         radar_indicators = [{"name": c, "max": 100} for c in sorted_cats]
-        
-        for task_id in task_ids:
-            task_scores = []
-            for cat in sorted_cats:
-                scores_list = capability_map[task_id].get(cat, [])
-                if scores_list:
-                    avg = sum(scores_list) / len(scores_list)
-                    task_scores.append(round(min(avg, 100), 1))
-                else:
-                    task_scores.append(0) 
-            
+
+        scores = cat_df["score"].astype(float)
+        norm = scores.where(~scores.between(0, 1.0), scores * 100)
+        averages = (
+            cat_df.assign(norm=norm)
+            .groupby(["task_id", "category"])["norm"].mean()
+            .unstack()
+            .reindex(index=task_ids, columns=sorted_cats)
+        )
+        averages = np.minimum(averages.to_numpy(dtype=float), 100.0) if sorted_cats else np.empty((len(task_ids), 0))
+
+        radar_series = []
+        for task_id, values in zip(task_ids, averages.tolist()):
             radar_series.append({
-                "name": task_id_to_model_name[task_id],
-                "value": task_scores
+                "name": task_names[task_id],
+                "value": [0 if np.isnan(v) else round(v, 1) for v in values]
             })
+        return radar_indicators, radar_series
 
-        return {
-            "scheme_name": scheme_name,
-            "models": models_meta,
-            "radar_indicators": radar_indicators,
-            "radar_data": radar_series,
-            "table_data": final_table
-        }
\ No newline at end of file
+    @staticmethod
+    def _build_compare_significance(df: pd.DataFrame, task_ids: List[int], final_table: List[Dict]) -> List[Dict]:
+        """
+        基于逐样本正误，计算每个任务相对基准任务在各数据集上的置信区间与显著性
+        (没有逐样本记录的任务跳过)；表格行附加 sig_{task_id} 标记差异是否显著
+        """
+        config_names = df.drop_duplicates("config_id").set_index("config_id")["dataset"].to_dict()
+        # 多个配置共用同一数据集名称时 (如 MMLU 子集)，表格行无法对应到单个配置，不打标记
+        name_counts = pd.Series(list(config_names.values()), dtype=object).value_counts().to_dict()
+        base_id = task_ids[0]
+
+        significance = []
+        row_flags: Dict[str, Dict[str, bool]] = {}
+        for task_id in task_ids[1:]:
+            records = compare_pair(base_id, task_id)
+            if not records:
+                continue
+            datasets = []
+            for r in records:
+                name = config_names.get(r["dataset_config_id"])
+                if name is None:
+                    continue
+                datasets.append({"dataset": name, **r})
+                if name_counts.get(name) == 1:
+                    row_flags.setdefault(name, {})[f"sig_{task_id}"] = r["significant"]
+            significance.append({"base_task_id": base_id, "task_id": task_id, "datasets": datasets})
+
+        for row in final_table:
+            row.update(row_flags.get(row["dataset"], {}))
+        return significance
@@ -0,0 +1,197 @@
+import os
+import re
+import glob
+import time
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.models.dataset import DatasetConfig
+from app.core.metrics import record_stage
+from app.services.sample_store import output_files
+
+logger = logging.getLogger(__name__)
+
+# OpenCompass 日志行前缀: "01/02 12:34:56 - OpenCompass - INFO - ..."
+_LOG_TIME = re.compile(rb"^(\d{2})/(\d{2}) (\d{2}):(\d{2}):(\d{2}) - ")
+# 运行目录名即 OpenCompass 启动时刻
+_RUN_DIR_FORMAT = "%Y%m%d_%H%M%S"
+# 只扫描日志文件首尾这么多字节查找时间戳
+_LOG_SCAN_BYTES = 64 * 1024
+
+
+class StageTimer:
+    """
+    任务阶段耗时记录 (同时写入 Prometheus 阶段直方图)
+    - stages: 阶段名 -> 秒，同名阶段累加
+    - datasets: 逐数据集的推理 / 评估耗时
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.datasets: List[Dict] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = round(self.stages.get(name, 0.0) + seconds, 3)
+        record_stage(name, seconds)
+
+    def as_dict(self) -> Dict:
+        return {"stages": dict(self.stages), "datasets": list(self.datasets)}
+
+
+# ====================================================
+# OpenCompass 输出中的逐数据集耗时
+# ====================================================
+def _opencompass_run_dir(workspace: str, started_at: float) -> Optional[Tuple[str, float]]:
+    """
+    本次子进程创建的运行目录 (目录名时间戳不早于启动时刻) 及其时间戳
+    """
+    candidates = []
+    for path in glob.glob(os.path.join(workspace, "*")):
+        if not os.path.isdir(os.path.join(path, "predictions")):
+            continue
+        try:
+            ts = datetime.strptime(os.path.basename(path), _RUN_DIR_FORMAT).timestamp()
+        except ValueError:
+            continue
+        # 目录名精确到秒
+        if ts >= int(started_at) - 1:
+            candidates.append((ts, path))
+    if not candidates:
+        return None
+    ts, path = min(candidates)
+    return path, ts
+
+
+def _model_dir(root: str, model_abbr: Optional[str]) -> Optional[str]:
+    dirs = [d for d in glob.glob(os.path.join(root, "*")) if os.path.isdir(d)]
+    if model_abbr and os.path.join(root, model_abbr) in dirs:
+        return os.path.join(root, model_abbr)
+    return dirs[0] if len(dirs) == 1 else None
+
+
+def _log_span(path: str, year: int) -> Optional[float]:
+    """
+    单个任务日志首尾两条带时间戳日志之间的秒数 (只读取文件首尾各一块)
+    """
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            head = f.read(_LOG_SCAN_BYTES)
+            f.seek(max(0, size - _LOG_SCAN_BYTES))
+            tail = f.read()
+    except OSError:
+        return None
+
+    def stamps(block: bytes):
+        for line in block.splitlines():
+            m = _LOG_TIME.match(line)
+            if m:
+                month, day, hh, mm, ss = (int(x) for x in m.groups())
+                try:
+                    yield datetime(year, month, day, hh, mm, ss).timestamp()
+                except ValueError:
+                    continue
+
+    first = next(stamps(head), None)
+    last = None
+    for last in stamps(tail):
+        pass
+    if first is None:
+        return None
+    end = last if last is not None else os.path.getmtime(path)
+    return max(0.0, end - first)
+
+
+def _files_end(pattern_base: str, abbr: str) -> Optional[float]:
+    # 分片输出 {abbr}_0.json ... 取最后写完的一个 (与逐样本抽取共用严格的分片匹配)
+    return max((os.path.getmtime(p) for p in output_files(pattern_base, abbr)), default=None)
+
+
+def _sequential_spans(ends: Dict[str, float], phase_start: float) -> Dict[str, float]:
+    """
+    --debug 模式下各数据集顺序执行：按输出文件写完的先后，相邻完成时刻之差即为该数据集耗时
+    """
+    spans = {}
+    prev = phase_start
+    for abbr, end in sorted(ends.items(), key=lambda kv: kv[1]):
+        spans[abbr] = round(max(0.0, end - max(prev, phase_start)), 3)
+        prev = end
+    return spans
+
+
+def opencompass_timings(
+    workspace: str,
+    configs: List[DatasetConfig],
+    model_abbr: Optional[str],
+    started_at: float,
+    finished_at: float,
+) -> Dict:
+    """
+    从 OpenCompass 输出推算：
+    - subprocess_startup: 子进程启动到创建运行目录 (导入依赖、解析配置)
+    - 逐数据集 inference / evaluation: 优先取 logs/{infer,eval} 下任务日志的首尾时间戳；
+      --debug 模式下没有任务日志，按 predictions / results 文件的完成时刻顺序推算
+    """
+    found = _opencompass_run_dir(workspace, started_at)
+    if found is None:
+        return {}
+    run_dir, run_ts = found
+    year = datetime.fromtimestamp(run_ts).year
+    out = {"subprocess_startup": round(max(0.0, min(run_ts, finished_at) - started_at), 3), "datasets": {}}
+
+    abbrs = [cfg.config_name for cfg in configs]
+    phases = {}
+    for phase, output in (("inference", "predictions"), ("evaluation", "results")):
+        log_dir = _model_dir(os.path.join(run_dir, "logs", "infer" if phase == "inference" else "eval"), model_abbr)
+        out_dir = _model_dir(os.path.join(run_dir, output), model_abbr)
+        spans, ends = {}, {}
+        for abbr in abbrs:
+            if log_dir:
+                span = _log_span(os.path.join(log_dir, f"{abbr}.out"), year)
+                if span is not None:
+                    spans[abbr] = round(span, 3)
+                    continue
+            if out_dir:
+                end = _files_end(out_dir, abbr)
+                if end is not None:
+                    ends[abbr] = end
+        phases[phase] = (spans, ends)
+
+    # 推理阶段从运行目录创建开始；评估阶段从最后一个推理输出写完开始
+    infer_spans, infer_ends = phases["inference"]
+    infer_spans.update(_sequential_spans(infer_ends, run_ts))
+    eval_spans, eval_ends = phases["evaluation"]
+    eval_start = max(infer_ends.values(), default=run_ts)
+    eval_spans.update(_sequential_spans(eval_ends, eval_start))
+
+    for abbr in abbrs:
+        if abbr in infer_spans or abbr in eval_spans:
+            out["datasets"][abbr] = {
+                "inference": infer_spans.get(abbr),
+                "evaluation": eval_spans.get(abbr),
+            }
+    return out
+
+
+def inference_ends(workspace: str, configs: List[DatasetConfig], model_abbr: Optional[str], started_at: float) -> Dict[str, float]:
+    """
+    各数据集推理输出 (predictions) 写完的时刻，用于把逐请求记录归到数据集
+    """
+    found = _opencompass_run_dir(workspace, started_at)
+    if found is None:
+        return {}
+    out_dir = _model_dir(os.path.join(found[0], "predictions"), model_abbr)
+    if out_dir is None:
+        return {}
+    ends = {cfg.config_name: _files_end(out_dir, cfg.config_name) for cfg in configs}
+    return {abbr: end for abbr, end in ends.items() if end is not None}
@@ -0,0 +1,178 @@
+import os
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.models.dataset import DatasetConfig
+from app.services.task_timing import inference_ends
+
+logger = logging.getLogger(__name__)
+
+# API 模型的逐请求记录 (由 workspace 下生成的 request_profiler.py 写入)
+REQUEST_LOG = os.path.join("profile", "requests.jsonl")
+# 本地模型用 tokenizer 统计 token 时，每个数据集最多编码这么多条样本，其余按均值外推
+TOKENIZE_SAMPLE_LIMIT = 2000
+LATENCY_PERCENTILES = (50, 95, 99)
+
+
+def _rate(amount: Optional[float], seconds: Optional[float]) -> Optional[float]:
+    if amount is None or not seconds or seconds <= 0:
+        return None
+    return round(amount / seconds, 3)
+
+
+def _prompt_text(prompt: Any) -> str:
+    # 对话格式的 origin_prompt: [{"role": "HUMAN", "prompt": "..."}, ...]
+    if isinstance(prompt, list):
+        return "\n".join(str(p.get("prompt", "")) if isinstance(p, dict) else str(p) for p in prompt)
+    return "" if prompt is None else str(prompt)
+
+
+def read_request_log(workspace: str, since: Optional[float] = None) -> List[Dict]:
+    path = os.path.join(workspace, REQUEST_LOG)
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if since is None or rec.get("ts", 0) >= since:
+                records.append(rec)
+    return records
+
+
+def latency_summary(records: List[Dict]) -> Optional[Dict]:
+    """
+    逐请求延迟分位数 (毫秒)；非 2xx 的请求计入 errors，不参与分位数
+    """
+    if not records:
+        return None
+    ok = [r["latency_ms"] for r in records if r.get("latency_ms") is not None and (r.get("status") or 200) < 300]
+    out = {"count": len(records), "errors": len(records) - len(ok)}
+    if ok:
+        values = np.percentile(np.asarray(ok, dtype=float), LATENCY_PERCENTILES)
+        out.update({f"p{p}": round(float(v), 1) for p, v in zip(LATENCY_PERCENTILES, values)})
+    return out
+
+
+class ThroughputProfiler:
+    """
+    逐数据集吞吐画像：样本/秒、prompt / completion token/秒，API 模型另有逐请求延迟分位数
+    - token 优先取 API 响应中的 usage；没有 usage 时用本地模型的 tokenizer 统计
+    - 样本数在抽取逐样本记录时顺带统计 (observe 作为 SampleStore.ingest 的回调，不重复读取预测文件)
+    - 耗时取阶段计时中的逐数据集推理耗时
+    """
+
+    def __init__(self, workspace: str, configs: List[DatasetConfig], model_abbr: str,
+                 started_at: float, tokenizer_path: Optional[str] = None):
+        self.workspace = workspace
+        self.configs = configs
+        self.model_abbr = model_abbr
+        self.started_at = started_at
+        self.tokenizer_path = tokenizer_path
+        self.requests = read_request_log(workspace, since=started_at)
+        self.has_usage = any(r.get("completion_tokens") is not None for r in self.requests)
+        self._tokenizer = None
+        self._tokenizer_failed = False
+        self._observed: Dict[int, Dict[str, Any]] = {}
+
+    def _get_tokenizer(self):
+        if self._tokenizer is None and not self._tokenizer_failed:
+            try:
+                if not self.tokenizer_path or not os.path.isdir(self.tokenizer_path):
+                    raise FileNotFoundError(self.tokenizer_path)
+                from transformers import AutoTokenizer
+                self._tokenizer = AutoTokenizer.from_pretrained(
+                    self.tokenizer_path, trust_remote_code=True, local_files_only=True
+                )
+            except Exception as e:
+                logger.info(f"Tokenizer unavailable for throughput profile ({self.tokenizer_path}): {e}")
+                self._tokenizer_failed = True
+        return self._tokenizer
+
+    def _count_tokens(self, texts: List[str]) -> int:
+        tokenizer = self._get_tokenizer()
+        encoded = tokenizer(texts, add_special_tokens=False)["input_ids"]
+        return sum(len(ids) for ids in encoded)
+
+    def observe(self, cfg: DatasetConfig, predictions: Dict[int, Dict]):
+        entry = {"samples": len(predictions)}
+        if not self.has_usage and predictions and self._get_tokenizer() is not None:
+            items = list(predictions.values())
+            sampled = items[:TOKENIZE_SAMPLE_LIMIT]
+            scale = len(items) / len(sampled)
+            try:
+                entry["prompt_tokens"] = int(self._count_tokens([_prompt_text(p.get("origin_prompt")) for p in sampled]) * scale)
+                entry["completion_tokens"] = int(self._count_tokens([_prompt_text(p.get("prediction")) for p in sampled]) * scale)
+            except Exception as e:
+                logger.warning(f"Token counting failed for {cfg.config_name}: {e}")
+        self._observed[cfg.id] = entry
+
+    def _requests_by_dataset(self) -> Dict[str, List[Dict]]:
+        """
+        按完成时刻把请求归到数据集 (--debug 模式下各数据集顺序推理)
+        """
+        if not self.requests:
+            return {}
+        ends = inference_ends(self.workspace, self.configs, self.model_abbr, self.started_at)
+        if not ends:
+            return {}
+        ordered = sorted(ends.items(), key=lambda kv: kv[1])
+        grouped: Dict[str, List[Dict]] = {}
+        for rec in self.requests:
+            ts = rec.get("ts", 0)
+            abbr = next((a for a, end in ordered if ts <= end), ordered[-1][0])
+            grouped.setdefault(abbr, []).append(rec)
+        return grouped
+
+    def build(self, dataset_timings: List[Dict], run_cfg: Optional[Dict] = None,
+              total_seconds: Optional[float] = None) -> Dict[str, Any]:
+        seconds_by_config = {d["dataset_config_id"]: d.get("inference") for d in dataset_timings}
+        requests = self._requests_by_dataset()
+        token_source = "usage" if self.has_usage else ("tokenizer" if self._tokenizer is not None else None)
+
+        datasets = []
+        totals = {"samples": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        for cfg in self.configs:
+            entry = dict(self._observed.get(cfg.id, {}))
+            reqs = requests.get(cfg.config_name, [])
+            if not entry and not reqs:
+                continue
+            if self.has_usage:
+                entry["prompt_tokens"] = sum(r.get("prompt_tokens") or 0 for r in reqs)
+                entry["completion_tokens"] = sum(r.get("completion_tokens") or 0 for r in reqs)
+            seconds = seconds_by_config.get(cfg.id)
+            row = {
+                "dataset_config_id": cfg.id,
+                "config_name": cfg.config_name,
+                "samples": entry.get("samples"),
+                "seconds": seconds,
+                "samples_per_s": _rate(entry.get("samples"), seconds),
+                "prompt_tokens": entry.get("prompt_tokens"),
+                "completion_tokens": entry.get("completion_tokens"),
+                "prompt_tokens_per_s": _rate(entry.get("prompt_tokens"), seconds),
+                "completion_tokens_per_s": _rate(entry.get("completion_tokens"), seconds),
+                "latency_ms": latency_summary(reqs),
+            }
+            datasets.append(row)
+            for key in totals:
+                totals[key] += row.get(key) or 0
+
+        seconds = sum(d["seconds"] for d in datasets if d["seconds"]) or total_seconds
+        return {
+            "token_source": token_source,
+            "run_cfg": run_cfg or {},
+            "datasets": datasets,
+            "total": {
+                **totals,
+                "seconds": round(seconds, 3) if seconds else None,
+                "samples_per_s": _rate(totals["samples"], seconds),
+                "completion_tokens_per_s": _rate(totals["completion_tokens"], seconds) if token_source else None,
+                "latency_ms": latency_summary(self.requests),
+            },
+        }
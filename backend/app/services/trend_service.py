@@ -0,0 +1,117 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+from sqlmodel import Session, select
+
+from app.models.task import EvaluationTask
+from app.models.result import EvaluationResult
+from app.utils.scoring import is_negative_metric
+
+# 默认返回的最大点数 (前端折线图足够，且与历史长度无关)
+DEFAULT_MAX_POINTS = 200
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets 降采样，返回保留点的下标
+    每个桶保留与前一个保留点、下一个桶均值构成三角形面积最大的点，
+    突降/突升 (回归) 不会被平均抹掉，且保留的都是真实存在的任务结果
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # 首尾两点固定，中间 n-2 个点均分到 threshold-2 个桶
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    picked = np.empty(threshold, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        if i + 2 < len(edges):
+            nxt = slice(edges[i + 1], max(edges[i + 2], edges[i + 1] + 1))
+            cx, cy = x[nxt].mean(), y[nxt].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[a] - cx) * (by - y[a]) - (x[a] - bx) * (cy - y[a]))
+        a = start + int(np.argmax(area))
+        picked[i + 1] = a
+    return picked
+
+
+def score_trend(
+    session: Session,
+    model_id: int,
+    config_id: int,
+    metric: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    max_points: int = DEFAULT_MAX_POINTS,
+) -> Dict[str, Any]:
+    """
+    某模型在某数据集配置 / 指标上的历史分数 (按任务完成时间排序)
+    - 走 evaluation_results(dataset_config_id, metric_name, task_id) 复合索引，再按主键关联任务
+    - 点数超过 max_points 时用 LTTB 降采样；统计值基于全部点计算
+    """
+    statement = (
+        select(EvaluationResult.task_id, EvaluationTask.finished_at, EvaluationResult.score)
+        .join(EvaluationTask, EvaluationTask.id == EvaluationResult.task_id)
+        .where(
+            EvaluationResult.dataset_config_id == config_id,
+            EvaluationResult.metric_name == metric,
+            EvaluationTask.model_id == model_id,
+            EvaluationTask.status == "success",
+            EvaluationTask.finished_at.is_not(None),
+        )
+        .order_by(EvaluationTask.finished_at, EvaluationResult.task_id, EvaluationResult.id)
+    )
+    if start:
+        statement = statement.where(EvaluationTask.finished_at >= start)
+    if end:
+        statement = statement.where(EvaluationTask.finished_at <= end)
+    rows = session.exec(statement).all()
+
+    # 同一任务重复写入时取最后一条
+    latest_by_task: Dict[int, tuple] = {}
+    for task_id, finished_at, score in rows:
+        latest_by_task[task_id] = (task_id, finished_at, score)
+    rows = list(latest_by_task.values())
+
+    result = {
+        "model_id": model_id,
+        "dataset_config_id": config_id,
+        "metric": metric,
+        "total_points": len(rows),
+        "downsampled": False,
+        "points": [],
+        "stats": None,
+    }
+    if not rows:
+        return result
+
+    task_ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    x = np.fromiter((r[1].timestamp() for r in rows), dtype=np.float64, count=len(rows))
+    y = np.fromiter((r[2] for r in rows), dtype=np.float64, count=len(rows))
+
+    keep = lttb_indices(x, y, max_points)
+    result["downsampled"] = len(keep) < len(rows)
+    result["points"] = [
+        {"task_id": int(task_ids[i]), "finished_at": rows[i][1], "score": float(y[i])}
+        for i in keep
+    ]
+    # 负向指标 (ppl / bpb / loss) 越低越好，与排行榜口径一致
+    best = int(np.argmin(y)) if is_negative_metric(metric) else int(np.argmax(y))
+    result["stats"] = {
+        "latest": float(y[-1]),
+        "latest_task_id": int(task_ids[-1]),
+        "best": float(y[best]),
+        "best_task_id": int(task_ids[best]),
+        "min": float(y.min()),
+        "mean": round(float(y.mean()), 4),
+        "first_at": rows[0][1],
+        "last_at": rows[-1][1],
+    }
+    return result
@@ -0,0 +1,43 @@
+import orjson
+from decimal import Decimal
+from typing import Any
+
+# 与 FastAPI ORJSONResponse 保持一致：允许非字符串键、直接序列化 numpy 标量/数组
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value: Any):
+    """
+    orjson 不原生支持的类型 (datetime / UUID / dataclass / numpy 已内置)；
+    未列出的类型直接报错，避免悄悄变成字符串改变接口字段类型
+    """
+    # pydantic / SQLModel 对象
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    # MySQL 的 DECIMAL 列 / SUM 聚合结果，与 jsonable_encoder 一致输出为数字
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    orjson 序列化 (返回 bytes，可直接作为响应体)
+    """
+    return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+
+
+def dumps_str(obj: Any) -> str:
+    """
+    orjson 序列化为 str (用于写入 Text 列，如 result_summary)
+    """
+    return dumps(obj).decode("utf-8")
+
+
+def loads(data):
+    """
+    orjson 反序列化 (bytes / str)
+    """
+    return orjson.loads(data)
@@ -0,0 +1,24 @@
+import hashlib
+from fastapi import Request, Response
+
+
+def build_etag(body: bytes) -> str:
+    """
+    根据响应体内容生成强 ETag
+    """
+    return '"' + hashlib.md5(body).hexdigest() + '"'
+
+
+def etag_response(request: Request, body: bytes, etag: str, media_type: str = "application/json") -> Response:
+    """
+    返回带 ETag 的响应；若客户端 If-None-Match 命中则直接返回 304 (无响应体)
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        if "*" in candidates or etag in candidates or f"W/{etag}" in candidates:
+            return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -0,0 +1,40 @@
+from typing import Optional
+from sqlalchemy import and_, case, func, or_
+
+# 负向指标 (越低越好)，不参与能力维度均分
+NEGATIVE_METRIC_KEYWORDS = ("ppl", "bpb", "loss")
+
+
+def is_negative_metric(metric: str) -> bool:
+    metric = str(metric).lower()
+    return any(x in metric for x in NEGATIVE_METRIC_KEYWORDS)
+
+
+def normalize_score(score, metric: str) -> Optional[float]:
+    """
+    统一的分数归一化口径 (与任务摘要雷达图一致)：
+    - 负向指标返回 None (不参与统计)
+    - 0~1 区间的分数换算为百分制
+    """
+    if is_negative_metric(metric):
+        return None
+    try:
+        raw_score = float(score)
+    except (ValueError, TypeError):
+        raw_score = 0.0
+    if 0.0 <= raw_score <= 1.0:
+        return raw_score * 100.0
+    return raw_score
+
+
+def normalized_score_sql(score_col, metric_col):
+    """
+    normalize_score 的 SQL 表达式版本，负向指标得到 NULL (聚合函数会自动忽略)
+    """
+    lowered = func.lower(metric_col)
+    negative = or_(*[lowered.contains(x) for x in NEGATIVE_METRIC_KEYWORDS])
+    return case(
+        (negative, None),
+        (and_(score_col >= 0.0, score_col <= 1.0), score_col * 100.0),
+        else_=score_col,
+    )
@@ -1,5 +1,7 @@
 import os
+import glob
 from celery import Celery
+from celery.signals import worker_init, worker_process_shutdown
 from sqlmodel import Session
 from app.core.database import engine
 # 导入 Service
@@ -14,6 +16,37 @@ celery_app = Celery(
 )
 celery_app.conf.broker_connection_retry_on_startup = True
 
+# Worker 侧指标 (任务阶段耗时、吞吐、入库) 通过独立端口暴露给 Prometheus
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "9101"))
+
+
+@worker_init.connect
+def start_metrics_server(**kwargs):
+    from prometheus_client import start_http_server, CollectorRegistry, multiprocess
+
+    multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    try:
+        if multiproc_dir:
+            # prefork 子进程各自写文件，主进程汇总；启动时清理上次运行残留的文件
+            os.makedirs(multiproc_dir, exist_ok=True)
+            for path in glob.glob(os.path.join(multiproc_dir, "*.db")):
+                os.remove(path)
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            start_http_server(WORKER_METRICS_PORT, registry=registry)
+        else:
+            start_http_server(WORKER_METRICS_PORT)
+        print(f"📈 [Worker] Metrics exposed on :{WORKER_METRICS_PORT}")
+    except Exception as e:
+        print(f"⚠️ [Worker] Failed to start metrics server: {e}")
+
+
+@worker_process_shutdown.connect
+def mark_metrics_process_dead(pid=None, **kwargs):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(pid or os.getpid())
+
 @celery_app.task
 def run_evaluation_task(task_id: int):
     print(f"🚀 [Worker] 接收到任务 {task_id}")
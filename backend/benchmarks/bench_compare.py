@@ -0,0 +1,39 @@
+"""
+任务对比：50 个任务 × 500 个数据集结果 (冷缓存 / 命中缓存)
+"""
+import pytest
+
+from app.core.cache import compare_cache
+from app.services.task_service import TaskService
+from generators import seed_results
+
+N_TASKS = 50
+N_RESULTS = 500
+
+
+@pytest.fixture(name="task_ids")
+def task_ids_fixture(db_session):
+    return seed_results(db_session, N_TASKS, N_RESULTS)
+
+
+def test_compare_cold(benchmark, db_engine, task_ids):
+    from sqlmodel import Session
+
+    def run():
+        compare_cache.clear()
+        with Session(db_engine) as session:
+            return TaskService(session).compare_tasks_json(task_ids)
+
+    body = benchmark(run)
+    assert body
+
+
+def test_compare_cached(benchmark, db_engine, task_ids):
+    from sqlmodel import Session
+
+    def run():
+        with Session(db_engine) as session:
+            return TaskService(session).compare_tasks_json(task_ids)
+
+    run()
+    assert benchmark(run)
@@ -0,0 +1,18 @@
+"""
+OpenCompass 配置生成 (300 个私有数据集)
+"""
+from app.models.llm_model import LLMModel
+from app.services.opencompass_runner import OpenCompassRunner
+from generators import dataset_configs
+
+
+def test_generate_config_300(benchmark, tmp_path):
+    data_file = tmp_path / "data.jsonl"
+    data_file.write_text('{"question": "q", "answer": "A"}\n', encoding="utf-8")
+    configs = dataset_configs(300, str(data_file))
+    model = LLMModel(id=1, name="bench-model", path=str(tmp_path / "model"), type="local")
+    runner = OpenCompassRunner(str(tmp_path / "workspace"))
+
+    config_path = benchmark(runner.generate_config, 1, model, configs)
+    with open(config_path, encoding="utf-8") as f:
+        assert "dataset_299_gen" in f.read()
@@ -0,0 +1,29 @@
+"""
+数据集上传：逐行扁平化与 JSONL 解析 / 落盘
+"""
+import pytest
+
+from app.api.v1.datasets import _flatten_row, _process_and_save_file
+from generators import BENCH_FULL, jsonl_rows, jsonl_bytes, upload_file
+
+ROW_COUNTS = [10_000] + ([1_000_000] if BENCH_FULL else [])
+
+
+def test_flatten_rows(benchmark):
+    rows = list(jsonl_rows(10_000))
+    result = benchmark(lambda: [_flatten_row(row) for row in rows])
+    assert "choices_A" in result[0] and "meta_tags_subject" in result[0]
+
+
+@pytest.mark.parametrize("n_rows", ROW_COUNTS)
+def test_process_and_save_jsonl(benchmark, tmp_path, n_rows):
+    content = jsonl_bytes(n_rows)
+    save_path = str(tmp_path / "out.jsonl")
+
+    def run():
+        return _process_and_save_file(upload_file(content), save_path)
+
+    # 大文件单轮即可，小文件多轮取稳定值
+    rounds = 1 if n_rows >= 1_000_000 else 5
+    count = benchmark.pedantic(run, rounds=rounds, iterations=1, warmup_rounds=0)
+    assert count == n_rows
@@ -0,0 +1,34 @@
+"""
+列表接口：大表上的分页查询 (含响应序列化)
+"""
+import pytest
+
+from generators import seed_catalog
+
+N_DATASETS = 5_000
+N_TASKS = 20_000
+
+
+@pytest.fixture(name="catalog")
+def catalog_fixture(db_session):
+    return seed_catalog(db_session, N_DATASETS, N_TASKS)
+
+
+def test_read_datasets(benchmark, admin_client, catalog):
+    resp = benchmark(admin_client.get, "/api/v1/datasets/", params={"page": 50, "page_size": 20})
+    assert resp.status_code == 200 and resp.json()["total"] == N_DATASETS
+
+
+def test_read_datasets_keyword(benchmark, admin_client, catalog):
+    resp = benchmark(admin_client.get, "/api/v1/datasets/", params={"keyword": "dataset_12", "page_size": 20})
+    assert resp.status_code == 200
+
+
+def test_read_tasks(benchmark, admin_client, catalog):
+    resp = benchmark(admin_client.get, "/api/v1/tasks/", params={"page": 100, "page_size": 50})
+    assert resp.status_code == 200
+
+
+def test_read_tasks_filtered(benchmark, admin_client, catalog):
+    resp = benchmark(admin_client.get, "/api/v1/tasks/", params={"status": "running,failed", "page_size": 50})
+    assert resp.status_code == 200
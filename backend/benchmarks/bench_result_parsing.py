@@ -0,0 +1,39 @@
+"""
+结果解析：summary CSV 与 results JSON (300 个数据集)
+"""
+import os
+import json
+
+import pytest
+
+from app.services.result_ingest import load_results
+from generators import dataset_configs, summary_csv
+
+MODEL_ABBR = "bench-model"
+N_DATASETS = 300
+
+
+@pytest.fixture(name="configs")
+def configs_fixture(tmp_path):
+    return dataset_configs(N_DATASETS, str(tmp_path / "data.jsonl"))
+
+
+def test_summary_csv(benchmark, tmp_path, configs):
+    summary_dir = tmp_path / "20240101_000000" / "summary"
+    summary_dir.mkdir(parents=True)
+    (summary_dir / "summary_20240101_000000.csv").write_text(summary_csv(configs, MODEL_ABBR), encoding="utf-8")
+
+    records = benchmark(load_results, str(tmp_path), 1, configs, MODEL_ABBR)
+    assert len(records) == N_DATASETS * 2
+
+
+def test_results_json(benchmark, tmp_path, configs):
+    results_dir = tmp_path / "20240101_000000" / "results" / MODEL_ABBR
+    results_dir.mkdir(parents=True)
+    for i, cfg in enumerate(configs):
+        payload = {"accuracy": float(i % 100), "details": [{"pred": "A", "answer": "A"}] * 20}
+        with open(os.path.join(results_dir, f"{cfg.config_name}.json"), "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+
+    records = benchmark(load_results, str(tmp_path), 1, configs, MODEL_ABBR)
+    assert len(records) == N_DATASETS
@@ -0,0 +1,26 @@
+"""
+微基准测试 (pytest-benchmark)
+
+用法 (在 backend 目录下):
+    pip install -r benchmarks/requirements.txt
+    python -m pytest benchmarks                        # 每次运行的结果以 JSON 自动保存到 ./.benchmarks/ (按机器/解释器分目录)
+    python -m pytest benchmarks --benchmark-compare    # 与上一次保存的结果对比
+    python -m pytest benchmarks --benchmark-compare=0001 --benchmark-compare-fail=median:10%
+    BENCH_FULL=1 python -m pytest benchmarks -k ingest # 额外运行 1M 行的上传处理
+                                                       # (当前实现整文件解析在内存中，约需 8GB 以上内存)
+
+全部数据由 generators.py 按固定种子合成，数据库为内存 SQLite，无需网络与 GPU
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generators import BENCH_FULL
+# 数据库与客户端夹具复用单元测试的定义 (含语句计数)，基准与测试的环境保持一致
+from tests.conftest import db_engine_fixture, db_session_fixture, admin_client_fixture, query_budget_fixture  # noqa: F401
+
+
+def pytest_benchmark_update_json(config, benchmarks, output_json):
+    # 保存的 JSON 中记录是否包含大规模用例，便于对比时区分
+    output_json["bench_full"] = BENCH_FULL
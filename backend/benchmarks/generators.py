@@ -0,0 +1,152 @@
+"""
+基准测试用的合成数据 (固定随机种子，离线、纯 CPU)
+"""
+import io
+import os
+import json
+import random
+from typing import Dict, Iterator, List, Tuple
+
+from sqlmodel import Session
+
+from app.models.llm_model import LLMModel
+from app.models.dataset import DatasetMeta, DatasetConfig
+from app.models.scheme import EvaluationScheme
+from app.models.task import EvaluationTask
+from app.models.result import EvaluationResult
+
+CATEGORIES = ["Knowledge", "Reasoning", "Math", "Code", "Language", "Safety", "Agent", "Long Context"]
+STATUSES = ["success"] * 8 + ["failed", "running"]
+
+# 1M 行等大规模用例较慢，默认跳过
+BENCH_FULL = os.getenv("BENCH_FULL", "").lower() in ("1", "true", "yes")
+
+
+# ====================================================
+# 1. 数据集上传 (JSONL)
+# ====================================================
+def jsonl_rows(n: int, seed: int = 0) -> Iterator[Dict]:
+    """
+    与真实上传数据形态一致：嵌套字典 + choices 列表 (会被展开为列) + 普通列表
+    """
+    rng = random.Random(seed)
+    for i in range(n):
+        yield {
+            "id": i,
+            "question": f"Question {i}: " + " ".join(rng.choice(["what", "is", "the", "value", "of", "x"]) for _ in range(12)),
+            "choices": [{"label": label, "text": f"option {label}{rng.randint(0, 999)}"} for label in "ABCD"],
+            "answer": rng.choice("ABCD"),
+            "meta": {"source": "synthetic", "difficulty": rng.randint(1, 5), "tags": {"subject": rng.choice(CATEGORIES)}},
+            "references": [rng.randint(0, 100) for _ in range(3)],
+        }
+
+
+def jsonl_bytes(n: int, seed: int = 0) -> bytes:
+    return "\n".join(json.dumps(row, ensure_ascii=False) for row in jsonl_rows(n, seed)).encode("utf-8")
+
+
+def upload_file(content: bytes, filename: str = "bench.jsonl"):
+    from fastapi import UploadFile
+    return UploadFile(file=io.BytesIO(content), filename=filename)
+
+
+# ====================================================
+# 2. 配置生成 / 结果解析
+# ====================================================
+def dataset_configs(n: int, jsonl_path: str) -> List[DatasetConfig]:
+    """
+    未入库的私有数据集配置 (不同评测器/后处理组合)
+    """
+    evaluators = ["AccEvaluator", "BleuEvaluator", "RougeEvaluator"]
+    configs = []
+    for i in range(n):
+        meta = DatasetMeta(id=i + 1, name=f"dataset_{i}", category=CATEGORIES[i % len(CATEGORIES)])
+        configs.append(DatasetConfig(
+            id=i + 1,
+            meta_id=meta.id,
+            meta=meta,
+            config_name=f"dataset_{i}_gen",
+            file_path=jsonl_path,
+            reader_cfg=json.dumps({"input_columns": ["question"], "output_column": "answer"}),
+            metric_config=json.dumps({"evaluator": {"type": evaluators[i % 3]}}),
+            post_process_cfg=json.dumps({"type": "first_capital_postprocess"} if i % 2 else {}),
+        ))
+    return configs
+
+
+def summary_csv(configs: List[DatasetConfig], model_abbr: str, metrics_per_dataset: int = 2, seed: int = 0) -> str:
+    """
+    OpenCompass summary CSV：dataset,version,metric,mode,{model}
+    """
+    rng = random.Random(seed)
+    metrics = ["accuracy", "score", "bleu", "rouge1"][:metrics_per_dataset]
+    lines = [f"dataset,version,metric,mode,{model_abbr}"]
+    for cfg in configs:
+        for metric in metrics:
+            lines.append(f"{cfg.config_name},abc123,{metric},gen,{rng.uniform(0, 100):.2f}")
+    return "\n".join(lines)
+
+
+# ====================================================
+# 3. 数据库 (任务 / 结果 / 数据集目录)
+# ====================================================
+def seed_results(session: Session, n_tasks: int, n_results: int, seed: int = 0) -> List[int]:
+    """
+    n_tasks 个同方案任务，每个任务 n_results 个数据集结果 (批量插入)
+    """
+    rng = random.Random(seed)
+    scheme = EvaluationScheme(name="bench-scheme")
+    metas = [DatasetMeta(name=f"dataset_{i}", category=CATEGORIES[i % len(CATEGORIES)]) for i in range(n_results)]
+    models = [LLMModel(name=f"model_{i}", path=f"/models/{i}") for i in range(n_tasks)]
+    session.add(scheme)
+    session.add_all(metas + models)
+    session.commit()
+
+    configs = [DatasetConfig(meta_id=m.id, config_name=f"{m.name}_gen", file_path="/tmp/x.jsonl") for m in metas]
+    tasks = [EvaluationTask(model_id=m.id, scheme_id=scheme.id, status="success", progress=100, datasets_list="[]") for m in models]
+    session.add_all(configs + tasks)
+    session.commit()
+
+    session.bulk_insert_mappings(EvaluationResult, [
+        {"task_id": t.id, "dataset_config_id": c.id, "dataset_name": c.config_name,
+         "metric_name": "accuracy", "score": rng.uniform(0, 100), "details": {}}
+        for t in tasks for c in configs
+    ])
+    session.commit()
+    return [t.id for t in tasks]
+
+
+def seed_catalog(session: Session, n_datasets: int, n_tasks: int, seed: int = 0) -> Tuple[int, int]:
+    """
+    大表：n_datasets 个数据集 (每个 2 个配置) 与 n_tasks 个任务 (每个任务 3 个结果)
+    """
+    rng = random.Random(seed)
+    metas = [
+        DatasetMeta(name=f"dataset_{i}", category=CATEGORIES[i % len(CATEGORIES)], description=f"synthetic dataset {i}")
+        for i in range(n_datasets)
+    ]
+    models = [LLMModel(name=f"model_{i}", path=f"/models/{i}") for i in range(20)]
+    session.add_all(metas + models)
+    session.commit()
+
+    # 批量插入不经过模型默认值，Text 列的 "{}" 需显式给出
+    text_cols = {col: "{}" for col in ("reader_cfg", "infer_cfg", "metric_config", "post_process_cfg", "few_shot_cfg")}
+    session.bulk_insert_mappings(DatasetConfig, [
+        {"meta_id": m.id, "config_name": f"{m.name}_{mode}", "mode": mode, "file_path": "/tmp/x.jsonl", **text_cols}
+        for m in metas for mode in ("gen", "ppl")
+    ])
+    session.bulk_insert_mappings(EvaluationTask, [
+        {"model_id": models[i % len(models)].id, "status": rng.choice(STATUSES), "progress": 100, "datasets_list": "[]"}
+        for i in range(n_tasks)
+    ])
+    session.commit()
+
+    task_ids = [row[0] for row in session.exec(EvaluationTask.__table__.select().with_only_columns(EvaluationTask.id)).all()]
+    config_ids = [row[0] for row in session.exec(DatasetConfig.__table__.select().with_only_columns(DatasetConfig.id)).all()]
+    session.bulk_insert_mappings(EvaluationResult, [
+        {"task_id": tid, "dataset_config_id": rng.choice(config_ids), "dataset_name": "d",
+         "metric_name": "accuracy", "score": rng.uniform(0, 100), "details": {}}
+        for tid in task_ids for _ in range(3)
+    ])
+    session.commit()
+    return n_datasets, n_tasks
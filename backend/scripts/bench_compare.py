@@ -0,0 +1,87 @@
+"""
+compare_tasks 基准测试：合成 N 个任务 × M 个数据集结果，统计耗时与 SQL 次数
+
+用法: python scripts/bench_compare.py [n_tasks] [n_datasets]
+"""
+import os
+import sys
+import time
+import random
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(current_dir))
+
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from app.models.llm_model import LLMModel
+from app.models.dataset import DatasetMeta, DatasetConfig
+from app.models.scheme import EvaluationScheme
+from app.models.task import EvaluationTask
+from app.models.result import EvaluationResult
+from app.services.task_service import TaskService
+
+CATEGORIES = ["Knowledge", "Reasoning", "Math", "Code", "Language", "Safety", "Agent", "Long Context"]
+
+
+def build_fixture(session: Session, n_tasks: int, n_datasets: int, seed: int = 0):
+    rng = random.Random(seed)
+    scheme = EvaluationScheme(name="bench-scheme")
+    session.add(scheme)
+    metas = [DatasetMeta(name=f"dataset_{i}", category=CATEGORIES[i % len(CATEGORIES)]) for i in range(n_datasets)]
+    session.add_all(metas)
+    models = [LLMModel(name=f"model_{i}", path=f"/models/{i}") for i in range(n_tasks)]
+    session.add_all(models)
+    session.commit()
+
+    configs = [DatasetConfig(meta_id=m.id, config_name=f"{m.name}_gen", file_path="/tmp/x.jsonl") for m in metas]
+    session.add_all(configs)
+    tasks = [EvaluationTask(model_id=m.id, scheme_id=scheme.id, status="success", progress=100, datasets_list="[]") for m in models]
+    session.add_all(tasks)
+    session.commit()
+
+    rows = []
+    for t in tasks:
+        for c, m in zip(configs, metas):
+            rows.append(EvaluationResult(
+                task_id=t.id, dataset_config_id=c.id, dataset_name=m.name,
+                metric_name="accuracy", score=rng.uniform(0, 100), details={}
+            ))
+    session.add_all(rows)
+    session.commit()
+    return [t.id for t in tasks]
+
+
+def main():
+    n_tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    n_datasets = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        task_ids = build_fixture(session, n_tasks, n_datasets)
+
+    counter = {"queries": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(*_args):
+        counter["queries"] += 1
+
+    timings = []
+    for _ in range(3):
+        with Session(engine) as session:
+            counter["queries"] = 0
+            start = time.perf_counter()
+            result = TaskService(session).compare_tasks(task_ids)
+            timings.append(time.perf_counter() - start)
+
+    print(f"compare_tasks: {n_tasks} tasks x {n_datasets} datasets")
+    print(f"  rows in table : {len(result['table_data'])}")
+    print(f"  SQL queries   : {counter['queries']}")
+    print(f"  best of 3     : {min(timings) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
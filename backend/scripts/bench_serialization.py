@@ -0,0 +1,93 @@
+"""
+序列化耗时对比：FastAPI 默认路径 (response_model 校验 + jsonable_encoder + json.dumps)
+vs orjson 直接序列化。
+
+用法: python scripts/bench_serialization.py
+"""
+import os
+import sys
+import json
+import time
+import random
+from datetime import datetime
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(current_dir))
+
+from fastapi.encoders import jsonable_encoder
+
+from app.models.dataset import DatasetConfig
+# 引入 Task 和 Result 防止关系报错
+from app.models.task import EvaluationTask
+from app.models.result import EvaluationResult
+from app.schemas.task_schema import TaskCompareResponse
+from app.utils import fast_json
+
+
+def make_compare_payload(n_tasks: int = 20, n_datasets: int = 300):
+    rng = random.Random(0)
+    task_ids = list(range(1, n_tasks + 1))
+    table = []
+    for d in range(n_datasets):
+        row = {"dataset_metric": f"dataset_{d} (accuracy)", "dataset": f"dataset_{d}", "metric": "accuracy"}
+        for i, tid in enumerate(task_ids):
+            row[f"task_{tid}"] = rng.uniform(0, 100)
+            if i:
+                row[f"diff_{tid}"] = round(rng.uniform(-5, 5), 2)
+        table.append(row)
+    return {
+        "scheme_name": "bench",
+        "models": [{"task_id": t, "model_name": f"m{t}", "display_name": f"m{t} (#{t})", "finished_at": datetime(2026, 1, 1)} for t in task_ids],
+        "radar_indicators": [{"name": f"cap_{c}", "max": 100} for c in range(8)],
+        "radar_data": [{"name": f"m{t}", "value": [rng.uniform(0, 100) for _ in range(8)]} for t in task_ids],
+        "table_data": table,
+    }
+
+
+def make_configs(n: int = 3000):
+    blob = json.dumps({"prompt_template": {"template": "x" * 2000}})
+    return [
+        DatasetConfig(id=i, meta_id=i // 5, config_name=f"cfg_{i}", file_path=f"official://configs/{i}.py",
+                      reader_cfg=blob, infer_cfg=blob, metric_config=blob, created_at=datetime(2026, 1, 1))
+        for i in range(n)
+    ]
+
+
+def bench(fn, repeat: int = 20) -> float:
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2] * 1000
+
+
+def main():
+    compare = make_compare_payload()
+    configs = make_configs()
+    config_rows = [c.model_dump() for c in configs]
+    summary = {"radar": compare["radar_indicators"], "table": [
+        {"dataset": r["dataset"], "capability": "cap", "metric": "accuracy", "score": r["task_1"]} for r in compare["table_data"]
+    ]}
+
+    cases = [
+        ("POST /tasks/compare (20 tasks x 300 datasets)",
+         lambda: json.dumps(jsonable_encoder(TaskCompareResponse.model_validate(compare))).encode(),
+         lambda: fast_json.dumps(compare)),
+        ("GET /datasets/configs (3000 rows)",
+         lambda: json.dumps(jsonable_encoder(configs)).encode(),
+         lambda: fast_json.dumps(config_rows)),
+        ("result_summary (300 rows)",
+         lambda: json.dumps(summary),
+         lambda: fast_json.dumps_str(summary)),
+    ]
+    print(f"{'endpoint':50s} {'before(ms)':>11s} {'after(ms)':>10s} {'speedup':>8s}")
+    for name, before, after in cases:
+        b, a = bench(before), bench(after)
+        print(f"{name:50s} {b:11.2f} {a:10.2f} {b / a:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
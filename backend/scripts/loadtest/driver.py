@@ -0,0 +1,443 @@
+"""
+端到端压测驱动：并发创建数据集与评测任务，统计 API 延迟分位数、队列等待、数据库争用与任务吞吐
+
+准备 (Worker 使用假的 opencompass，不需要模型与 GPU):
+    export FAKE_OC_SAMPLES=200 FAKE_OC_SAMPLE_MS=2      # 规模与速度，见 fake_opencompass.py
+    PATH=$PWD/scripts/loadtest/bin:$PATH celery -A app.worker.celery_app worker -c 8
+    uvicorn app.main:app --workers 4
+
+用法:
+    python scripts/loadtest/driver.py --datasets 200 --tasks 2000 --concurrency 32 \
+        --username admin --password xxx --output loadtest_report.json
+
+报告内容:
+    api        各接口 (按路由模板) 的请求数、错误数、p50/p95/p99 (客户端测得，毫秒)
+    queue_lag  任务创建到开始执行 (状态变为 running) 的等待时间分位数
+    run        任务开始执行到结束的耗时分位数
+    db         压测期间服务端 /metrics 的增量：语句数、按操作的语句耗时 p99、
+               单请求内数据库累计耗时 p99、"database is locked" 等锁冲突错误数
+    tasks_per_min  从第一个任务创建到最后一个任务结束的平均完成速率
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import requests
+import numpy as np
+from prometheus_client.parser import text_string_to_metric_families
+
+PERCENTILES = (50, 95, 99)
+FINISHED = ("success", "failed")
+# 锁冲突的典型报错 (SQLite / MySQL / PostgreSQL)
+LOCK_ERRORS = ("database is locked", "lock wait timeout", "deadlock")
+
+
+def percentiles(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    arr = np.asarray(values, dtype=float)
+    out = {f"p{p}": round(float(v), 1) for p, v in zip(PERCENTILES, np.percentile(arr, PERCENTILES))}
+    out["max"] = round(float(arr.max()), 1)
+    out["count"] = len(values)
+    return out
+
+
+def histogram_quantile(q: float, buckets: Dict[float, float]) -> Optional[float]:
+    """
+    由累计桶计数估算分位数 (与 PromQL histogram_quantile 相同的线性插值)
+    """
+    bounds = sorted(buckets)
+    if not bounds or buckets[bounds[-1]] <= 0:
+        return None
+    rank = q * buckets[bounds[-1]]
+    prev_bound, prev_count = 0.0, 0.0
+    for bound in bounds:
+        count = buckets[bound]
+        if count >= rank:
+            if bound == float("inf"):
+                return prev_bound
+            if count == prev_count:
+                return bound
+            return prev_bound + (bound - prev_bound) * (rank - prev_count) / (count - prev_count)
+        prev_bound, prev_count = bound, count
+    return prev_bound
+
+
+# ====================================================
+# 1. 客户端
+# ====================================================
+class ApiClient:
+    """
+    线程安全的 API 客户端：每个线程一个 requests.Session，逐请求记录耗时 (按路由模板分组)
+    """
+
+    def __init__(self, base: str, token: Optional[str] = None, timeout: float = 60):
+        self.base = base.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.lock_errors = 0
+
+    def _session(self) -> requests.Session:
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+            if self.token:
+                self._local.session.headers["Authorization"] = f"Bearer {self.token}"
+        return self._local.session
+
+    def request(self, method: str, path: str, route: Optional[str] = None, **kwargs) -> requests.Response:
+        route = route or path
+        start = time.perf_counter()
+        try:
+            resp = self._session().request(method, self.base + path, timeout=self.timeout, **kwargs)
+        except requests.RequestException:
+            with self._lock:
+                self.errors[f"{method} {route}"] += 1
+            raise
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.latencies[f"{method} {route}"].append(elapsed)
+            if resp.status_code >= 400:
+                self.errors[f"{method} {route}"] += 1
+                if any(e in resp.text.lower() for e in LOCK_ERRORS):
+                    self.lock_errors += 1
+        return resp
+
+    def summary(self) -> Dict[str, Dict]:
+        return {
+            route: {**(percentiles(values) or {}), "errors": self.errors.get(route, 0)}
+            for route, values in sorted(self.latencies.items())
+        }
+
+
+def login(base: str, username: str, password: str) -> str:
+    resp = requests.post(f"{base.rstrip('/')}/auth/login", data={"username": username, "password": password}, timeout=30)
+    resp.raise_for_status()
+    return resp.json()["access_token"]
+
+
+# ====================================================
+# 2. 服务端指标 (/metrics 增量)
+# ====================================================
+def scrape_metrics(metrics_url: str) -> Dict:
+    """
+    读取数据库相关的直方图：{name: {labels: {le: 累计计数}}} 以及 _count / _sum
+    """
+    try:
+        text = requests.get(metrics_url, timeout=10).text
+    except requests.RequestException as e:
+        print(f"⚠️ Metrics unavailable ({metrics_url}): {e}")
+        return {}
+    wanted = {"llm_eval_db_query_duration_seconds": "operation", "llm_eval_db_request_query_seconds": "route"}
+    out = {name: defaultdict(lambda: {"buckets": defaultdict(float), "count": 0.0, "sum": 0.0}) for name in wanted}
+    for family in text_string_to_metric_families(text):
+        if family.name not in wanted:
+            continue
+        label = wanted[family.name]
+        for s in family.samples:
+            entry = out[family.name][s.labels.get(label, "-")]
+            if s.name.endswith("_bucket"):
+                entry["buckets"][float(s.labels["le"])] += s.value
+            elif s.name.endswith("_count"):
+                entry["count"] += s.value
+            elif s.name.endswith("_sum"):
+                entry["sum"] += s.value
+    return out
+
+
+def metrics_delta(before: Dict, after: Dict) -> Dict:
+    report = {}
+    for name, series in after.items():
+        rows = {}
+        for label, entry in series.items():
+            base = before.get(name, {}).get(label)
+            count = entry["count"] - (base["count"] if base else 0)
+            if count <= 0:
+                continue
+            buckets = {le: v - (base["buckets"].get(le, 0) if base else 0) for le, v in entry["buckets"].items()}
+            p99 = histogram_quantile(0.99, buckets)
+            rows[label] = {
+                "count": int(count),
+                "avg_ms": round((entry["sum"] - (base["sum"] if base else 0)) / count * 1000, 2),
+                "p99_ms": round(p99 * 1000, 2) if p99 is not None else None,
+            }
+        report[name] = rows
+    return report
+
+
+# ====================================================
+# 3. 任务状态跟踪 (SSE)
+# ====================================================
+class TaskTracker:
+    """
+    订阅 /tasks/stream，记录每个任务创建、开始执行、结束的时刻
+    """
+
+    def __init__(self, client: ApiClient):
+        self.client = client
+        self.created: Dict[int, float] = {}
+        self.started: Dict[int, float] = {}
+        self.finished: Dict[int, float] = {}
+        self.status: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._listen, name="loadtest-sse", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def on_created(self, task_id: int, ts: float):
+        with self._lock:
+            self.created[task_id] = ts
+
+    def update(self, task_id: int, status: str, ts: float):
+        with self._lock:
+            self.status[task_id] = status
+            if status != "pending":
+                self.started.setdefault(task_id, ts)
+            if status in FINISHED:
+                self.finished.setdefault(task_id, ts)
+
+    def pending(self) -> List[int]:
+        with self._lock:
+            return [tid for tid in self.created if tid not in self.finished]
+
+    def _listen(self):
+        while not self._stop.is_set():
+            try:
+                resp = self.client._session().get(f"{self.client.base}/tasks/stream", stream=True, timeout=(10, 60))
+                event = None
+                for line in resp.iter_lines(decode_unicode=True):
+                    if self._stop.is_set():
+                        return
+                    if line.startswith("event:"):
+                        event = line[6:].strip()
+                    elif line.startswith("data:") and event == "status":
+                        data = json.loads(line[5:])
+                        self.update(data["task_id"], data.get("status"), data.get("ts") or time.time())
+            except (requests.RequestException, ValueError) as e:
+                if not self._stop.is_set():
+                    print(f"⚠️ Status stream dropped ({e}), reconnecting")
+                    time.sleep(1)
+
+    def reconcile(self, ids: List[int]):
+        """
+        SSE 断线期间可能错过的最终状态：逐个查询一次 (没有开始时刻的按结束时刻计)
+        """
+        for tid in ids:
+            try:
+                task = self.client.request("GET", f"/tasks/{tid}", route="/tasks/{task_id}").json()
+            except requests.RequestException:
+                continue
+            if task.get("status") in FINISHED:
+                self.update(tid, task["status"], time.time())
+
+
+# ====================================================
+# 4. 压测流程
+# ====================================================
+def _dataset_file(name: str, rows: int, rng: random.Random) -> bytes:
+    lines = []
+    for i in range(rows):
+        lines.append(json.dumps({
+            "question": f"[{name}] question {i}",
+            "choices": [{"label": label, "text": f"option {label}"} for label in "ABCD"],
+            "answer": rng.choice("ABCD"),
+        }))
+    return "\n".join(lines).encode("utf-8")
+
+
+def create_datasets(client: ApiClient, n: int, rows: int, concurrency: int, prefix: str, seed: int) -> List[int]:
+    reader_cfg = json.dumps({
+        "input_columns": ["question", "choices_A", "choices_B", "choices_C", "choices_D"],
+        "output_column": "answer",
+        "mapping": {"question": "question", "answer": "answer"},
+    })
+    configs_json = json.dumps([{"config_name": "", "mode": "gen", "reader_cfg": reader_cfg,
+                                "metric_config": json.dumps({"evaluator": {"type": "AccEvaluator"}})}])
+
+    def create(i: int) -> List[int]:
+        name = f"{prefix}_ds_{i}"
+        content = _dataset_file(name, rows, random.Random(seed + i))
+        resp = client.request(
+            "POST", "/datasets/", route="/datasets/",
+            data={"name": name, "category": "Loadtest", "configs_json": configs_json},
+            files={"file": (f"{name}.jsonl", content, "application/json")},
+        )
+        if resp.status_code != 200:
+            return []
+        return [c["id"] for c in resp.json().get("configs", [])]
+
+    config_ids = []
+    with ThreadPoolExecutor(concurrency) as pool:
+        for fut in as_completed([pool.submit(create, i) for i in range(n)]):
+            try:
+                config_ids += fut.result()
+            except requests.RequestException:
+                pass
+    return config_ids
+
+
+def ensure_model(client: ApiClient, name: str) -> int:
+    resp = client.request("POST", "/models/", route="/models/", json={"name": name, "type": "local", "path": f"/models/{name}"})
+    if resp.status_code == 200:
+        return resp.json()["id"]
+    models = client.request("GET", "/models/", route="/models/").json()
+    return next(m["id"] for m in models if m["name"] == name)
+
+
+def read_load(client: ApiClient, tracker: TaskTracker, stop: threading.Event, rng: random.Random):
+    """
+    模拟前端的读流量：任务列表、任务详情、数据集列表
+    """
+    while not stop.is_set():
+        try:
+            choice = rng.random()
+            if choice < 0.5:
+                client.request("GET", "/tasks/", route="/tasks/", params={"page": 1, "page_size": 20})
+            elif choice < 0.8 and tracker.created:
+                tid = rng.choice(list(tracker.created))
+                client.request("GET", f"/tasks/{tid}", route="/tasks/{task_id}")
+            else:
+                client.request("GET", "/datasets/", route="/datasets/", params={"page": 1, "page_size": 20})
+        except requests.RequestException:
+            pass
+        stop.wait(rng.uniform(0.05, 0.2))
+
+
+def run(args) -> Dict:
+    base = args.api.rstrip("/")
+    token = args.token or (login(base, args.username, args.password) if args.username else None)
+    client = ApiClient(base, token)
+    rng = random.Random(args.seed)
+    metrics_url = args.metrics_url or base.split("/api/")[0] + "/metrics"
+    prefix = args.prefix or f"lt{int(time.time())}"
+
+    before = scrape_metrics(metrics_url)
+
+    print(f"🔹 Creating {args.datasets} datasets ({args.rows} rows each)...")
+    t0 = time.time()
+    config_ids = create_datasets(client, args.datasets, args.rows, args.concurrency, prefix, args.seed)
+    print(f"   {len(config_ids)} configs in {time.time() - t0:.1f}s")
+    if not config_ids:
+        raise SystemExit("❌ No dataset configs created, check the API and credentials")
+    model_id = ensure_model(client, args.model_name)
+
+    tracker = TaskTracker(client)
+    tracker.start()
+    stop_readers = threading.Event()
+    readers = [threading.Thread(target=read_load, args=(client, tracker, stop_readers, random.Random(args.seed + i)), daemon=True)
+               for i in range(args.readers)]
+    for t in readers:
+        t.start()
+
+    print(f"🔹 Creating {args.tasks} tasks ({args.configs_per_task} configs each, concurrency {args.concurrency})...")
+    first_created = time.time()
+
+    def create_task(_):
+        ids = rng.sample(config_ids, min(args.configs_per_task, len(config_ids)))
+        resp = client.request("POST", "/tasks/", route="/tasks/", json={"model_id": model_id, "config_ids": ids})
+        if resp.status_code == 200:
+            tracker.on_created(resp.json()["id"], time.time())
+
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        for fut in as_completed([pool.submit(create_task, i) for i in range(args.tasks)]):
+            try:
+                fut.result()
+            except requests.RequestException:
+                pass
+    print(f"   {len(tracker.created)} tasks created in {time.time() - first_created:.1f}s")
+
+    print("🔹 Waiting for tasks to finish...")
+    deadline = time.time() + args.timeout
+    last_reconcile = time.time()
+    while tracker.pending() and time.time() < deadline:
+        time.sleep(2)
+        if time.time() - last_reconcile >= 30:
+            last_reconcile = time.time()
+            tracker.reconcile(tracker.pending()[:200])
+        print(f"   finished {len(tracker.finished)}/{len(tracker.created)}", end="\r")
+    tracker.reconcile(tracker.pending())
+    stop_readers.set()
+    tracker.stop()
+    print()
+
+    after = scrape_metrics(metrics_url)
+    finished = tracker.finished
+    last_finished = max(finished.values(), default=time.time())
+    elapsed_min = max(last_finished - first_created, 1e-6) / 60
+    statuses = [tracker.status.get(tid) for tid in tracker.created]
+
+    return {
+        "params": vars(args) | {"password": None, "token": None},
+        "tasks": {
+            "created": len(tracker.created),
+            "success": statuses.count("success"),
+            "failed": statuses.count("failed"),
+            "unfinished": len(tracker.pending()),
+        },
+        "tasks_per_min": round(len(finished) / elapsed_min, 2),
+        "queue_lag_ms": percentiles([(tracker.started[t] - c) * 1000 for t, c in tracker.created.items() if t in tracker.started]),
+        "run_ms": percentiles([(finished[t] - tracker.started[t]) * 1000 for t in finished if t in tracker.started]),
+        "api": client.summary(),
+        "db": {"lock_errors": client.lock_errors, **metrics_delta(before, after)},
+    }
+
+
+def print_report(report: Dict):
+    print("\n📊 API latency (ms)")
+    print(f"{'route':<32}{'count':>8}{'errors':>8}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for route, s in report["api"].items():
+        print(f"{route:<32}{s.get('count', 0):>8}{s['errors']:>8}{s.get('p50', '-'):>10}{s.get('p95', '-'):>10}{s.get('p99', '-'):>10}")
+    print(f"\n⏳ Queue lag (ms): {report['queue_lag_ms']}")
+    print(f"🏃 Run time (ms):  {report['run_ms']}")
+    print(f"✅ Tasks: {report['tasks']}  ->  {report['tasks_per_min']} tasks/min")
+    db = report["db"]
+    print(f"\n🗄️ DB lock errors: {db['lock_errors']}")
+    for op, s in db.get("llm_eval_db_query_duration_seconds", {}).items():
+        print(f"   {op:<10} {s['count']:>9} stmts  avg {s['avg_ms']:>7} ms  p99 {s['p99_ms']} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM-Eval end-to-end load test")
+    parser.add_argument("--api", default=os.getenv("LOADTEST_API", "http://localhost:8000/api/v1"))
+    parser.add_argument("--metrics-url", default=None, help="默认为 API 同源的 /metrics")
+    parser.add_argument("--username", default=os.getenv("LOADTEST_USERNAME"))
+    parser.add_argument("--password", default=os.getenv("LOADTEST_PASSWORD"))
+    parser.add_argument("--token", default=os.getenv("LOADTEST_TOKEN"))
+    parser.add_argument("--datasets", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=100, help="每个数据集的行数")
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--configs-per-task", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--readers", type=int, default=8, help="并发的只读客户端数 (模拟前端浏览)")
+    parser.add_argument("--model-name", default="loadtest-model")
+    parser.add_argument("--prefix", default=None, help="数据集名前缀 (默认按时间生成，避免与上次运行重名)")
+    parser.add_argument("--timeout", type=float, default=3600, help="等待任务结束的最长秒数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="JSON 报告路径")
+    args = parser.parse_args()
+
+    report = run(args)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n📝 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+假的 opencompass 可执行文件 (压测用)：不加载模型、不导入 opencompass，
+按 OpenCompassRunner 生成的配置写出与 --debug 模式一致的运行目录：
+
+    {work_dir}/{%Y%m%d_%H%M%S}/
+        configs/{config}.py
+        predictions/{model}/{abbr}.json     逐样本预测 (origin_prompt / prediction / gold)
+        results/{model}/{abbr}.json         accuracy + 逐样本 details
+        summary/summary_{ts}.csv            dataset,version,metric,mode,{model}
+
+用法: 把 scripts/loadtest/bin 放到 PATH 最前面再启动 Celery worker (见 driver.py)
+
+规模与速度 (环境变量):
+    FAKE_OC_SAMPLES        每个数据集的样本数 (默认读取数据集文件行数，读不到时为 100)
+    FAKE_OC_MAX_SAMPLES    样本数上限 (默认 5000)
+    FAKE_OC_STARTUP_S      子进程启动耗时 (导入依赖、解析配置)，默认 1.0
+    FAKE_OC_SAMPLE_MS      每个样本的推理耗时，默认 2
+    FAKE_OC_EVAL_MS        每个数据集的评估耗时，默认 50
+    FAKE_OC_FAIL_RATE      以非零退出码失败的概率，默认 0
+    FAKE_OC_OUTPUT         results / summary / both (默认 both)
+    FAKE_OC_SEED           随机种子 (与配置路径一起决定分数与预测，结果可复现)
+"""
+import os
+import re
+import sys
+import csv
+import json
+import time
+import random
+import shutil
+import hashlib
+import argparse
+from datetime import datetime
+
+# 私有数据集: dict({"abbr": "...", ..., "path": "..."})；官方数据集: item['abbr'] = '...'
+_PRIVATE_DATASET = re.compile(r'^\s*dict\((\{.*\})\),\s*$', re.M)
+_OFFICIAL_ABBR = re.compile(r"item\['abbr'\] = '([^']+)'")
+_MODEL_ABBR = re.compile(r"abbr='([^']*)'")
+_LABELS = "ABCD"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def parse_config(config_path: str):
+    """
+    从生成的配置文本中解析模型 abbr 与数据集列表 (无需 opencompass 即可读取)
+    """
+    with open(config_path, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    datasets = []
+    for m in _PRIVATE_DATASET.finditer(text):
+        try:
+            item = json.loads(m.group(1))
+        except ValueError:
+            continue
+        datasets.append({"abbr": item["abbr"], "path": item.get("path")})
+    datasets += [{"abbr": abbr, "path": None} for abbr in _OFFICIAL_ABBR.findall(text)]
+
+    models_part = text[text.find("models = ["):]
+    model = _MODEL_ABBR.search(models_part)
+    return (model.group(1) if model else "model"), datasets
+
+
+def _count_lines(path, limit: int) -> int:
+    if not path or not os.path.exists(path):
+        return 0
+    n = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                n += 1
+                if n >= limit:
+                    break
+    return n
+
+
+def _log(msg: str):
+    # 与 OpenCompass 日志前缀一致: "01/02 12:34:56 - OpenCompass - INFO - ..."
+    print(f"{datetime.now().strftime('%m/%d %H:%M:%S')} - OpenCompass - INFO - {msg}", flush=True)
+
+
+def _write_json(path: str, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def run(config_path: str, work_dir: str) -> int:
+    seed = os.getenv("FAKE_OC_SEED", "0")
+    rng = random.Random(f"{seed}:{os.path.abspath(config_path)}")
+    max_samples = int(_env_float("FAKE_OC_MAX_SAMPLES", 5000))
+    fixed_samples = os.getenv("FAKE_OC_SAMPLES")
+    sample_s = _env_float("FAKE_OC_SAMPLE_MS", 2) / 1000
+    eval_s = _env_float("FAKE_OC_EVAL_MS", 50) / 1000
+    output = os.getenv("FAKE_OC_OUTPUT", "both")
+
+    time.sleep(_env_float("FAKE_OC_STARTUP_S", 1.0))
+    model_abbr, datasets = parse_config(config_path)
+    if not datasets:
+        _log(f"No datasets found in {config_path}")
+        return 1
+
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    run_dir = os.path.join(work_dir, ts)
+    os.makedirs(os.path.join(run_dir, "configs"), exist_ok=True)
+    shutil.copy(config_path, os.path.join(run_dir, "configs", f"{ts}.py"))
+    _log(f"Current exp folder: {run_dir}")
+
+    if rng.random() < _env_float("FAKE_OC_FAIL_RATE", 0):
+        _log("Simulated failure (FAKE_OC_FAIL_RATE)")
+        return 1
+
+    # 推理：各数据集顺序执行 (--debug)，逐个写出 predictions
+    truth = {}
+    for ds in datasets:
+        abbr = ds["abbr"]
+        n = int(fixed_samples) if fixed_samples else (_count_lines(ds["path"], max_samples) or 100)
+        n = min(n, max_samples)
+        _log(f"Start inferencing {model_abbr}/{abbr} ({n} samples)")
+        time.sleep(n * sample_s)
+        # 每个数据集一个目标正确率，逐样本按该概率答对
+        target = rng.uniform(0.2, 0.95)
+        preds, golds = {}, []
+        for i in range(n):
+            gold = rng.choice(_LABELS)
+            pred = gold if rng.random() < target else rng.choice(_LABELS.replace(gold, ""))
+            golds.append((pred, gold))
+            preds[str(i)] = {
+                "origin_prompt": [{"role": "HUMAN", "prompt": f"Question {i} of {abbr}?\nAnswer:"}],
+                "prediction": pred,
+                "gold": gold,
+            }
+        _write_json(os.path.join(run_dir, "predictions", model_abbr, f"{abbr}.json"), preds)
+        truth[abbr] = golds
+
+    # 评估
+    scores = {}
+    for ds in datasets:
+        abbr = ds["abbr"]
+        time.sleep(eval_s)
+        golds = truth[abbr]
+        correct = [pred == gold for pred, gold in golds]
+        scores[abbr] = round(100 * sum(correct) / len(correct), 2) if correct else 0.0
+        if output in ("results", "both"):
+            details = {
+                str(i): {"pred": pred, "answer": gold, "correct": ok}
+                for i, ((pred, gold), ok) in enumerate(zip(golds, correct))
+            }
+            _write_json(os.path.join(run_dir, "results", model_abbr, f"{abbr}.json"),
+                        {"accuracy": scores[abbr], "details": details})
+        _log(f"Evaluated {model_abbr}/{abbr}: accuracy={scores[abbr]}")
+
+    if output in ("summary", "both"):
+        summary_path = os.path.join(run_dir, "summary", f"summary_{ts}.csv")
+        os.makedirs(os.path.dirname(summary_path), exist_ok=True)
+        with open(summary_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["dataset", "version", "metric", "mode", model_abbr])
+            for abbr, score in scores.items():
+                version = hashlib.md5(abbr.encode()).hexdigest()[:6]
+                writer.writerow([abbr, version, "accuracy", "gen", f"{score:.2f}"])
+        _log(f"write summary to {summary_path}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="opencompass")
+    parser.add_argument("config")
+    parser.add_argument("-w", "--work-dir", default="outputs/default")
+    parser.add_argument("--debug", action="store_true")
+    args, _ = parser.parse_known_args(argv)
+    return run(args.config, args.work_dir)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""
+本地 OpenAI 兼容替身服务 (基准测试用)：确定性回答，不花钱、不联网
+
+    python scripts/loadtest/mock_openai_server.py --port 9000 \
+        --answer-key data/qa.jsonl --accuracy 0.7 \
+        --latency lognormal:5.5,0.4 --per-token-ms 2 \
+        --error-rate 0.01 --rate-limit-rate 0.02 --max-rps 50 --max-concurrency 16
+
+然后把 API 模型的 base_url 设为 http://localhost:9000/v1 (预检会自动补上 /chat/completions)
+
+回答规则 (同一提示词在同一种子下总是得到相同回答):
+- 提供答案表 (--answer-key，JSONL 的 question / answer 字段) 时，按提示词中的题目查表，
+  以 --accuracy 的概率答对，否则给出另一个选项
+- 查不到或未提供答案表时，由 (种子, 模型名, 提示词) 决定从 A-D 中选一个
+
+注入 (按 种子+提示词+第几次请求 决定，重试可能成功，便于测重试逻辑):
+- --latency       延迟分布 (毫秒): fixed:200 / uniform:100,500 / normal:300,50 / lognormal:mu,sigma
+- --per-token-ms  每个生成 token 额外的延迟
+- --error-rate    返回 500 的概率；--rate-limit-rate 返回 429 (带 Retry-After) 的概率
+- --max-rps       每秒请求上限，超出时返回 429；--max-concurrency 同时处理的请求上限 (超出排队)
+
+GET /stats 返回各状态码计数与延迟，POST /stats/reset 清零
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+CHOICES = "ABCD"
+# 提示词中题目所在行的常见前缀 (私有数据集默认模板为 "Question: {question}\nAnswer:")
+_QUESTION_PREFIX = re.compile(r"^\s*(question|q|问题)\s*[:：]\s*", re.I)
+
+
+@dataclass
+class MockSettings:
+    seed: int = 0
+    answer_key: Dict[str, str] = field(default_factory=dict)
+    accuracy: float = 1.0
+    latency: str = "fixed:0"
+    per_token_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    max_rps: float = 0.0
+    max_concurrency: int = 0
+    completion: str = "The answer is {answer}."
+
+
+def load_answer_key(path: str, question_field: str = "question", answer_field: str = "answer") -> Dict[str, str]:
+    key = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            if question_field in row and answer_field in row:
+                key[_normalize(str(row[question_field]))] = str(row[answer_field])
+    return key
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_QUESTION_PREFIX.sub("", text).split())
+
+
+def _rng(*parts) -> random.Random:
+    digest = hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def sample_latency_ms(spec: str, rng: random.Random) -> float:
+    kind, _, params = spec.partition(":")
+    args = [float(x) for x in params.split(",") if x.strip()] if params else []
+    if kind == "fixed":
+        value = args[0] if args else 0.0
+    elif kind == "uniform":
+        value = rng.uniform(args[0], args[1])
+    elif kind == "normal":
+        value = rng.gauss(args[0], args[1])
+    elif kind == "lognormal":
+        value = rng.lognormvariate(args[0], args[1])
+    else:
+        raise ValueError(f"Unknown latency distribution: {spec}")
+    return max(0.0, value)
+
+
+def _prompt_text(messages: List[Dict]) -> str:
+    user = [m.get("content") for m in messages if m.get("role") == "user"] or [m.get("content") for m in messages]
+    content = user[-1] if user else ""
+    if isinstance(content, list):
+        # 多段内容: [{"type": "text", "text": "..."}]
+        content = "\n".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content or "")
+
+
+class TokenBucket:
+    def __init__(self, rate: float):
+        self.rate = rate
+        # 桶容量至少为 1，否则 rate < 1 时令牌永远攒不满一个
+        self.burst = max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class MockOpenAI:
+    """
+    回答与注入逻辑 (与 HTTP 层分开，便于单独测试)
+    """
+
+    def __init__(self, settings: MockSettings):
+        self.settings = settings
+        self.attempts: Counter = Counter()
+        self.stats: Counter = Counter()
+        self.latencies: List[float] = []
+        self.bucket = TokenBucket(settings.max_rps) if settings.max_rps > 0 else None
+        self.semaphore = asyncio.Semaphore(settings.max_concurrency) if settings.max_concurrency > 0 else None
+
+    def answer(self, model: str, prompt: str) -> str:
+        s = self.settings
+        rng = _rng(s.seed, model, prompt)
+        gold = None
+        if s.answer_key:
+            gold = s.answer_key.get(_normalize(prompt))
+            if gold is None:
+                for line in prompt.splitlines():
+                    gold = s.answer_key.get(_normalize(line))
+                    if gold is not None:
+                        break
+        if gold is None:
+            return rng.choice(CHOICES)
+        if rng.random() < s.accuracy:
+            return gold
+        wrong = [c for c in CHOICES if c != gold] or [gold]
+        return rng.choice(wrong)
+
+    def injected_status(self, model: str, prompt: str) -> Optional[int]:
+        s = self.settings
+        if self.bucket is not None and not self.bucket.take():
+            return 429
+        attempt = self.attempts[(model, prompt)]
+        self.attempts[(model, prompt)] += 1
+        roll = _rng(s.seed, "fault", model, prompt, attempt).random()
+        if roll < s.error_rate:
+            return 500
+        if roll < s.error_rate + s.rate_limit_rate:
+            return 429
+        return None
+
+    def completion(self, body: Dict) -> Dict:
+        model = str(body.get("model") or "mock")
+        prompt = _prompt_text(body.get("messages") or [])
+        answer = self.answer(model, prompt)
+        text = self.settings.completion.format(answer=answer)
+        words = text.split()
+        max_tokens = body.get("max_tokens")
+        finish_reason = "stop"
+        if isinstance(max_tokens, int) and 0 < max_tokens < len(words):
+            words, finish_reason = words[:max_tokens], "length"
+        text = " ".join(words)
+        digest = hashlib.sha256(f"{model}\x1f{prompt}".encode("utf-8")).hexdigest()[:24]
+        prompt_tokens = len(prompt.split())
+        return {
+            "id": f"chatcmpl-{digest}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": finish_reason}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(words), "total_tokens": prompt_tokens + len(words)},
+        }
+
+    def latency_ms(self, body: Dict, completion_tokens: int) -> float:
+        model = str(body.get("model") or "mock")
+        prompt = _prompt_text(body.get("messages") or [])
+        rng = _rng(self.settings.seed, "latency", model, prompt, self.attempts[(model, prompt)])
+        return sample_latency_ms(self.settings.latency, rng) + completion_tokens * self.settings.per_token_ms
+
+
+def _error(status: int, message: str, kind: str) -> JSONResponse:
+    headers = {"Retry-After": "1"} if status == 429 else None
+    return JSONResponse(status_code=status, content={"error": {"message": message, "type": kind}}, headers=headers)
+
+
+def create_app(settings: MockSettings) -> FastAPI:
+    app = FastAPI(title="Mock OpenAI")
+    mock = MockOpenAI(settings)
+    app.state.mock = mock
+
+    async def chat_completions(request: Request):
+        try:
+            body = await request.json()
+        except ValueError:
+            mock.stats[400] += 1
+            return _error(400, "Invalid JSON body", "invalid_request_error")
+        if not isinstance(body, dict) or not body.get("messages"):
+            mock.stats[400] += 1
+            return _error(400, "'messages' is required", "invalid_request_error")
+
+        start = time.perf_counter()
+        model = str(body.get("model") or "mock")
+        status = mock.injected_status(model, _prompt_text(body["messages"]))
+        if status == 429:
+            mock.stats[429] += 1
+            return _error(429, "Rate limit reached (injected)", "rate_limit_error")
+
+        async def respond():
+            result = mock.completion(body)
+            delay = mock.latency_ms(body, result["usage"]["completion_tokens"])
+            if delay:
+                await asyncio.sleep(delay / 1000)
+            return result
+
+        if mock.semaphore is not None:
+            async with mock.semaphore:
+                result = await respond()
+        else:
+            result = await respond()
+
+        if status == 500:
+            mock.stats[500] += 1
+            return _error(500, "Internal server error (injected)", "server_error")
+        mock.stats[200] += 1
+        mock.latencies.append((time.perf_counter() - start) * 1000)
+        return result
+
+    # 预检会依次尝试 base_url 与 base_url/chat/completions
+    for path in ("/v1/chat/completions", "/chat/completions"):
+        app.add_api_route(path, chat_completions, methods=["POST"])
+
+    @app.get("/v1/models")
+    def list_models():
+        return {"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "mock"}]}
+
+    @app.get("/stats")
+    def stats():
+        lat = sorted(mock.latencies)
+        pick = lambda q: round(lat[min(len(lat) - 1, int(q * len(lat)))], 1) if lat else None
+        return {"status": {str(k): v for k, v in mock.stats.items()}, "latency_ms": {"p50": pick(0.5), "p99": pick(0.99)}}
+
+    @app.post("/stats/reset")
+    def reset_stats():
+        mock.stats.clear()
+        mock.latencies.clear()
+        mock.attempts.clear()
+        return {"ok": True}
+
+    return app
+
+
+def main():
+    env = os.getenv
+    parser = argparse.ArgumentParser(description="Deterministic OpenAI-compatible stand-in server")
+    parser.add_argument("--host", default=env("MOCK_OPENAI_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(env("MOCK_OPENAI_PORT", "9000")))
+    parser.add_argument("--seed", type=int, default=int(env("MOCK_OPENAI_SEED", "0")))
+    parser.add_argument("--answer-key", default=env("MOCK_OPENAI_ANSWER_KEY"))
+    parser.add_argument("--question-field", default="question")
+    parser.add_argument("--answer-field", default="answer")
+    parser.add_argument("--accuracy", type=float, default=float(env("MOCK_OPENAI_ACCURACY", "1.0")))
+    parser.add_argument("--latency", default=env("MOCK_OPENAI_LATENCY", "fixed:0"))
+    parser.add_argument("--per-token-ms", type=float, default=float(env("MOCK_OPENAI_PER_TOKEN_MS", "0")))
+    parser.add_argument("--error-rate", type=float, default=float(env("MOCK_OPENAI_ERROR_RATE", "0")))
+    parser.add_argument("--rate-limit-rate", type=float, default=float(env("MOCK_OPENAI_RATE_LIMIT_RATE", "0")))
+    parser.add_argument("--max-rps", type=float, default=float(env("MOCK_OPENAI_MAX_RPS", "0")))
+    parser.add_argument("--max-concurrency", type=int, default=int(env("MOCK_OPENAI_MAX_CONCURRENCY", "0")))
+    args = parser.parse_args()
+
+    # 启动前校验延迟分布写法
+    sample_latency_ms(args.latency, random.Random(0))
+    settings = MockSettings(
+        seed=args.seed,
+        answer_key=load_answer_key(args.answer_key, args.question_field, args.answer_field) if args.answer_key else {},
+        accuracy=args.accuracy,
+        latency=args.latency,
+        per_token_ms=args.per_token_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        max_rps=args.max_rps,
+        max_concurrency=args.max_concurrency,
+    )
+    print(f"🤖 Mock OpenAI on http://{args.host}:{args.port}/v1 ({len(settings.answer_key)} answers, latency {args.latency})")
+
+    import uvicorn
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -21,6 +21,7 @@ from app.models.dataset import DatasetMeta, DatasetConfig
 # 引入 Task 和 Result 防止关系报错
 from app.models.task import EvaluationTask
 from app.models.result import EvaluationResult
+from app.services.catalog_stats import CatalogStatsService
 
 # 3. 加载官方映射表
 CAPABILITY_MAP_FILE = os.path.join(current_dir, "dataset_capabilities.json")
@@ -388,6 +389,10 @@ def process_and_save(session: Session, oc_root: str):
             session.rollback()
             continue
 
+    # 同步数据集统计计数器 (全量重算，单事务提交)
+    CatalogStatsService(session).rebuild()
+    session.commit()
+
     print(f"\n🎉 V9 录入完成！")
     print(f"   ✅ 成功录入: {success_count}")
     print(f"   🧹 过滤噪音: {skipped_count}")
@@ -33,7 +33,8 @@ def run_test():
     step("Create Dataset")
     # 为了测试方便，我们假设数据库里已经有了初始化的数据集
     # 如果没有，我们需要先上传一个。这里尝试获取现有的。
-    resp = requests.get(f"{API_BASE}/datasets/configs")
+    # 只取一条、只要需要的字段，避免拉取全部配置大字段
+    resp = requests.get(f"{API_BASE}/datasets/configs", params={"fields": "id,config_name", "limit": 1})
     configs = resp.json()
     print(configs)
     
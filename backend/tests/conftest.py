@@ -0,0 +1,71 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from app.main import app
+from app.core.database import get_session
+from app.core.cache import resource_cache, compare_cache
+from app.core.query_profiler import install_query_profiler, assert_max_queries
+from app.deps import get_current_active_user, get_current_admin
+from app.models.user import User
+
+# ==========================================
+# 公共测试环境：独立的内存库 + 免登录的管理员身份
+# ==========================================
+
+@pytest.fixture(name="db_engine")
+def db_engine_fixture():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    install_query_profiler(engine)
+    # 内存库的自增 id 会在测试间重复，对比缓存需隔离
+    compare_cache.clear()
+    yield engine
+    SQLModel.metadata.drop_all(engine)
+
+
+@pytest.fixture(name="db_session")
+def db_session_fixture(db_engine):
+    with Session(db_engine) as session:
+        yield session
+
+
+@pytest.fixture(name="query_budget")
+def query_budget_fixture(db_engine):
+    """
+    语句数预算断言：with query_budget(3, "GET /tasks/{id}"): admin_client.get(...)
+    超出预算时失败并列出执行过的全部语句 (用于发现 N+1 之类的回归)
+    """
+    def _budget(limit: int, label: str = ""):
+        return assert_max_queries(db_engine, limit, label)
+    return _budget
+
+
+@pytest.fixture(name="admin_client")
+def admin_client_fixture(db_engine):
+    """
+    以管理员身份访问接口的 TestClient (测试结束后恢复原有的依赖覆盖)
+    """
+    def _get_session():
+        with Session(db_engine) as session:
+            yield session
+
+    admin = User(id=1, username="admin", hashed_password="x", role="admin", is_active=True)
+
+    saved_overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_session] = _get_session
+    app.dependency_overrides[get_current_active_user] = lambda: admin
+    app.dependency_overrides[get_current_admin] = lambda: admin
+
+    # 每个测试使用独立的内存库，进程内响应缓存也需隔离
+    resource_cache.clear()
+    yield TestClient(app)
+    resource_cache.clear()
+
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(saved_overrides)
@@ -0,0 +1,43 @@
+from app.core.cache import resource_cache
+
+
+def test_models_list_cached_with_etag_and_invalidated_on_write(admin_client):
+    payload = {"name": "Cache-Model", "path": "/models/a", "type": "local"}
+    assert admin_client.post("/api/v1/models/", json=payload).status_code == 200
+
+    first = admin_client.get("/api/v1/models/")
+    assert first.status_code == 200
+    assert [m["name"] for m in first.json()] == ["Cache-Model"]
+    etag = first.headers["etag"]
+
+    assert admin_client.get("/api/v1/models/", headers={"If-None-Match": etag}).status_code == 304
+
+    version = resource_cache.version("models")
+    model_id = first.json()[0]["id"]
+    assert admin_client.delete(f"/api/v1/models/{model_id}").status_code == 200
+    assert resource_cache.version("models") == version + 1
+
+    after = admin_client.get("/api/v1/models/", headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.json() == []
+
+
+def test_schemes_list_uses_link_ids(admin_client, db_session):
+    from app.models.dataset import DatasetMeta, DatasetConfig
+
+    meta = DatasetMeta(name="ARC", category="Reasoning")
+    db_session.add(meta)
+    db_session.commit()
+    configs = [DatasetConfig(meta_id=meta.id, config_name=f"arc_{i}", file_path="/tmp/arc.jsonl") for i in range(3)]
+    for c in configs:
+        db_session.add(c)
+    db_session.commit()
+    ids = [c.id for c in configs]
+
+    res = admin_client.post("/api/v1/schemes/", json={"name": "S1", "dataset_config_ids": ids[:2]})
+    assert res.status_code == 200
+    listed = admin_client.get("/api/v1/schemes/").json()
+    assert listed[0]["dataset_config_ids"] == ids[:2]
+
+    assert admin_client.delete(f"/api/v1/schemes/{res.json()['id']}").status_code == 200
+    assert admin_client.get("/api/v1/schemes/").json() == []
@@ -0,0 +1,102 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.models.llm_model import LLMModel
+from app.models.dataset import DatasetMeta, DatasetConfig
+from app.models.scheme import EvaluationScheme
+from app.models.task import EvaluationTask
+from app.models.result import EvaluationResult
+from app.services.task_service import TaskService
+from app.core.cache import compare_cache
+from app.utils import fast_json
+
+
+def _seed(session: Session):
+    scheme = EvaluationScheme(name="compare-scheme")
+    mmlu = DatasetMeta(name="MMLU", category="Knowledge")
+    gsm = DatasetMeta(name="GSM8K", category="Math")
+    models = [LLMModel(name="Qwen-7B", path="/m/qwen"), LLMModel(name="Llama-8B", path="/m/llama")]
+    session.add_all([scheme, mmlu, gsm, *models])
+    session.commit()
+
+    mmlu_cfg = DatasetConfig(meta_id=mmlu.id, config_name="mmlu_gen", file_path="/tmp/mmlu.jsonl")
+    gsm_cfg = DatasetConfig(meta_id=gsm.id, config_name="gsm8k_gen", file_path="/tmp/gsm8k.jsonl")
+    tasks = [EvaluationTask(model_id=m.id, scheme_id=scheme.id, status="success", datasets_list="[]") for m in models]
+    session.add_all([mmlu_cfg, gsm_cfg, *tasks])
+    session.commit()
+
+    a, b = tasks
+    session.add_all([
+        EvaluationResult(task_id=a.id, dataset_config_id=mmlu_cfg.id, dataset_name="MMLU", metric_name="accuracy", score=0.6),
+        EvaluationResult(task_id=a.id, dataset_config_id=gsm_cfg.id, dataset_name="GSM8K", metric_name="accuracy", score=40.0),
+        EvaluationResult(task_id=b.id, dataset_config_id=mmlu_cfg.id, dataset_name="MMLU", metric_name="accuracy", score=0.7),
+        # 同一行重复写入时以最后一条为准
+        EvaluationResult(task_id=b.id, dataset_config_id=mmlu_cfg.id, dataset_name="MMLU", metric_name="accuracy", score=0.75),
+    ])
+    session.commit()
+    return a.id, b.id
+
+
+def test_compare_matrix_and_radar(db_engine, db_session: Session):
+    a, b = _seed(db_session)
+
+    queries = []
+    event.listen(db_engine, "before_cursor_execute", lambda *args: queries.append(1))
+    with Session(db_engine) as session:
+        data = TaskService(session).compare_tasks([b, a])
+
+    # 任务/结果各一次 JOIN，外加方案名称与阶段耗时：查询数与任务、数据集数量无关
+    assert len(queries) == 4
+
+    assert [m["display_name"] for m in data["models"]] == [f"Qwen-7B (#{a})", f"Llama-8B (#{b})"]
+    assert [r["dataset_metric"] for r in data["table_data"]] == ["MMLU (accuracy)", "GSM8K (accuracy)"]
+
+    mmlu, gsm = data["table_data"]
+    assert mmlu[f"task_{b}"] == 0.75
+    assert mmlu[f"diff_{a}"] == -0.15
+    assert f"diff_{b}" not in mmlu
+    assert gsm[f"task_{b}"] is None and gsm[f"diff_{a}"] is None
+
+    assert data["radar_indicators"] == [{"name": "Knowledge", "max": 100}, {"name": "Math", "max": 100}]
+    # 雷达序列与请求顺序一致，缺失的能力维度记 0
+    assert data["radar_data"] == [
+        {"name": f"Llama-8B (#{b})", "value": [72.5, 0]},
+        {"name": f"Qwen-7B (#{a})", "value": [60.0, 40.0]},
+    ]
+
+
+def test_compare_cache_hit_and_invalidation(db_engine, db_session: Session):
+    a, b = _seed(db_session)
+    first = TaskService(db_session).compare_tasks([a, b])
+
+    queries = []
+    event.listen(db_engine, "before_cursor_execute", lambda *args: queries.append(1))
+    with Session(db_engine) as session:
+        again = TaskService(session).compare_tasks_json([a, b])
+        # 命中缓存：只查询一次版本戳；不同请求顺序 (基准不同) 单独缓存
+        assert len(queries) == 1
+        assert TaskService(session).compare_tasks([b, a])["table_data"][0][f"diff_{a}"] == -0.15
+    assert fast_json.loads(again)["table_data"] == fast_json.loads(fast_json.dumps(first))["table_data"]
+
+    # 结果变化 (如任务重跑写入新结果) 后版本戳变化，不再命中旧条目
+    gsm_cfg = db_session.exec(select(DatasetConfig).where(DatasetConfig.config_name == "gsm8k_gen")).one()
+    db_session.add(EvaluationResult(task_id=b, dataset_config_id=gsm_cfg.id, dataset_name="GSM8K", metric_name="accuracy", score=52.0))
+    db_session.commit()
+    data = TaskService(db_session).compare_tasks([a, b])
+    assert data["table_data"][1][f"task_{b}"] == 52.0
+
+    # 删除成员任务后，包含它的条目被清除
+    TaskService(db_session).delete_task(b)
+    assert not any(b in ids for ids in compare_cache._data)
+
+
+def test_fast_json_rejects_unknown_types():
+    assert fast_json.loads(fast_json.dumps({"score": Decimal("87.5"), "ids": {3}})) == {"score": 87.5, "ids": [3]}
+    # 未声明的类型报错，而不是悄悄输出为字符串
+    with pytest.raises(TypeError):
+        fast_json.dumps({"raw": b"\x00"})
+    with pytest.raises(TypeError):
+        fast_json.dumps({"obj": object()})
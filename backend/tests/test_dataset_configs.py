@@ -0,0 +1,56 @@
+import json
+from sqlmodel import Session
+
+from app.models.dataset import DatasetMeta, DatasetConfig
+
+
+def _seed(session: Session):
+    math = DatasetMeta(name="GSM8K", category="Math")
+    know = DatasetMeta(name="MMLU", category="Knowledge")
+    session.add(math)
+    session.add(know)
+    session.commit()
+    for i in range(5):
+        session.add(DatasetConfig(
+            meta_id=math.id if i % 2 == 0 else know.id,
+            config_name=f"cfg_{i}",
+            file_path=f"/tmp/cfg_{i}.jsonl",
+            mode="gen" if i < 4 else "ppl",
+            infer_cfg=json.dumps({"big": "x" * 100})
+        ))
+    session.commit()
+
+
+def test_configs_projection_filter_and_cursor(admin_client, db_session: Session):
+    _seed(db_session)
+
+    res = admin_client.get("/api/v1/datasets/configs", params={"fields": "config_name,mode", "limit": 2})
+    assert res.status_code == 200
+    page = res.json()
+    assert [set(r) for r in page] == [{"id", "config_name", "mode"}] * 2
+
+    next_cursor = res.headers["x-next-cursor"]
+    res = admin_client.get("/api/v1/datasets/configs", params={"fields": "config_name", "limit": 2, "cursor": next_cursor})
+    assert [r["config_name"] for r in res.json()] == ["cfg_2", "cfg_3"]
+
+    res = admin_client.get("/api/v1/datasets/configs", params={"category": "Math", "mode": "gen", "fields": "config_name"})
+    assert [r["config_name"] for r in res.json()] == ["cfg_0", "cfg_2"]
+
+    assert admin_client.get("/api/v1/datasets/configs", params={"fields": "nope"}).status_code == 400
+
+
+def test_configs_ndjson_stream(admin_client, db_session: Session):
+    _seed(db_session)
+
+    res = admin_client.get(
+        "/api/v1/datasets/configs",
+        params={"fields": "config_name"},
+        headers={"Accept": "application/x-ndjson"}
+    )
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in res.text.splitlines()]
+    assert [r["config_name"] for r in lines] == [f"cfg_{i}" for i in range(5)]
+
+    # 默认仍返回完整字段的 JSON 数组 (兼容旧调用方)
+    full = admin_client.get("/api/v1/datasets/configs").json()
+    assert len(full) == 5 and "infer_cfg" in full[0]
@@ -0,0 +1,101 @@
+import io
+import json
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.models.dataset import DatasetMeta, DatasetConfig
+from app.models.stats import CatalogCounter
+from app.services.catalog_stats import CatalogStatsService, invalidate_stats_cache
+
+READER_CFG = json.dumps({
+    "input_columns": ["question"],
+    "output_column": "answer",
+    "mapping": {"question": "question", "answer": "answer"}
+})
+
+
+@pytest.fixture(autouse=True)
+def reset_stats_cache():
+    invalidate_stats_cache()
+    yield
+    invalidate_stats_cache()
+
+
+def _upload(client, name: str, category: str, rows: int):
+    content = "\n".join(json.dumps({"question": f"q{i}", "answer": "A"}) for i in range(rows))
+    return client.post(
+        "/api/v1/datasets/",
+        data={
+            "name": name,
+            "category": category,
+            "configs_json": json.dumps([{"mode": "gen", "reader_cfg": READER_CFG}]),
+        },
+        files={"file": (f"{name}.jsonl", io.BytesIO(content.encode("utf-8")), "application/octet-stream")},
+    )
+
+
+def test_stats_follow_create_and_delete(admin_client, tmp_path, monkeypatch):
+    monkeypatch.setattr("app.api.v1.datasets.UPLOAD_DIR", str(tmp_path))
+
+    assert _upload(admin_client, "StatsA", "Knowledge", 3).status_code == 200
+    res = _upload(admin_client, "StatsB", "Reasoning", 5)
+    assert res.status_code == 200
+    meta_b_id = res.json()["id"]
+
+    stats = admin_client.get("/api/v1/datasets/stats").json()
+    assert stats["total_questions"] == 8
+    assert stats["total_datasets"] == 2
+    assert stats["sources"] == {"private": 2, "official": 0}
+    assert {c["category"]: c["count"] for c in stats["categories"]} == {"Knowledge": 1, "Reasoning": 1}
+
+    assert admin_client.delete(f"/api/v1/datasets/{meta_b_id}").status_code == 200
+
+    stats = admin_client.get("/api/v1/datasets/stats").json()
+    assert stats["total_questions"] == 3
+    assert [c["category"] for c in stats["categories"]] == ["Knowledge"]
+
+
+def test_stats_etag_and_rebuild(admin_client, db_session: Session):
+    meta = DatasetMeta(name="GSM8K", category="Math", data_count=1319)
+    db_session.add(meta)
+    db_session.commit()
+    db_session.add(DatasetConfig(meta_id=meta.id, config_name="gsm8k_gen", file_path="official://configs/gsm8k_gen.py"))
+    db_session.commit()
+
+    # 绕过写路径直接入库的数据，需通过修复接口重算
+    assert admin_client.post("/api/v1/datasets/stats/rebuild").status_code == 200
+
+    res = admin_client.get("/api/v1/datasets/stats")
+    assert res.status_code == 200
+    assert res.json()["sources"] == {"private": 0, "official": 1}
+    assert res.json()["total_questions"] == 1319
+
+    etag = res.headers["etag"]
+    cached = admin_client.get("/api/v1/datasets/stats", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    assert CatalogStatsService(db_session).build_payload()["total_datasets"] == 1
+
+
+def test_counters_upsert_in_key_order(db_engine, db_session: Session):
+    written = []
+
+    def listen(conn, cursor, statement, params, context, executemany):
+        if statement.startswith("INSERT INTO catalog_counters"):
+            written.append(tuple(params[:2]))
+
+    event.listen(db_engine, "before_cursor_execute", listen)
+    service = CatalogStatsService(db_session)
+    service.apply({}, {("total", "datasets"): 1, ("category", "New"): 1, ("modality", "Text"): 1})
+    # 另一个会话已插入同一新分类：不会撞唯一约束，而是在原值上累加
+    service.apply({("total", "datasets"): 1}, {("category", "New"): 1, ("category", "Code"): -3})
+    db_session.commit()
+    event.remove(db_engine, "before_cursor_execute", listen)
+
+    assert written == [
+        ("category", "New"), ("modality", "Text"), ("total", "datasets"),
+        ("category", "Code"), ("category", "New"), ("total", "datasets"),
+    ]
+    values = {(c.scope, c.key): c.value for c in db_session.exec(select(CatalogCounter)).all()}
+    assert values == {("category", "New"): 2, ("category", "Code"): 0, ("modality", "Text"): 1, ("total", "datasets"): 0}
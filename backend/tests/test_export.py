@@ -0,0 +1,73 @@
+import io
+import csv
+import pyarrow.parquet as pq
+from sqlmodel import Session
+
+from app.models.llm_model import LLMModel
+from app.models.dataset import DatasetMeta, DatasetConfig
+from app.models.scheme import EvaluationScheme
+from app.models.task import EvaluationTask
+from app.models.result import EvaluationResult
+from app.services import export_service
+
+
+def _seed(session: Session):
+    scheme = EvaluationScheme(name="export-scheme")
+    meta = DatasetMeta(name="数学", category="Math")
+    models = [LLMModel(name="Qwen-7B", path="/m/q"), LLMModel(name="Llama-8B", path="/m/l")]
+    session.add_all([scheme, meta, *models])
+    session.commit()
+    cfgs = [DatasetConfig(meta_id=meta.id, config_name=f"math_{i}", file_path="/tmp/x.jsonl") for i in range(5)]
+    tasks = [EvaluationTask(model_id=m.id, scheme_id=scheme.id, status="success", datasets_list="[]") for m in models]
+    session.add_all([*cfgs, *tasks])
+    session.commit()
+    for t in tasks:
+        for c in cfgs:
+            session.add(EvaluationResult(task_id=t.id, dataset_config_id=c.id, dataset_name=c.config_name,
+                                         metric_name="accuracy", score=float(t.id * 10 + c.id)))
+    session.commit()
+    return [t.id for t in tasks]
+
+
+def test_export_results_csv_in_chunks(admin_client, db_session: Session, monkeypatch):
+    ids = _seed(db_session)
+    monkeypatch.setattr(export_service, "EXPORT_BATCH_SIZE", 3)
+
+    res = admin_client.get("/api/v1/tasks/export", params={"kind": "results", "task_ids": str(ids[1])})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/csv")
+    assert "attachment" in res.headers["content-disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(res.content.decode("utf-8-sig"))))
+    assert len(rows) == 5
+    assert {r["task_id"] for r in rows} == {str(ids[1])}
+    assert rows[0]["model_name"] == "Llama-8B" and rows[0]["category"] == "Math"
+
+
+def test_export_compare_parquet(admin_client, db_session: Session):
+    ids = _seed(db_session)
+
+    res = admin_client.get("/api/v1/tasks/export", params={
+        "kind": "compare", "format": "parquet", "task_ids": ",".join(map(str, ids))
+    })
+    assert res.status_code == 200
+    table = pq.read_table(io.BytesIO(res.content))
+    assert table.column_names == ["dataset", "metric", f"task_{ids[0]}", f"task_{ids[1]}", f"diff_{ids[1]}"]
+    assert table.num_rows == 5
+    assert table.column(f"diff_{ids[1]}").to_pylist() == [10.0] * 5
+
+    assert admin_client.get("/api/v1/tasks/export", params={"kind": "compare", "task_ids": str(ids[0])}).status_code == 400
+
+
+def test_export_compare_keeps_requested_order(admin_client, db_session: Session):
+    ids = _seed(db_session)
+    # 基准为请求中的第一个任务，即使其 id 更大
+    requested = [ids[1], ids[0]]
+
+    res = admin_client.get("/api/v1/tasks/export", params={
+        "kind": "compare", "format": "parquet", "task_ids": ",".join(map(str, requested))
+    })
+    assert res.status_code == 200
+    table = pq.read_table(io.BytesIO(res.content))
+    assert table.column_names == ["dataset", "metric", f"task_{ids[1]}", f"task_{ids[0]}", f"diff_{ids[0]}"]
+    assert table.column(f"diff_{ids[0]}").to_pylist() == [-10.0] * 5
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.models.llm_model import LLMModel
+from app.models.dataset import DatasetMeta, DatasetConfig
+from app.models.task import EvaluationTask
+from app.models.result import EvaluationResult
+from app.models.leaderboard import LeaderboardEntry, LeaderboardCategoryScore
+from app.services.leaderboard_service import LeaderboardService
+from app.services.task_service import TaskService
+
+
+def _finish(session: Session, model_id: int, day: int, scores):
+    """
+    模拟一个成功结束的任务：写入结果后增量更新排行榜
+    """
+    task = EvaluationTask(
+        model_id=model_id, status="success", progress=100, datasets_list="[]",
+        finished_at=datetime(2026, 1, 1) + timedelta(days=day),
+    )
+    session.add(task)
+    session.flush()
+    for config, metric, score in scores:
+        session.add(EvaluationResult(
+            task_id=task.id, dataset_config_id=config.id, dataset_name=config.config_name,
+            metric_name=metric, score=score,
+        ))
+    session.flush()
+    LeaderboardService(session).apply_task(task)
+    session.commit()
+    return task
+
+
+def _snapshot(session: Session):
+    entries = sorted(
+        (e.model_id, e.dataset_config_id, e.metric_name, e.latest_score, e.latest_task_id, e.best_score, e.best_task_id)
+        for e in session.exec(select(LeaderboardEntry)).all()
+    )
+    rollups = sorted((r.model_id, r.category, r.score) for r in session.exec(select(LeaderboardCategoryScore)).all())
+    return entries, rollups
+
+
+def test_leaderboard_incremental_matches_rebuild(admin_client, db_session: Session):
+    qwen, llama = LLMModel(name="Qwen-7B", path="/m/q"), LLMModel(name="Llama-8B", path="/m/l")
+    mmlu, gsm = DatasetMeta(name="MMLU", category="Knowledge"), DatasetMeta(name="GSM8K", category="Math")
+    db_session.add_all([qwen, llama, mmlu, gsm])
+    db_session.commit()
+    mmlu_cfg = DatasetConfig(meta_id=mmlu.id, config_name="mmlu_gen", file_path="/tmp/mmlu.jsonl")
+    gsm_cfg = DatasetConfig(meta_id=gsm.id, config_name="gsm8k_gen", file_path="/tmp/gsm8k.jsonl")
+    db_session.add_all([mmlu_cfg, gsm_cfg])
+    db_session.commit()
+
+    t1 = _finish(db_session, qwen.id, 0, [(mmlu_cfg, "accuracy", 0.8), (gsm_cfg, "accuracy", 40.0), (gsm_cfg, "ppl", 9.0)])
+    t2 = _finish(db_session, qwen.id, 1, [(mmlu_cfg, "accuracy", 0.7), (gsm_cfg, "ppl", 7.5)])
+    _finish(db_session, llama.id, 0, [(mmlu_cfg, "accuracy", 0.9)])
+
+    entry = db_session.exec(select(LeaderboardEntry).where(
+        LeaderboardEntry.model_id == qwen.id, LeaderboardEntry.dataset_config_id == mmlu_cfg.id
+    )).one()
+    assert (entry.latest_score, entry.latest_task_id) == (0.7, t2.id)
+    assert (entry.best_score, entry.best_task_id) == (0.8, t1.id)
+    # ppl 越低越好
+    ppl = db_session.exec(select(LeaderboardEntry).where(LeaderboardEntry.metric_name == "ppl")).one()
+    assert (ppl.best_score, ppl.normalized_score) == (7.5, None)
+
+    res = admin_client.get("/api/v1/leaderboard/", params={"page_size": 1})
+    assert res.status_code == 200
+    data = res.json()
+    assert data["total"] == 2
+    # Qwen: Knowledge 70.0, Math 40.0 -> Overall 55.0; Llama: Knowledge 90.0
+    assert data["items"][0]["model_name"] == "Llama-8B" and data["items"][0]["score"] == 90.0
+    assert admin_client.get("/api/v1/leaderboard/", params={"page": 2, "page_size": 1}).json()["items"][0]["score"] == 55.0
+
+    res = admin_client.get("/api/v1/leaderboard/entries", params={"config_id": mmlu_cfg.id, "metric": "accuracy"})
+    assert [i["model_name"] for i in res.json()["items"]] == ["Llama-8B", "Qwen-7B"]
+
+    incremental = _snapshot(db_session)
+    LeaderboardService(db_session).rebuild()
+    db_session.commit()
+    assert _snapshot(db_session) == incremental
+
+    # 删除最新任务后回退到上一次成绩
+    TaskService(db_session).delete_task(t2.id)
+    db_session.expire_all()
+    entry = db_session.get(LeaderboardEntry, entry.id)
+    assert (entry.latest_score, entry.latest_task_id) == (0.8, t1.id)
+    incremental = _snapshot(db_session)
+    LeaderboardService(db_session).rebuild()
+    db_session.commit()
+    assert _snapshot(db_session) == incremental
+
+
+def test_concurrent_tasks_for_same_model_merge(tmp_path):
+    # 文件库：两个会话各自持有连接，模拟两个 worker 同时收尾同一模型的任务
+    engine = create_engine(f"sqlite:///{tmp_path / 'lb.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        model, meta = LLMModel(name="Qwen-7B", path="/m/q"), DatasetMeta(name="MMLU", category="Knowledge")
+        session.add_all([model, meta])
+        session.commit()
+        cfg = DatasetConfig(meta_id=meta.id, config_name="mmlu_gen", file_path="/tmp/mmlu.jsonl")
+        session.add(cfg)
+        session.commit()
+        _finish(session, model.id, 0, [(cfg, "accuracy", 50.0)])
+        tasks = []
+        for day, score in ((1, 60.0), (2, 70.0)):
+            task = EvaluationTask(model_id=model.id, status="success", datasets_list="[]",
+                                  finished_at=datetime(2026, 1, 1) + timedelta(days=day))
+            session.add(task)
+            session.flush()
+            session.add(EvaluationResult(task_id=task.id, dataset_config_id=cfg.id, dataset_name="mmlu_gen",
+                                         metric_name="accuracy", score=score))
+            tasks.append(task.id)
+        session.commit()
+
+    with Session(engine) as worker_a, Session(engine) as worker_b:
+        # worker_a 先读到了旧条目，随后 worker_b 合并了更新的任务并提交
+        stale = worker_a.exec(select(LeaderboardEntry)).all()
+        LeaderboardService(worker_b).apply_task(worker_b.get(EvaluationTask, tasks[1]))
+        worker_b.commit()
+        LeaderboardService(worker_a).apply_task(worker_a.get(EvaluationTask, tasks[0]))
+        worker_a.commit()
+        assert stale[0].latest_task_id == tasks[1]
+
+    with Session(engine) as session:
+        entry = session.exec(select(LeaderboardEntry)).one()
+        assert (entry.latest_score, entry.latest_task_id) == (70.0, tasks[1])
+        assert (entry.best_score, entry.best_task_id) == (70.0, tasks[1])
+        incremental = _snapshot(session)
+        LeaderboardService(session).rebuild()
+        session.commit()
+        assert _snapshot(session) == incremental
+    engine.dispose()
@@ -0,0 +1,65 @@
+import os
+import sys
+import json
+
+from sqlmodel import Session
+
+from app.models.llm_model import LLMModel
+from app.models.dataset import DatasetMeta, DatasetConfig
+from app.models.task import EvaluationTask
+from app.models.links import TaskDatasetLink
+from app.services.task_service import TaskService
+
+LOADTEST_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts", "loadtest")
+sys.path.insert(0, LOADTEST_DIR)
+
+from driver import histogram_quantile, percentiles  # noqa: E402
+
+
+def test_fake_opencompass_end_to_end(admin_client, db_engine, db_session: Session, tmp_path, monkeypatch):
+    # 真实的配置生成 + 子进程执行 + 结果解析，只把 opencompass 换成假的可执行文件
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PATH", os.path.join(LOADTEST_DIR, "bin") + os.pathsep + os.environ["PATH"])
+    monkeypatch.setenv("FAKE_OC_STARTUP_S", "0")
+    monkeypatch.setenv("FAKE_OC_SAMPLE_MS", "0")
+    monkeypatch.setenv("FAKE_OC_EVAL_MS", "0")
+
+    data_file = tmp_path / "qa.jsonl"
+    data_file.write_text("\n".join(json.dumps({"question": f"q{i}", "answer": "A"}) for i in range(5)), encoding="utf-8")
+
+    model = LLMModel(name="fake-7b", path=str(tmp_path / "fake-7b"))
+    metas = [DatasetMeta(name=f"QA{i}", category="Knowledge") for i in range(2)]
+    db_session.add_all([model] + metas)
+    db_session.commit()
+    configs = [DatasetConfig(meta_id=m.id, config_name=f"qa{i}_gen", file_path=str(data_file)) for i, m in enumerate(metas)]
+    db_session.add_all(configs)
+    db_session.commit()
+    task = EvaluationTask(model_id=model.id, datasets_list=json.dumps([c.id for c in configs]))
+    db_session.add(task)
+    db_session.commit()
+    db_session.add_all([TaskDatasetLink(task_id=task.id, dataset_config_id=c.id) for c in configs])
+    db_session.commit()
+
+    with Session(db_engine) as session:
+        TaskService(session).run_evaluation_logic(task.id)
+
+    body = admin_client.get(f"/api/v1/tasks/{task.id}").json()
+    assert body["status"] == "success", body["error_msg"]
+    assert {d["dataset_config_id"] for d in body["timings"]["datasets"]} == {c.id for c in configs}
+    assert body["throughput"]["total"]["samples"] == 10
+
+    samples = admin_client.get(f"/api/v1/tasks/{task.id}/samples", params={"config_id": configs[0].id}).json()
+    assert samples["total"] == 5
+
+    assert TaskService(db_session).delete_task(task.id)
+
+
+def test_histogram_quantile_and_percentiles():
+    buckets = {0.1: 50.0, 0.5: 90.0, 1.0: 100.0, float("inf"): 100.0}
+    assert histogram_quantile(0.5, buckets) == 0.1
+    assert abs(histogram_quantile(0.99, buckets) - 0.95) < 1e-9
+    assert histogram_quantile(0.5, {float("inf"): 0.0}) is None
+
+    out = percentiles([float(i) for i in range(1, 101)])
+    assert out["count"] == 100 and out["max"] == 100.0
+    assert percentiles([]) is None
@@ -0,0 +1,179 @@
+import asyncio
+
+from sqlmodel import Session
+
+from app.models.task import EvaluationTask
+from app.core.task_events import task_event_hub
+from app.utils import fast_json
+from app.services import log_stream
+from app.services.log_stream import tail_log_events, read_complete_lines, task_log_path, find_tail_offset
+
+
+def _parse(chunks):
+    events = []
+    for chunk in chunks:
+        if chunk.startswith(":"):
+            continue
+        fields = {"data": []}
+        for line in chunk.strip("\n").split("\n"):
+            key, _, value = line.partition(": ")
+            if key == "data":
+                fields["data"].append(value)
+            else:
+                fields[key] = value
+        events.append((fields["event"], "\n".join(fields["data"]), fields.get("id")))
+    return events
+
+
+def test_read_complete_lines_keeps_partial_tail(tmp_path):
+    path = tmp_path / "output.log"
+    path.write_bytes(b"epoch 1\nloading 10%\rloading 100%\npartial")
+    with open(path, "rb") as f:
+        text, offset = read_complete_lines(f, 0)
+        assert text == "epoch 1\nloading 100%" and offset == len(b"epoch 1\nloading 10%\rloading 100%\n")
+        assert read_complete_lines(f, offset) == (None, offset)
+        assert read_complete_lines(f, offset, final=True)[0] == "partial"
+
+
+def test_tail_is_driven_by_file_and_status_events(tmp_path, monkeypatch):
+    path = tmp_path / "output.log"
+    path.write_text("start\n")
+    status_queries = []
+
+    def load_status():
+        status_queries.append(1)
+        return {"status": "running", "progress": 10}
+
+    async def scenario():
+        # Redis 订阅视为在线：状态只靠事件推送，不查库
+        monkeypatch.setattr(task_event_hub, "_ensure_running", lambda: None)
+        monkeypatch.setattr(task_event_hub, "available", True)
+        stream = tail_log_events(7, "running", load_status, offset=0, log_path=str(path))
+        chunks = [await stream.__anext__() for _ in range(3)]
+
+        with open(path, "a") as f:
+            f.write("step 1\nstep 2\n")
+        chunks.append(await asyncio.wait_for(stream.__anext__(), timeout=5))
+
+        with open(path, "a") as f:
+            f.write("done")
+        task_event_hub.dispatch({"task_id": 7, "status": "success", "progress": 100})
+        async for chunk in stream:
+            chunks.append(chunk)
+        return chunks
+
+    events = _parse(asyncio.run(scenario()))
+    assert [e[0] for e in events] == ["status", "window", "log", "log", "status", "log", "end"]
+    assert events[2][1] == "start" and events[2][2] == str(len("start\n"))
+    assert events[3][1] == "step 1\nstep 2"
+    assert events[5][1] == "done"
+    # 只在建立连接时查询一次状态
+    assert len(status_queries) == 1
+    assert task_event_hub.subscriber_count == 0 and not log_stream.log_watchers._waiters
+
+
+def test_tail_ends_when_task_deleted(tmp_path, monkeypatch):
+    path = tmp_path / "output.log"
+    path.write_text("start\n")
+
+    async def scenario():
+        monkeypatch.setattr(task_event_hub, "_ensure_running", lambda: None)
+        monkeypatch.setattr(task_event_hub, "available", True)
+        stream = tail_log_events(8, "running", lambda: {"status": "running", "progress": 10}, offset=0, log_path=str(path))
+        chunks = [await stream.__anext__() for _ in range(3)]
+        task_event_hub.dispatch({"task_id": 8, "status": "deleted"})
+        async for chunk in asyncio_timeout(stream):
+            chunks.append(chunk)
+        return chunks
+
+    async def asyncio_timeout(stream):
+        while True:
+            try:
+                yield await asyncio.wait_for(stream.__anext__(), timeout=5)
+            except StopAsyncIteration:
+                return
+
+    events = _parse(asyncio.run(scenario()))
+    assert [e[0] for e in events][-2:] == ["status", "end"]
+    assert fast_json.loads(events[-1][1])["status"] == "deleted"
+
+
+def test_log_endpoint_streams_finished_task(admin_client, db_engine, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with Session(db_engine) as session:
+        task = EvaluationTask(model_id=1, status="failed", datasets_list="[]")
+        session.add(task)
+        session.commit()
+        task_id = task.id
+    path = task_log_path(task_id)
+    import os
+    os.makedirs(os.path.dirname(path))
+    with open(path, "w") as f:
+        f.write("Traceback (most recent call last):\nValueError: boom")
+
+    resp = admin_client.get(f"/api/v1/tasks/{task_id}/log")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = _parse(c + "\n\n" for c in resp.text.strip().split("\n\n"))
+    assert [e[0] for e in events] == ["status", "window", "log", "end"]
+    assert events[2][1] == "Traceback (most recent call last):\nValueError: boom"
+
+    assert admin_client.get("/api/v1/tasks/999/log").status_code == 404
+
+
+def test_find_tail_offset_reads_backwards(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_stream, "TAIL_BLOCK_BYTES", 16)
+    lines = [f"line {i:04d}" for i in range(500)]
+    data = ("\n".join(lines) + "\n").encode()
+    path = tmp_path / "output.log"
+    path.write_bytes(data)
+
+    with open(path, "rb") as f:
+        start = find_tail_offset(f, len(data), tail_lines=3)
+        assert data[start:].decode().splitlines() == lines[-3:]
+        # tail_bytes 对齐到行首，两者同时给出时取较小的窗口
+        start = find_tail_offset(f, len(data), tail_bytes=25)
+        assert data[start:].decode().splitlines() == lines[-2:]
+        assert find_tail_offset(f, len(data), tail_lines=100, tail_bytes=25) == start
+        assert find_tail_offset(f, len(data), tail_lines=10_000) == 0
+
+
+def test_log_endpoint_resume_and_grep(admin_client, db_engine, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with Session(db_engine) as session:
+        task = EvaluationTask(model_id=1, status="success", datasets_list="[]")
+        session.add(task)
+        session.commit()
+        task_id = task.id
+    path = task_log_path(task_id)
+    import os
+    os.makedirs(os.path.dirname(path))
+    content = "".join(f"[INFO] step {i}\n" if i % 100 else f"[ERROR] step {i}\n" for i in range(5000))
+    with open(path, "w") as f:
+        f.write(content)
+
+    def events(**params):
+        resp = admin_client.get(f"/api/v1/tasks/{task_id}/log", params=params)
+        assert resp.status_code == 200
+        return _parse(c + "\n\n" for c in resp.text.strip().split("\n\n"))
+
+    # 默认只发送末尾窗口
+    default = events()
+    window = fast_json.loads(default[1][1])
+    assert window["size"] == len(content) and window["start"] > 0
+    log_lines = "\n".join(e[1] for e in default if e[0] == "log").split("\n")
+    assert len(log_lines) == log_stream.DEFAULT_TAIL_LINES and log_lines[-1] == "[INFO] step 4999"
+
+    # 按上次的 offset 续读：已读完时没有新的 log 事件
+    end = fast_json.loads(default[-1][1])
+    assert end["offset"] == len(content)
+    assert [e[0] for e in events(offset=end["offset"])] == ["status", "window", "end"]
+
+    tail = events(tail_lines=5)
+    assert [e[1] for e in tail if e[0] == "log"] == ["\n".join(f"[INFO] step {i}" for i in range(4995, 5000))]
+
+    errors = events(offset=0, grep=r"\[error\]")
+    matched = "\n".join(e[1] for e in errors if e[0] == "log").split("\n")
+    assert matched == [f"[ERROR] step {i}" for i in range(0, 5000, 100)]
+
+    assert admin_client.get(f"/api/v1/tasks/{task_id}/log", params={"grep": "("}).status_code == 400
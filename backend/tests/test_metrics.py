@@ -0,0 +1,47 @@
+from sqlmodel import Session
+
+from app.core import metrics
+from app.core.metrics import instrument_engine, record_stage
+from app.models.llm_model import LLMModel
+
+
+def _sample(name, **labels):
+    value = metrics.REGISTRY.get_sample_value(name, labels)
+    return value or 0.0
+
+
+def test_metrics_endpoint_reports_routes_db_and_cache(admin_client, db_engine):
+    instrument_engine(db_engine)
+    with Session(db_engine) as session:
+        session.add(LLMModel(name="Qwen-7B", path="/m/q"))
+        session.commit()
+
+    route_before = _sample("llm_eval_http_request_duration_seconds_count", method="GET", route="/api/v1/models/", status="200")
+    select_before = _sample("llm_eval_db_query_duration_seconds_count", operation="SELECT")
+    miss_before = _sample("llm_eval_cache_requests_total", cache="models", result="miss")
+    hit_before = _sample("llm_eval_cache_requests_total", cache="models", result="hit")
+
+    assert admin_client.get("/api/v1/models/").status_code == 200
+    assert admin_client.get("/api/v1/models/").status_code == 200
+
+    assert _sample("llm_eval_http_request_duration_seconds_count", method="GET", route="/api/v1/models/", status="200") == route_before + 2
+    assert _sample("llm_eval_db_query_duration_seconds_count", operation="SELECT") >= select_before + 1
+    assert _sample("llm_eval_cache_requests_total", cache="models", result="miss") == miss_before + 1
+    assert _sample("llm_eval_cache_requests_total", cache="models", result="hit") == hit_before + 1
+
+    # 路由标签使用模板，不随 id 变化
+    admin_client.get("/api/v1/tasks/12345/log")
+    assert _sample("llm_eval_http_request_duration_seconds_count", method="GET", route="/api/v1/tasks/{task_id}/log", status="404") >= 1
+
+    record_stage("parsing", 0.5)
+    metrics.record_model_throughput("Qwen-7B", samples=300, seconds=60.0, tokens=12000)
+
+    resp = admin_client.get("/metrics")
+    assert resp.status_code == 200
+    body = resp.text
+    assert 'llm_eval_task_stage_duration_seconds_count{stage="parsing"}' in body
+    assert 'llm_eval_model_samples_per_second{model="Qwen-7B"} 5.0' in body
+    assert 'llm_eval_model_tokens_per_second{model="Qwen-7B"} 200.0' in body
+    # broker 不可达时队列深度缺省，broker_up 为 0；任务状态来自抓取时的分组查询
+    assert "llm_eval_celery_broker_up" in body
+    assert "# TYPE llm_eval_tasks gauge" in body
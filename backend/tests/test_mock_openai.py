@@ -0,0 +1,69 @@
+import os
+import sys
+
+from fastapi.testclient import TestClient
+
+from app.models.llm_model import LLMModel
+from app.services import task_service
+from app.services.task_service import TaskService
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts", "loadtest"))
+
+from mock_openai_server import MockSettings, create_app, sample_latency_ms, _rng  # noqa: E402
+
+
+def _chat(client: TestClient, prompt: str, model: str = "mock-gpt", **extra):
+    return client.post("/v1/chat/completions", json={"model": model, "messages": [{"role": "user", "content": prompt}], **extra})
+
+
+def test_answers_are_deterministic_and_follow_answer_key():
+    key = {f"q{i}": "ABCD"[i % 4] for i in range(200)}
+    client = TestClient(create_app(MockSettings(seed=7, answer_key=key, accuracy=0.5)))
+    again = TestClient(create_app(MockSettings(seed=7, answer_key=key, accuracy=0.5)))
+
+    answers = [_chat(client, f"Question: q{i}\nAnswer:").json()["choices"][0]["message"]["content"] for i in range(200)]
+    assert answers == [_chat(again, f"Question: q{i}\nAnswer:").json()["choices"][0]["message"]["content"] for i in range(200)]
+    correct = sum(a == f"The answer is {key[f'q{i}']}." for i, a in enumerate(answers))
+    assert 70 < correct < 130
+
+    body = _chat(client, "unknown question", max_tokens=2).json()
+    assert body["choices"][0]["finish_reason"] == "length"
+    assert body["usage"]["completion_tokens"] == 2
+
+
+def test_fault_injection_and_throughput_cap():
+    client = TestClient(create_app(MockSettings(rate_limit_rate=1.0)))
+    resp = _chat(client, "hi")
+    assert resp.status_code == 429 and resp.headers["retry-after"] == "1"
+
+    # 错误按第几次请求决定：同一提示词重试时结果会变化
+    client = TestClient(create_app(MockSettings(seed=1, error_rate=0.5)))
+    codes = [_chat(client, "same prompt").status_code for _ in range(20)]
+    assert set(codes) == {200, 500}
+    assert client.get("/stats").json()["status"] == {"200": codes.count(200), "500": codes.count(500)}
+
+    client = TestClient(create_app(MockSettings(max_rps=3)))
+    codes = [_chat(client, f"p{i}").status_code for i in range(6)]
+    assert codes.count(200) == 3 and codes.count(429) == 3
+
+    # 低于 1 rps 时首个请求可以通过，之后按速率放行
+    client = TestClient(create_app(MockSettings(max_rps=0.5)))
+    assert [_chat(client, f"p{i}").status_code for i in range(2)] == [200, 429]
+
+
+def test_latency_distributions():
+    rng = _rng(0)
+    assert sample_latency_ms("fixed:120", rng) == 120
+    assert all(100 <= sample_latency_ms("uniform:100,200", rng) <= 200 for _ in range(50))
+    assert sample_latency_ms("normal:0,1", rng) >= 0
+
+
+def test_api_precheck_resolves_mock_endpoint(monkeypatch):
+    client = TestClient(create_app(MockSettings()))
+
+    def post(url, json=None, headers=None, timeout=None):
+        return client.post(url.replace("http://mock", ""), json=json, headers=headers)
+
+    monkeypatch.setattr(task_service.requests, "post", post)
+    model = LLMModel(name="mock", type="api", path="mock-gpt", base_url="http://mock/v1", api_key="x")
+    assert TaskService(None)._check_and_fix_api_url(model) == "http://mock/v1/chat/completions"
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlmodel import Session
+
+from app.models.llm_model import LLMModel
+from app.models.dataset import DatasetMeta, DatasetConfig
+from app.models.task import EvaluationTask
+from app.models.result import EvaluationResult
+from app.services.trend_service import lttb_indices
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    x = np.arange(1000, dtype=float)
+    y = np.full(1000, 50.0)
+    y[637] = 5.0  # 一次回归
+    keep = lttb_indices(x, y, 50)
+    assert len(keep) == 50
+    assert keep[0] == 0 and keep[-1] == 999
+    assert 637 in keep
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_trend_endpoint(admin_client, db_engine):
+    with Session(db_engine) as session:
+        meta = DatasetMeta(name="GSM8K", category="Math")
+        model, other = LLMModel(name="Qwen-7B", path="/m/q"), LLMModel(name="Llama-8B", path="/m/l")
+        session.add_all([meta, model, other])
+        session.commit()
+        cfg = DatasetConfig(meta_id=meta.id, config_name="gsm8k_gen", file_path="x")
+        session.add(cfg)
+        session.commit()
+
+        base = datetime(2026, 1, 1)
+        for day in range(30):
+            for m in (model, other):
+                # 不同方案的夜间任务也能连成一条曲线
+                task = EvaluationTask(model_id=m.id, scheme_id=day % 3 + 1, status="success",
+                                      datasets_list="[]", finished_at=base + timedelta(days=day))
+                session.add(task)
+                session.flush()
+                session.add(EvaluationResult(task_id=task.id, dataset_config_id=cfg.id, dataset_name="GSM8K",
+                                             metric_name="accuracy", score=float(day)))
+        # 失败任务不计入
+        failed = EvaluationTask(model_id=model.id, status="failed", datasets_list="[]", finished_at=base)
+        session.add(failed)
+        session.flush()
+        session.add(EvaluationResult(task_id=failed.id, dataset_config_id=cfg.id, dataset_name="GSM8K",
+                                     metric_name="accuracy", score=99.0))
+        session.commit()
+        model_id, cfg_id = model.id, cfg.id
+
+    resp = admin_client.get(f"/api/v1/models/{model_id}/trend",
+                            params={"config_id": cfg_id, "metric": "accuracy", "max_points": 10})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["total_points"] == 30 and data["downsampled"] is True
+    assert len(data["points"]) == 10
+    assert data["points"][0]["score"] == 0.0 and data["points"][-1]["score"] == 29.0
+    assert data["stats"]["best"] == 29.0 and data["stats"]["min"] == 0.0
+
+    resp = admin_client.get(f"/api/v1/models/{model_id}/trend", params={
+        "config_id": cfg_id, "metric": "accuracy", "start": "2026-01-21T00:00:00"})
+    assert [p["score"] for p in resp.json()["points"]] == [float(d) for d in range(20, 30)]
+
+    assert admin_client.get("/api/v1/models/999/trend", params={"config_id": cfg_id, "metric": "accuracy"}).status_code == 404
+
+
+def test_trend_best_for_lower_is_better_metric(admin_client, db_engine):
+    with Session(db_engine) as session:
+        meta = DatasetMeta(name="WikiText", category="Language")
+        model = LLMModel(name="Qwen-7B", path="/m/q")
+        session.add_all([meta, model])
+        session.commit()
+        cfg = DatasetConfig(meta_id=meta.id, config_name="wikitext_ppl", file_path="x")
+        session.add(cfg)
+        session.commit()
+        base = datetime(2026, 1, 1)
+        for day, ppl in enumerate([12.0, 8.5, 9.0, 15.0]):
+            task = EvaluationTask(model_id=model.id, status="success", datasets_list="[]",
+                                  finished_at=base + timedelta(days=day))
+            session.add(task)
+            session.flush()
+            session.add(EvaluationResult(task_id=task.id, dataset_config_id=cfg.id, dataset_name="WikiText",
+                                         metric_name="ppl", score=ppl))
+            if ppl == 8.5:
+                best_task_id = task.id
+        session.commit()
+        model_id, cfg_id = model.id, cfg.id
+
+    stats = admin_client.get(f"/api/v1/models/{model_id}/trend", params={"config_id": cfg_id, "metric": "ppl"}).json()["stats"]
+    assert stats["best"] == 8.5 and stats["best_task_id"] == best_task_id
@@ -0,0 +1,81 @@
+import logging
+
+import pytest
+from sqlmodel import Session
+
+from app.core import query_profiler
+from app.core.query_profiler import QueryBudgetExceeded, RequestQueryStats
+from app.models.llm_model import LLMModel
+from app.models.dataset import DatasetMeta, DatasetConfig
+from app.models.scheme import EvaluationScheme
+from app.models.task import EvaluationTask
+from app.models.result import EvaluationResult
+
+
+def _seed(session: Session, n_tasks: int):
+    scheme = EvaluationScheme(name="budget-scheme")
+    meta = DatasetMeta(name="MMLU", category="Knowledge")
+    session.add_all([scheme, meta])
+    session.commit()
+    cfg = DatasetConfig(meta_id=meta.id, config_name="mmlu_gen", file_path="/tmp/mmlu.jsonl")
+    session.add(cfg)
+    session.commit()
+    ids = []
+    for i in range(n_tasks):
+        model = LLMModel(name=f"model-{i}", path=f"/m/{i}")
+        session.add(model)
+        session.commit()
+        task = EvaluationTask(model_id=model.id, scheme_id=scheme.id, status="success", datasets_list="[]")
+        session.add(task)
+        session.commit()
+        session.add(EvaluationResult(task_id=task.id, dataset_config_id=cfg.id, dataset_name="MMLU",
+                                     metric_name="accuracy", score=50 + i))
+        session.commit()
+        ids.append(task.id)
+    return ids
+
+
+def test_endpoint_query_budgets(admin_client, db_session, query_budget):
+    ids = _seed(db_session, 8)
+
+    # 总数 + 当前页 (含模型/方案名) + 当前页得分聚合
+    with query_budget(3, "GET /tasks/"):
+        assert admin_client.get("/api/v1/tasks/", params={"page_size": 50}).status_code == 200
+    # 任务 + 画像
+    with query_budget(2, "GET /tasks/{id}"):
+        assert admin_client.get(f"/api/v1/tasks/{ids[0]}").status_code == 200
+    # 对比接口的语句数与任务数无关 (曾经逐个 session.get)
+    with query_budget(4, "POST /tasks/compare x2") as small:
+        admin_client.post("/api/v1/tasks/compare", json={"task_ids": ids[:2]})
+    with query_budget(small.count, "POST /tasks/compare x8"):
+        admin_client.post("/api/v1/tasks/compare", json={"task_ids": ids[3:]})
+
+
+def test_budget_failure_lists_statements(db_engine):
+    with pytest.raises(QueryBudgetExceeded, match="executed 2 queries \\(budget 1\\)"):
+        with query_profiler.assert_max_queries(db_engine, 1):
+            with Session(db_engine) as session:
+                session.get(EvaluationTask, 1)
+                session.get(LLMModel, 1)
+
+
+def test_request_stats_headers_and_slow_log(admin_client, db_session, query_budget, monkeypatch, caplog):
+    ids = _seed(db_session, 1)
+    monkeypatch.setattr(query_profiler, "SQL_PROFILE_HEADERS", True)
+    monkeypatch.setattr(query_profiler, "SLOW_QUERY_MS", 0)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.query_profiler"):
+        with query_budget(10) as counter:
+            resp = admin_client.get(f"/api/v1/tasks/{ids[0]}")
+    assert int(resp.headers["x-db-queries"]) == counter.count
+    # 慢查询日志带路由模板
+    assert "route=GET /api/v1/tasks/{task_id}" in caplog.text
+
+
+def test_repeated_statements_flagged():
+    stats = RequestQueryStats({"method": "GET"})
+    for _ in range(12):
+        stats.record("SELECT * FROM llm_models WHERE id = ?", 0.001)
+    stats.record("SELECT 1", 0.001)
+    assert stats.route == "GET unmatched"
+    assert stats.repeated(10) == [("SELECT * FROM llm_models WHERE id = ?", 12)]
@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+import stat
+import subprocess
+
+import psutil
+import pytest
+
+from app.services.resource_sampler import ResourceSampler
+from app.services.opencompass_runner import OpenCompassRunner
+
+# 父进程再拉起一个子进程，两者都分配一些内存后休眠
+TREE_SCRIPT = (
+    "import subprocess, sys, time\n"
+    "child = subprocess.Popen([sys.executable, '-c', 'import time; x = bytearray(30 * 2**20); time.sleep(1)'])\n"
+    "y = bytearray(20 * 2**20)\n"
+    "child.wait()\n"
+)
+
+
+def test_sampler_tracks_process_tree_and_alerts():
+    proc = subprocess.Popen([sys.executable, "-c", TREE_SCRIPT])
+    alerts = []
+    sampler = ResourceSampler(proc.pid, interval=0.05, thresholds={"rss_mb": 1, "sys_mem": None}, on_alert=alerts.append)
+    sampler.start()
+    proc.wait()
+    profile = sampler.stop()
+
+    assert profile["samples"] >= 3
+    assert profile["peaks"]["procs"] == 2
+    # 两个进程的 RSS 合计
+    assert profile["peaks"]["rss_mb"] >= 50
+    assert set(profile["series"]) == {"t", "cpu", "rss_mb", "fds", "threads", "procs", "sys_mem"}
+    # 越过阈值后只告警一次 (一直未回落)
+    assert len(profile["alerts"]) == 1 and alerts == profile["alerts"]
+    assert profile["alerts"][0]["metric"] == "rss_mb"
+
+
+def test_series_downsampling_keeps_peaks():
+    sampler = ResourceSampler(pid=0, max_points=4, thresholds={k: None for k in ("rss_mb", "cpu", "fds", "sys_mem")})
+    for i, rss in enumerate([10, 80, 20, 30, 15, 25]):
+        sampler._record({"t": float(i), "cpu": 0, "rss_mb": rss, "fds": 3, "threads": 1, "procs": 1, "sys_mem": 40})
+    # 第 5 个点时超过上限，前 5 个点合并为 3 个，之后继续追加
+    assert sampler.series["t"] == [0.0, 2.0, 4.0, 5.0]
+    assert sampler.series["rss_mb"] == [80, 30, 15, 25]
+    assert sampler.peaks["rss_mb"] == 80 and sampler.peaks["rss_mb_at"] == 1.0
+
+
+def test_sampler_survives_exited_children(monkeypatch):
+    class _Exited:
+        pid = 999999
+
+        def create_time(self):
+            raise psutil.NoSuchProcess(self.pid)
+
+    # 子进程在 children() 与 create_time() 之间退出
+    monkeypatch.setattr(psutil.Process, "children", lambda self, recursive=False: [_Exited()])
+    sampler = ResourceSampler(os.getpid(), thresholds={k: None for k in ("rss_mb", "cpu", "fds", "sys_mem")})
+    point = sampler.sample()
+    assert point["procs"] == 1
+
+    # 首次采样失败也不会结束采样线程
+    calls = []
+
+    def flaky_sample():
+        calls.append(1)
+        if len(calls) == 1:
+            raise psutil.NoSuchProcess(0)
+
+    monkeypatch.setattr(sampler, "sample", flaky_sample)
+    sampler.interval = 0.01
+    sampler.start()
+    time.sleep(0.2)
+    sampler.stop()
+    assert len(calls) > 1
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fake opencompass is a shell script")
+def test_runner_reports_peak_memory_when_killed(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    fake = bin_dir / "opencompass"
+    fake.write_text(f"#!{sys.executable}\nimport os, signal\nx = bytearray(20 * 2**20)\nimport time; time.sleep(0.3)\nos.kill(os.getpid(), signal.SIGKILL)\n")
+    fake.chmod(fake.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setattr("app.services.resource_sampler.RESOURCE_SAMPLE_INTERVAL", 0.05)
+
+    runner = OpenCompassRunner(workspace=str(tmp_path / "ws"))
+    with pytest.raises(RuntimeError, match="possibly out of memory"):
+        runner.run(str(tmp_path / "cfg.py"))
+    assert runner.resource_profile["peaks"]["rss_mb"] >= 20
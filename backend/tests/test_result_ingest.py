@@ -0,0 +1,63 @@
+import os
+import json
+import time
+
+from app.models.dataset import DatasetMeta, DatasetConfig
+from app.services.result_ingest import load_results
+
+
+def _configs():
+    gsm = DatasetMeta(id=1, name="GSM8K", category="Math")
+    mmlu = DatasetMeta(id=2, name="MMLU", category="Knowledge")
+    return [
+        DatasetConfig(id=10, meta_id=1, meta=gsm, config_name="gsm8k_gen", file_path="x"),
+        DatasetConfig(id=11, meta_id=2, meta=mmlu, config_name="mmlu_gen", file_path="x"),
+    ]
+
+
+def _write(path: str, content: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def test_summary_csv_picks_model_column_and_exact_abbr(tmp_path):
+    _write(str(tmp_path / "20260101_000000" / "summary" / "summary_20260101_000000.csv"), "\n".join([
+        "dataset,version,metric,mode,Qwen-7B,Llama-8B",
+        "gsm8k_gen,1d7fe4,accuracy,gen,55.5,48.0",
+        "mmlu_gen,4d595a,accuracy,gen,-,61.0",
+        # 只是名字相近的数据集不再被模糊匹配
+        "gsm8k_gen_v2,1d7fe4,accuracy,gen,70.0,71.0",
+    ]))
+
+    records = load_results(str(tmp_path), 7, _configs(), model_abbr="Qwen-7B")
+    assert len(records) == 1
+    (r,) = records
+    assert (r["task_id"], r["dataset_config_id"], r["dataset_name"], r["metric_name"], r["score"]) == \
+        (7, 10, "GSM8K", "accuracy", 55.5)
+    assert r["details"]["Llama-8B"] == "48.0"
+
+
+def test_results_json_preferred_and_latest_run_wins(tmp_path):
+    old_run = tmp_path / "20260101_000000"
+    _write(str(old_run / "summary" / "summary_20260101_000000.csv"),
+           "dataset,version,metric,mode,Qwen-7B\nmmlu_gen,4d595a,accuracy,gen,30.0")
+    past = time.time() - 60
+    os.utime(old_run, (past, past))
+
+    new_run = tmp_path / "20260102_000000"
+    _write(str(new_run / "summary" / "summary_20260102_000000.csv"),
+           "dataset,version,metric,mode,Qwen-7B\nmmlu_gen,4d595a,accuracy,gen,99.0")
+    _write(str(new_run / "results" / "Qwen-7B" / "mmlu_gen.json"),
+           json.dumps({"accuracy": 62.5, "details": {"0": {"correct": True}}}))
+    _write(str(new_run / "results" / "Qwen-7B" / "gsm8k_gen.json"),
+           json.dumps({"accuracy": 40.0, "ppl": 3.2}))
+
+    records = {(r["dataset_config_id"], r["metric_name"]): r for r in load_results(str(tmp_path), 1, _configs(), "Qwen-7B")}
+    assert {k: r["score"] for k, r in records.items()} == {
+        (11, "accuracy"): 62.5,
+        (10, "accuracy"): 40.0,
+        (10, "ppl"): 3.2,
+    }
+    # 逐样本 details 不写入结果表
+    assert "details" not in records[(11, "accuracy")]["details"]
@@ -0,0 +1,88 @@
+import os
+import json
+from sqlmodel import Session
+
+from app.models.task import EvaluationTask
+from app.models.dataset import DatasetMeta, DatasetConfig
+from app.services.sample_store import SampleStore, diff_samples, task_workspace, output_files
+from app.services.task_service import TaskService
+
+
+def _write_run(task_id: int, abbr: str, preds, correct):
+    """
+    模拟 OpenCompass 的输出目录: {ts}/predictions/{model}/{abbr}_N.json 与 {ts}/results/{model}/{abbr}.json
+    """
+    run_dir = os.path.join(task_workspace(task_id), "20260101_000000")
+    os.makedirs(os.path.join(run_dir, "predictions", "m"), exist_ok=True)
+    os.makedirs(os.path.join(run_dir, "results", "m"), exist_ok=True)
+
+    half = len(preds) // 2
+    for shard, idxs in enumerate([range(0, half), range(half, len(preds))]):
+        shard_data = {str(i): {"origin_prompt": f"q{i}", "prediction": preds[i], "gold": "A"} for i in idxs}
+        with open(os.path.join(run_dir, "predictions", "m", f"{abbr}_{shard}.json"), "w") as f:
+            json.dump(shard_data, f)
+
+    details = {str(i): {"pred": preds[i], "answer": "A", "correct": ok} for i, ok in enumerate(correct)}
+    with open(os.path.join(run_dir, "results", "m", f"{abbr}.json"), "w") as f:
+        json.dump({"accuracy": 50.0, "details": details}, f)
+
+
+def test_ingest_and_diff(admin_client, db_session: Session, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    meta = DatasetMeta(name="MMLU", category="Knowledge")
+    db_session.add(meta)
+    db_session.commit()
+    cfg = DatasetConfig(meta_id=meta.id, config_name="mmlu_gen", file_path="/tmp/mmlu.jsonl")
+    task_a = EvaluationTask(model_id=1, status="success", datasets_list="[]")
+    task_b = EvaluationTask(model_id=2, status="success", datasets_list="[]")
+    db_session.add_all([cfg, task_a, task_b])
+    db_session.commit()
+
+    _write_run(task_a.id, "mmlu_gen", ["A", "A", "B", "A"], [True, True, False, True])
+    _write_run(task_b.id, "mmlu_gen", ["A", "C", "A", "A"], [True, False, True, True])
+
+    assert SampleStore(task_a.id).ingest([cfg]) == 4
+    assert SampleStore(task_b.id).ingest([cfg]) == 4
+    assert SampleStore(task_a.id).config_ids() == [cfg.id]
+
+    regressed = diff_samples(task_a.id, task_b.id, cfg.id, "regressed")
+    assert regressed["compared"] == 4
+    assert [r["sample_id"] for r in regressed["items"]] == [1]
+    assert regressed["items"][0]["base_prediction"] == "A"
+    assert regressed["items"][0]["target_prediction"] == "C"
+
+    res = admin_client.get("/api/v1/tasks/samples/diff", params={
+        "base_task_id": task_a.id, "target_task_id": task_b.id, "config_id": cfg.id, "kind": "improved"
+    })
+    assert res.status_code == 200
+    assert [r["sample_id"] for r in res.json()["items"]] == [2]
+
+    res = admin_client.get(f"/api/v1/tasks/{task_a.id}/samples", params={"config_id": cfg.id, "correct": False})
+    assert res.json()["total"] == 1
+    assert res.json()["items"][0]["reference"] == "A"
+
+    # 不存在的配置：下推过滤后为空
+    assert SampleStore(task_a.id).page(cfg.id + 100)["total"] == 0
+
+
+def test_shards_do_not_match_other_configs(tmp_path, db_session: Session, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    task = EvaluationTask(model_id=1, status="success", datasets_list="[]")
+    db_session.add(task)
+    db_session.commit()
+    cfg = DatasetConfig(id=1, meta_id=1, config_name="mmlu", file_path="")
+    other = DatasetConfig(id=2, meta_id=1, config_name="mmlu_2shot", file_path="")
+
+    _write_run(task.id, "mmlu", ["A", "B"], [True, False])
+    _write_run(task.id, "mmlu_2shot", ["C", "C", "C"], [False, False, False])
+    pred_dir = os.path.join(task_workspace(task.id), "20260101_000000", "predictions", "m")
+    assert [os.path.basename(p) for p in output_files(pred_dir, "mmlu")] == ["mmlu_0.json", "mmlu_1.json"]
+
+    store = SampleStore(task.id)
+    assert store.ingest([cfg, other]) == 5
+    assert store.page(cfg.id)["total"] == 2
+
+    # 删除任务时一并删除逐样本文件
+    assert TaskService(db_session).delete_task(task.id)
+    assert not store.exists()
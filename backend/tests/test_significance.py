@@ -0,0 +1,120 @@
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlmodel import Session
+
+from app.models.llm_model import LLMModel
+from app.models.dataset import DatasetMeta, DatasetConfig
+from app.models.scheme import EvaluationScheme
+from app.models.task import EvaluationTask
+from app.models.result import EvaluationResult
+from app.services.sample_store import SAMPLE_SCHEMA, samples_path
+from app.services import significance
+from app.services.significance import paired_significance, pair_cache
+from app.services.task_service import TaskService
+
+
+def test_paired_bootstrap_matches_naive_resampling():
+    rng = np.random.default_rng(7)
+    n = 150
+    base = rng.random(n) < 0.6
+    target = np.where(rng.random(n) < 0.15, ~base, base)
+
+    counts = pd.DataFrame({
+        "dataset_config_id": [1], "n": [n],
+        "base_correct": [base.sum()], "target_correct": [target.sum()],
+        "n10": [(base & ~target).sum()], "n01": [(~base & target).sum()],
+    })
+    stats = paired_significance(counts, resamples=20000, seed=1).iloc[0]
+
+    # 朴素实现：逐样本下标重采样
+    idx = rng.integers(0, n, size=(20000, n))
+    deltas = (target[idx].mean(axis=1) - base[idx].mean(axis=1)) * 100
+    low, high = np.percentile(deltas, [2.5, 97.5])
+    naive_p = min(1.0, 2 * min((deltas <= 0).mean(), (deltas >= 0).mean()))
+
+    assert abs(stats["diff_ci_low"] - low) <= 1.0
+    assert abs(stats["diff_ci_high"] - high) <= 1.0
+    assert abs(stats["p_bootstrap"] - naive_p) <= 0.03
+    assert stats["diff"] == (target.sum() - base.sum()) / n * 100
+
+
+def test_rows_are_bucketed_by_size(monkeypatch):
+    n = np.array([40, 50000, 37, 70, 33000])
+    counts = pd.DataFrame({
+        "dataset_config_id": range(len(n)), "n": n,
+        "base_correct": n // 2, "target_correct": n // 2 + n // 10,
+        "n10": n // 20, "n01": n // 20 + n // 10,
+    })
+    widths = []
+    block = significance._paired_bootstrap_block
+
+    def record(n, *args):
+        widths.append(sorted(n.tolist()))
+        return block(n, *args)
+
+    monkeypatch.setattr(significance, "_paired_bootstrap_block", record)
+    stats = paired_significance(counts, resamples=2000, seed=1)
+
+    # 大数据集单独成桶，小数据集的分布矩阵不会按最大样本数分配
+    assert sorted(widths) == [[37, 40], [70], [33000, 50000]]
+    assert list(stats["dataset_config_id"]) == list(range(len(n)))
+    for row in stats.itertuples():
+        assert row.diff_ci_low <= row.diff <= row.diff_ci_high
+        assert row.ci_low <= row.accuracy <= row.ci_high
+
+
+def _write_samples(task_id: int, config_id: int, correct):
+    os.makedirs(os.path.dirname(samples_path(task_id)), exist_ok=True)
+    table = pa.table({
+        "dataset_config_id": [config_id] * len(correct),
+        "sample_id": list(range(len(correct))),
+        "prediction": ["A" if c else "B" for c in correct],
+        "reference": ["A"] * len(correct),
+        "correct": correct,
+        "latency_ms": [None] * len(correct),
+    }, schema=SAMPLE_SCHEMA)
+    pq.write_table(table, samples_path(task_id))
+
+
+def test_compare_reports_significance(db_session: Session, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pair_cache.clear()
+
+    scheme = EvaluationScheme(name="sig-scheme")
+    meta = DatasetMeta(name="BoolQ", category="Reasoning")
+    models = [LLMModel(name="A", path="/m/a"), LLMModel(name="B", path="/m/b")]
+    db_session.add_all([scheme, meta, *models])
+    db_session.commit()
+    cfg = DatasetConfig(meta_id=meta.id, config_name="boolq_gen", file_path="/tmp/boolq.jsonl")
+    tasks = [EvaluationTask(model_id=m.id, scheme_id=scheme.id, status="success", datasets_list="[]") for m in models]
+    db_session.add_all([cfg, *tasks])
+    db_session.commit()
+    a, b = tasks
+    db_session.add_all([
+        EvaluationResult(task_id=a.id, dataset_config_id=cfg.id, dataset_name="BoolQ", metric_name="accuracy", score=50.0),
+        EvaluationResult(task_id=b.id, dataset_config_id=cfg.id, dataset_name="BoolQ", metric_name="accuracy", score=80.0),
+    ])
+    db_session.commit()
+
+    # 200 题: B 在 A 答错的 60 题上全部答对，没有退步
+    base = [i % 2 == 0 for i in range(200)]
+    target = [c or i % 10 < 6 for i, c in enumerate(base)]
+    _write_samples(a.id, cfg.id, base)
+    _write_samples(b.id, cfg.id, target)
+
+    data = TaskService(db_session).compare_tasks([a.id, b.id])
+    (pair,) = data["significance"]
+    assert (pair["base_task_id"], pair["task_id"]) == (a.id, b.id)
+    (stats,) = pair["datasets"]
+    assert stats["dataset"] == "BoolQ" and stats["n"] == 200
+    assert stats["n10"] == 0 and stats["n01"] == 60
+    assert stats["diff"] == 30.0
+    assert stats["significant"] is True and stats["p_mcnemar"] < 1e-6
+    assert stats["diff_ci_low"] > 0
+    assert data["table_data"][0][f"sig_{b.id}"] is True
+
+    # 同一任务对第二次对比命中缓存
+    assert TaskService(db_session).compare_tasks([a.id, b.id])["significance"] == data["significance"]
@@ -0,0 +1,92 @@
+import asyncio
+
+from app.core.task_events import task_event_hub
+from app.services import status_stream
+from app.services.status_stream import task_status_events
+from app.utils import fast_json
+
+
+def _events(chunks):
+    out = []
+    for chunk in chunks:
+        if chunk.startswith(":"):
+            continue
+        lines = dict(line.split(": ", 1) for line in chunk.strip("\n").split("\n"))
+        out.append((lines["event"], fast_json.loads(lines["data"])))
+    return out
+
+
+def test_stream_fans_out_filtered_events(monkeypatch):
+    queries = []
+
+    def load_statuses(ids):
+        queries.append(ids)
+        return [{"task_id": i, "status": "running", "progress": 10, "error_msg": None} for i in ids]
+
+    async def scenario():
+        monkeypatch.setattr(task_event_hub, "_ensure_running", lambda: None)
+        monkeypatch.setattr(task_event_hub, "available", True)
+        stream = task_status_events([1, 2], load_statuses)
+        chunks = [await stream.__anext__()]
+        task_event_hub.dispatch({"task_id": 3, "status": "running", "progress": 50})
+        task_event_hub.dispatch({"task_id": 2, "status": "running", "progress": 50})
+        task_event_hub.dispatch({"task_id": 1, "status": "success", "progress": 100})
+        chunks.append(await asyncio.wait_for(stream.__anext__(), timeout=5))
+        chunks.append(await asyncio.wait_for(stream.__anext__(), timeout=5))
+        await stream.aclose()
+        return chunks
+
+    events = _events(asyncio.run(scenario()))
+    assert events[0] == ("snapshot", {"tasks": [
+        {"task_id": 1, "status": "running", "progress": 10, "error_msg": None},
+        {"task_id": 2, "status": "running", "progress": 10, "error_msg": None},
+    ]})
+    # 只收到订阅的任务，且与发布顺序无关地逐个送达
+    assert sorted((e[1]["task_id"], e[1]["status"]) for e in events[1:]) == [(1, "success"), (2, "running")]
+    # 只在建立连接时查询一次
+    assert queries == [[1, 2]]
+    assert task_event_hub.subscriber_count == 0
+
+
+def test_stream_polls_changes_when_redis_offline(monkeypatch):
+    states = {5: ("running", 10)}
+
+    def load_statuses(ids):
+        if ids is None:
+            ids = [tid for tid, (status, _) in states.items() if status in ("pending", "running")]
+        return [{"task_id": i, "status": states[i][0], "progress": states[i][1], "error_msg": None} for i in ids]
+
+    async def scenario():
+        monkeypatch.setattr(task_event_hub, "_ensure_running", lambda: None)
+        monkeypatch.setattr(task_event_hub, "available", False)
+        monkeypatch.setattr(status_stream, "STATUS_POLL_FALLBACK", 0.05)
+        stream = task_status_events(None, load_statuses)
+        chunks = [await stream.__anext__()]
+        # 任务结束后不再出现在未结束列表中，仍能推送其最终状态
+        states[5] = ("success", 100)
+        chunks.append(await asyncio.wait_for(stream.__anext__(), timeout=5))
+        await stream.aclose()
+        return chunks
+
+    events = _events(asyncio.run(scenario()))
+    assert events[0][1]["tasks"][0]["task_id"] == 5
+    assert events[1] == ("status", {"task_id": 5, "status": "success", "progress": 100, "error_msg": None})
+
+
+def test_stream_endpoint_validates_ids(admin_client):
+    # 静态路由不能被 /{task_id} 截获 (否则这里会是 422)
+    assert admin_client.get("/api/v1/tasks/stream", params={"task_ids": "1,x"}).status_code == 400
+    too_many = ",".join(str(i) for i in range(status_stream.MAX_STREAM_TASK_IDS + 1))
+    assert admin_client.get("/api/v1/tasks/stream", params={"task_ids": too_many}).status_code == 400
+
+
+def test_create_task_publishes_pending_event(admin_client, monkeypatch):
+    from app.api.v1 import tasks as tasks_api
+
+    published = []
+    monkeypatch.setattr(tasks_api, "publish_task_event", lambda *args, **kw: published.append(args))
+    monkeypatch.setattr(tasks_api.run_evaluation_task, "delay", lambda task_id: None)
+
+    resp = admin_client.post("/api/v1/tasks/", json={"model_id": 1, "config_ids": []})
+    assert resp.status_code == 200
+    assert published == [(resp.json()["id"], "pending", 0)]
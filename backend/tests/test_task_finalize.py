@@ -0,0 +1,63 @@
+import os
+import json
+from sqlmodel import Session, select
+
+from app.models.llm_model import LLMModel
+from app.models.dataset import DatasetMeta, DatasetConfig
+from app.models.task import EvaluationTask
+from app.models.result import EvaluationResult
+from app.models.links import TaskDatasetLink
+from app.models.leaderboard import LeaderboardEntry
+from app.services.opencompass_runner import OpenCompassRunner
+from app.services.task_service import TaskService
+
+SUBJECTS = [f"mmlu_subject_{i}" for i in range(57)]
+
+
+def _fake_run(self, config_path, log_file_name="output.log"):
+    """
+    模拟 OpenCompass：在 workspace 下写出 summary CSV
+    """
+    summary_dir = os.path.join(self.workspace, "20260101_000000", "summary")
+    os.makedirs(summary_dir, exist_ok=True)
+    lines = ["dataset,version,metric,mode,Qwen-7B"]
+    lines += [f"{abbr},abc123,accuracy,gen,{50 + i % 10}" for i, abbr in enumerate(SUBJECTS)]
+    with open(os.path.join(summary_dir, "summary_20260101_000000.csv"), "w") as f:
+        f.write("\n".join(lines))
+
+
+def test_run_persists_results_in_bulk_and_deletes_by_set(db_engine, db_session: Session, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(OpenCompassRunner, "generate_config", lambda self, task_id, model, configs: "cfg.py")
+    monkeypatch.setattr(OpenCompassRunner, "run", _fake_run)
+
+    model = LLMModel(name="Qwen-7B", path="/m/qwen")
+    meta = DatasetMeta(name="MMLU", category="Knowledge")
+    db_session.add_all([model, meta])
+    db_session.commit()
+    configs = [DatasetConfig(meta_id=meta.id, config_name=abbr, file_path="/tmp/mmlu.jsonl") for abbr in SUBJECTS]
+    db_session.add_all(configs)
+    db_session.commit()
+    task = EvaluationTask(model_id=model.id, datasets_list=json.dumps([c.id for c in configs]))
+    db_session.add(task)
+    db_session.commit()
+    db_session.add_all([TaskDatasetLink(task_id=task.id, dataset_config_id=c.id) for c in configs])
+    db_session.commit()
+
+    with Session(db_engine) as session:
+        TaskService(session).run_evaluation_logic(task.id)
+
+    db_session.expire_all()
+    task = db_session.get(EvaluationTask, task.id)
+    assert task.status == "success", task.error_msg
+    results = db_session.exec(select(EvaluationResult).where(EvaluationResult.task_id == task.id)).all()
+    assert len(results) == 57
+    # 每个子集精确映射到自己的配置
+    by_config = {c.id: c.config_name for c in configs}
+    assert all(by_config[r.dataset_config_id] == r.details["dataset"] for r in results)
+    assert len(db_session.exec(select(LeaderboardEntry)).all()) == 57
+
+    assert TaskService(db_session).delete_task(task.id)
+    assert db_session.exec(select(EvaluationResult)).all() == []
+    assert db_session.exec(select(TaskDatasetLink)).all() == []
+    assert db_session.exec(select(LeaderboardEntry)).all() == []
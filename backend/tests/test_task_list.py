@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+from sqlmodel import Session
+
+from app.models.llm_model import LLMModel
+from app.models.task import EvaluationTask
+from app.models.result import EvaluationResult
+from app.models.dataset import DatasetMeta, DatasetConfig
+
+
+def _seed(session: Session):
+    model = LLMModel(name="Qwen-7B", path="/models/qwen")
+    meta = DatasetMeta(name="MMLU", category="Knowledge")
+    session.add(model)
+    session.add(meta)
+    session.commit()
+    config = DatasetConfig(meta_id=meta.id, config_name="mmlu_gen", file_path="/tmp/mmlu.jsonl")
+    session.add(config)
+    session.commit()
+
+    start = datetime(2026, 1, 1)
+    for i in range(5):
+        task = EvaluationTask(
+            model_id=model.id,
+            status="success" if i % 2 == 0 else "failed",
+            progress=100,
+            datasets_list=f"[{config.id}]",
+            result_summary='{"radar": [], "table": []}',
+            created_at=start + timedelta(days=i),
+            finished_at=start + timedelta(days=i, seconds=30),
+        )
+        session.add(task)
+        session.commit()
+        session.add(EvaluationResult(task_id=task.id, dataset_config_id=config.id, dataset_name="MMLU", metric_name="accuracy", score=0.5 + i / 100))
+        session.add(EvaluationResult(task_id=task.id, dataset_config_id=config.id, dataset_name="MMLU", metric_name="ppl", score=12.0))
+    session.commit()
+
+
+def test_task_list_is_lean_and_keyset_paginated(admin_client, db_session: Session):
+    _seed(db_session)
+
+    res = admin_client.get("/api/v1/tasks/", params={"page_size": 2})
+    assert res.status_code == 200
+    data = res.json()
+    assert data["total"] == 5
+    first = data["items"][0]
+    assert "result_summary" not in first
+    assert first["id"] == 5
+    assert first["model_name"] == "Qwen-7B"
+    assert first["duration_seconds"] == 30.0
+    # ppl 指标不计入成绩概览，0~1 分数换算为百分制
+    assert first["score"] == 54.0
+
+    res = admin_client.get("/api/v1/tasks/", params={"page_size": 2, "cursor": data["next_cursor"], "with_total": False})
+    assert [t["id"] for t in res.json()["items"]] == [3, 2]
+    assert res.json()["total"] is None
+
+
+def test_task_list_filters(admin_client, db_session: Session):
+    _seed(db_session)
+
+    res = admin_client.get("/api/v1/tasks/", params={"status": "success"}).json()
+    assert [t["id"] for t in res["items"]] == [5, 3, 1]
+
+    res = admin_client.get("/api/v1/tasks/", params={"created_from": "2026-01-02T00:00:00", "created_to": "2026-01-03T12:00:00"}).json()
+    assert [t["id"] for t in res["items"]] == [3, 2]
+
+    # 详情接口仍返回完整摘要
+    assert admin_client.get("/api/v1/tasks/5").json()["result_summary"] is not None
@@ -0,0 +1,143 @@
+import os
+import json
+import time
+from datetime import datetime
+
+from prometheus_client import REGISTRY
+from sqlmodel import Session
+
+from app.models.llm_model import LLMModel
+from app.models.dataset import DatasetMeta, DatasetConfig
+from app.models.task import EvaluationTask
+from app.models.scheme import EvaluationScheme
+from app.models.links import TaskDatasetLink
+from app.services.opencompass_runner import OpenCompassRunner
+from app.services.task_service import TaskService
+from app.services import task_service
+from app.services.task_timing import StageTimer, opencompass_timings
+
+
+def _touch(path: str, mtime: float, content: str = "{}"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+    os.utime(path, (mtime, mtime))
+
+
+def test_timings_from_output_files_and_logs(tmp_path):
+    started = time.time() - 100
+    run_ts = int(started) + 3
+    run_dir = tmp_path / datetime.fromtimestamp(run_ts).strftime("%Y%m%d_%H%M%S")
+    configs = [DatasetConfig(config_name="mmlu_gen", file_path=""), DatasetConfig(config_name="gsm8k_gen", file_path="")]
+
+    # --debug 顺序执行：gsm8k 分片输出，按完成时刻推算
+    _touch(str(run_dir / "predictions" / "Qwen" / "mmlu_gen.json"), run_ts + 10)
+    _touch(str(run_dir / "predictions" / "Qwen" / "gsm8k_gen_0.json"), run_ts + 20)
+    _touch(str(run_dir / "predictions" / "Qwen" / "gsm8k_gen_1.json"), run_ts + 30)
+    _touch(str(run_dir / "results" / "Qwen" / "mmlu_gen.json"), run_ts + 35)
+    _touch(str(run_dir / "results" / "Qwen" / "gsm8k_gen.json"), run_ts + 37)
+    # 有任务日志时优先使用日志首尾时间戳
+    fmt = "%m/%d %H:%M:%S"
+    log = (
+        f"{datetime.fromtimestamp(run_ts + 31).strftime(fmt)} - OpenCompass - INFO - Task start\n"
+        "progress...\n"
+        f"{datetime.fromtimestamp(run_ts + 35).strftime(fmt)} - OpenCompass - INFO - Task done\n"
+    )
+    _touch(str(run_dir / "logs" / "eval" / "Qwen" / "mmlu_gen.out"), run_ts + 35, log)
+
+    out = opencompass_timings(str(tmp_path), configs, "Qwen", started, run_ts + 40)
+    assert out["subprocess_startup"] == round(run_ts - started, 3)
+    assert out["datasets"]["mmlu_gen"] == {"inference": 10.0, "evaluation": 4.0}
+    assert out["datasets"]["gsm8k_gen"] == {"inference": 20.0, "evaluation": 7.0}
+
+    # 其他配置的文件 (mmlu_gen_2shot) 不会被当作 mmlu_gen 的分片
+    _touch(str(run_dir / "predictions" / "Qwen" / "mmlu_gen_2shot.json"), run_ts + 38)
+    assert opencompass_timings(str(tmp_path), configs, "Qwen", started, run_ts + 40)["datasets"]["mmlu_gen"]["inference"] == 10.0
+
+    # 启动前的旧运行目录不计入
+    assert opencompass_timings(str(tmp_path), configs, "Qwen", run_ts + 50, run_ts + 60) == {}
+
+
+def _fake_run(self, config_path, log_file_name="output.log"):
+    run_dir = os.path.join(self.workspace, datetime.now().strftime("%Y%m%d_%H%M%S"))
+    _touch(os.path.join(run_dir, "predictions", "Qwen-7B", "mmlu_gen.json"), time.time(),
+           '{"0": {"origin_prompt": "q0", "prediction": "A"}, "1": {"origin_prompt": "q1", "prediction": "B"}}')
+    _touch(os.path.join(run_dir, "results", "Qwen-7B", "mmlu_gen.json"), time.time(), '{"accuracy": 60.0}')
+
+
+def test_timings_persisted_and_exposed(admin_client, db_engine, db_session: Session, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(OpenCompassRunner, "generate_config", lambda self, task_id, model, configs: "cfg.py")
+    monkeypatch.setattr(OpenCompassRunner, "run", _fake_run)
+
+    scheme = EvaluationScheme(name="timing-scheme")
+    model = LLMModel(name="Qwen-7B", path="/m/qwen")
+    meta = DatasetMeta(name="MMLU", category="Knowledge")
+    db_session.add_all([scheme, model, meta])
+    db_session.commit()
+    cfg = DatasetConfig(meta_id=meta.id, config_name="mmlu_gen", file_path="/tmp/mmlu.jsonl")
+    db_session.add(cfg)
+    db_session.commit()
+    task = EvaluationTask(model_id=model.id, scheme_id=scheme.id, datasets_list=json.dumps([cfg.id]))
+    db_session.add(task)
+    db_session.commit()
+    db_session.add(TaskDatasetLink(task_id=task.id, dataset_config_id=cfg.id))
+    db_session.commit()
+
+    with Session(db_engine) as session:
+        TaskService(session).run_evaluation_logic(task.id)
+
+    resp = admin_client.get(f"/api/v1/tasks/{task.id}")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["status"] == "success", body["error_msg"]
+    stages = body["timings"]["stages"]
+    for stage in ("workspace_setup", "config_generation", "subprocess_startup",
+                  "inference", "evaluation", "opencompass_other", "parsing", "persistence"):
+        assert stage in stages
+    # 子进程的细分阶段互不重叠，不再另记一份整体耗时
+    assert "opencompass" not in stages
+    assert body["timings"]["datasets"][0]["dataset_config_id"] == cfg.id
+    assert body["timings"]["datasets"][0]["dataset"] == "MMLU"
+    # 吞吐画像：样本数来自逐样本抽取，本地路径不存在时没有 token 统计
+    throughput = body["throughput"]
+    assert throughput["datasets"][0]["samples"] == 2
+    assert throughput["total"]["samples"] == 2
+    assert throughput["token_source"] is None
+
+    # 未运行的任务没有耗时画像
+    other = EvaluationTask(model_id=model.id, scheme_id=scheme.id, status="success", datasets_list="[]")
+    db_session.add(other)
+    db_session.commit()
+    compare = admin_client.post("/api/v1/tasks/compare", json={"task_ids": [task.id, other.id]}).json()
+    assert compare["models"][0]["timings"] == body["timings"]
+    assert compare["models"][1]["timings"] is None
+
+    assert TaskService(db_session).delete_task(task.id)
+
+
+def test_opencompass_stages_sum_to_subprocess_time(db_session: Session, monkeypatch):
+    configs = [DatasetConfig(id=1, config_name="mmlu_gen", file_path=""), DatasetConfig(id=2, config_name="gsm8k_gen", file_path="")]
+    monkeypatch.setattr(task_service, "opencompass_timings", lambda *args: {
+        "subprocess_startup": 3.0,
+        "datasets": {"mmlu_gen": {"inference": 10.0, "evaluation": 4.0}, "gsm8k_gen": {"inference": 20.0, "evaluation": None}},
+    })
+
+    def observed(stage):
+        return REGISTRY.get_sample_value("llm_eval_task_stage_duration_seconds_count", {"stage": stage}) or 0
+
+    before = observed("inference")
+    timer = StageTimer()
+    TaskService(db_session)._record_opencompass_timings(timer, "", configs, "Qwen", 0.0, 40.0)
+
+    assert timer.stages == {"subprocess_startup": 3.0, "inference": 30.0, "evaluation": 4.0, "opencompass_other": 3.0}
+    assert sum(timer.stages.values()) == 40.0
+    assert [d["config_name"] for d in timer.datasets] == ["mmlu_gen", "gsm8k_gen"]
+    # 阶段直方图每个任务只记一次
+    assert observed("inference") == before + 1
+
+    # 推算不出细分时整体记为一个阶段
+    monkeypatch.setattr(task_service, "opencompass_timings", lambda *args: None)
+    timer = StageTimer()
+    TaskService(db_session)._record_opencompass_timings(timer, "", configs, "Qwen", 0.0, 40.0)
+    assert timer.stages == {"opencompass": 40.0} and timer.datasets == []
@@ -0,0 +1,67 @@
+import os
+import json
+import time
+from datetime import datetime
+
+from app.models.llm_model import LLMModel
+from app.models.dataset import DatasetConfig
+from app.services.opencompass_runner import OpenCompassRunner
+from app.services.throughput import ThroughputProfiler, REQUEST_LOG
+
+
+def _write(path: str, content: str, mtime: float = None):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_api_profile_from_request_log(tmp_path):
+    started = time.time() - 100
+    run_ts = int(started) + 2
+    run_dir = tmp_path / datetime.fromtimestamp(run_ts).strftime("%Y%m%d_%H%M%S")
+    configs = [DatasetConfig(id=1, config_name="mmlu_gen", file_path=""), DatasetConfig(id=2, config_name="gsm8k_gen", file_path="")]
+    _write(str(run_dir / "predictions" / "gpt" / "mmlu_gen.json"), "{}", run_ts + 10)
+    _write(str(run_dir / "predictions" / "gpt" / "gsm8k_gen.json"), "{}", run_ts + 30)
+
+    # mmlu: 100 个成功请求 (10..109 ms)；gsm8k: 9 个成功 + 1 个 429
+    lines = [
+        {"ts": run_ts + 1 + i * 0.05, "latency_ms": 10 + i, "status": 200, "prompt_tokens": 50, "completion_tokens": 5}
+        for i in range(100)
+    ]
+    lines += [
+        {"ts": run_ts + 15 + i, "latency_ms": 1000, "status": 200 if i else 429, "prompt_tokens": 80, "completion_tokens": 40}
+        for i in range(10)
+    ]
+    _write(str(tmp_path / REQUEST_LOG), "\n".join(json.dumps(r) for r in lines) + "\n")
+
+    profiler = ThroughputProfiler(str(tmp_path), configs, "gpt", started)
+    profiler.observe(configs[0], {i: {} for i in range(100)})
+    profiler.observe(configs[1], {i: {} for i in range(10)})
+    profile = profiler.build([
+        {"dataset_config_id": 1, "inference": 10.0},
+        {"dataset_config_id": 2, "inference": 20.0},
+    ], run_cfg={"batch_size": 1})
+
+    assert profile["token_source"] == "usage"
+    mmlu, gsm = profile["datasets"]
+    assert mmlu["samples_per_s"] == 10.0
+    assert mmlu["prompt_tokens_per_s"] == 500.0 and mmlu["completion_tokens_per_s"] == 50.0
+    assert mmlu["latency_ms"]["count"] == 100 and mmlu["latency_ms"]["errors"] == 0
+    assert mmlu["latency_ms"]["p50"] == 59.5 and mmlu["latency_ms"]["p99"] == 108.0
+    assert gsm["latency_ms"]["errors"] == 1 and gsm["completion_tokens"] == 400
+    assert profile["total"]["samples"] == 110 and profile["total"]["seconds"] == 30.0
+
+
+def test_api_config_uses_request_profiler(tmp_path):
+    runner = OpenCompassRunner(workspace=str(tmp_path))
+    model = LLMModel(name="gpt", path="gpt-4o", type="api", base_url="http://localhost:8000/v1")
+    cfg = DatasetConfig(id=1, config_name="demo_gen", file_path=str(tmp_path / "demo.jsonl"))
+    config_path = runner.generate_config(1, model, [cfg])
+
+    with open(config_path, encoding="utf-8") as f:
+        assert "from request_profiler import ProfiledOpenAI as OpenAI" in f.read()
+    with open(tmp_path / "request_profiler.py", encoding="utf-8") as f:
+        compile(f.read(), "request_profiler.py", "exec")
+    assert runner.run_cfg["batch_size"] == 1
@@ -21,4 +21,8 @@ export function deleteModel(id) {
 // 4. 校验模型名称是否重复
 export function validateModelName(name) {
   return request.post(URL + '/validate/name', { name })
-}
\ No newline at end of file
+}
+// 5. 分数趋势: params = { config_id, metric, start?, end?, max_points? }
+export function getModelTrend(id, params) {
+  return request.get(URL + `/${id}/trend`, { params })
+}
@@ -31,4 +31,12 @@ export function downloadTaskReport(id) {
   return request.get(URL + `/${id}/download`, {
     responseType: 'blob' // 关键：指定响应类型为二进制流
   })
-}
\ No newline at end of file
+}
+// 流式导出: kind = results (原始结果) | compare (对比矩阵), format = csv | parquet
+// 例: exportTasks({ kind: 'compare', task_ids: '1,2,3', format: 'csv' })
+export function exportTasks(params) {
+  return request.get(URL + '/export', {
+    params,
+    responseType: 'blob'
+  })
+}
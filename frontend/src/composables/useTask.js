@@ -1,6 +1,7 @@
 // src/composables/useTask.js
-import { ref, reactive, onMounted, onUnmounted } from 'vue'
+import { ref, reactive, watch, onMounted, onUnmounted } from 'vue'
 import { getTasks } from '@/api/task'
+import { readEventStream } from '@/utils/sse'
 import { getModels } from '@/api/model'
 import { getDatasets } from '@/api/dataset'
 
@@ -20,7 +21,7 @@ export function useTaskData() {
   
   let pollingTimer = null
 
-  // 1. 获取任务列表 (轮询用)
+  // 1. 获取任务列表
   const fetchTasks = async () => {
     try {
       // 修改：传入分页参数
@@ -81,12 +82,52 @@ export function useTaskData() {
     }
   }
 
-  // 3. 启动轮询
-const startPolling = (interval = 3000) => {
-    // 先立即拉取一次
-    fetchTasks()
-    
-    // 启动定时器
+  // 3. 状态推送 (SSE)：服务端推送状态/进度变化，替代定时轮询
+  //    推送断开期间退化为轮询，并按退避间隔重连
+  let streamController = null
+  let reconnectTimer = null
+  let refreshTimer = null
+  let reconnectDelay = 1000
+  let pendingRefresh = false
+  let stopped = false
+
+  // 合并短时间内的多次刷新 (如批量创建任务)
+  const scheduleRefresh = () => {
+    if (isPollingPaused.value) {
+      pendingRefresh = true
+      return
+    }
+    if (refreshTimer) return
+    refreshTimer = setTimeout(() => {
+      refreshTimer = null
+      fetchTasks()
+    }, 500)
+  }
+
+  const applyStatus = (payload) => {
+    const row = taskList.value.find(t => t.id === payload.task_id)
+    if (!row) {
+      // 列表中没有的任务 (其他页面/用户新建，或首个事件已是 running)：在第一页时刷新一次
+      if (payload.status !== 'deleted' && pagination.currentPage === 1) scheduleRefresh()
+      return
+    }
+    if (payload.status === 'deleted') {
+      scheduleRefresh()
+      return
+    }
+    if (isPollingPaused.value) {
+      pendingRefresh = true
+      return
+    }
+    row.status = payload.status
+    if (payload.progress != null) row.progress = payload.progress
+    if (payload.error_msg !== undefined) row.error_msg = payload.error_msg
+    // 结束时刷新一次以获取完成时间等字段
+    if (['success', 'failed'].includes(payload.status)) scheduleRefresh()
+  }
+
+  const startPolling = (interval = 3000) => {
+    if (pollingTimer) return
     pollingTimer = setInterval(() => {
       // 🌟 核心修改：只有在“未暂停”时才拉取数据
       if (!isPollingPaused.value) {
@@ -97,15 +138,59 @@ const startPolling = (interval = 3000) => {
 
   const stopPolling = () => {
     if (pollingTimer) clearInterval(pollingTimer)
+    pollingTimer = null
+  }
+
+  const connectStream = async () => {
+    streamController = new AbortController()
+    try {
+      await readEventStream('/v1/tasks/stream', {
+        signal: streamController.signal,
+        onEvent: (event, data) => {
+          if (event === 'snapshot') {
+            // (重新) 连接成功：停止兜底轮询，补拉一次断线期间的变化
+            reconnectDelay = 1000
+            stopPolling()
+            fetchTasks()
+          } else if (event === 'status') {
+            applyStatus(JSON.parse(data))
+          }
+        }
+      })
+    } catch (e) {
+      if (e.name === 'AbortError') return
+      console.warn('Task stream disconnected', e)
+    }
+    if (stopped) return
+    startPolling()
+    reconnectTimer = setTimeout(connectStream, reconnectDelay)
+    reconnectDelay = Math.min(reconnectDelay * 2, 30000)
+  }
+
+  const stopStream = () => {
+    stopped = true
+    if (streamController) streamController.abort()
+    clearTimeout(reconnectTimer)
+    clearTimeout(refreshTimer)
+    stopPolling()
   }
 
+  // 暂停期间收到的变化，恢复后统一刷新
+  watch(isPollingPaused, (paused) => {
+    if (!paused && pendingRefresh) {
+      pendingRefresh = false
+      fetchTasks()
+    }
+  })
+
   onMounted(() => {
     fetchBasicData()
-    startPolling()
+    fetchTasks()
+    connectStream()
   })
 
   onUnmounted(() => {
-    stopPolling()
+    stopStream()
   })
 
   return {
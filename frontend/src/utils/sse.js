@@ -0,0 +1,44 @@
+// src/utils/sse.js
+// 基于 fetch 的 SSE 读取 (EventSource 无法携带 Authorization 头)
+
+/**
+ * 连接 SSE 接口并逐条回调事件，流结束时 resolve
+ * @param {string} path 以 /v1 开头的接口路径，如 /v1/tasks/stream?task_ids=1,2
+ * @param {Object} options { signal, onEvent(event, data) }  data 为原始字符串 (多行以 \n 连接)
+ */
+export async function readEventStream(path, { signal, onEvent }) {
+  const baseUrl = import.meta.env.VITE_API_BASE_URL || '/api'
+  const token = sessionStorage.getItem('token')
+  const response = await fetch(`${baseUrl.replace(/\/$/, '')}${path}`, {
+    signal,
+    headers: { 'Authorization': `Bearer ${token}` }
+  })
+  if (!response.ok) {
+    throw new Error(response.statusText || `HTTP ${response.status}`)
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) break
+
+    buffer += decoder.decode(value, { stream: true })
+    const frames = buffer.split('\n\n')
+    // 保留最后一段可能不完整的事件
+    buffer = frames.pop()
+
+    frames.forEach(frame => {
+      let event = 'message'
+      const dataLines = []
+      frame.split('\n').forEach(line => {
+        if (line.startsWith('event: ')) event = line.slice(7)
+        else if (line.startsWith('data: ')) dataLines.push(line.slice(6))
+      })
+      // 心跳 (": ping") 没有 data 行
+      if (dataLines.length) onEvent(event, dataLines.join('\n'))
+    })
+  }
+}